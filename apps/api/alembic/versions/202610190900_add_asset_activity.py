@@ -0,0 +1,34 @@
+"""Add asset activity tracking
+
+Revision ID: 202610190900
+Revises: 202511031548
+Create Date: 2026-10-19 09:00:00
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "202610190900"
+down_revision: Union[str, None] = "202511031548"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "assets",
+        sa.Column("is_active", sa.Boolean(), nullable=False, server_default=sa.true()),
+    )
+    op.add_column("assets", sa.Column("last_demanded_at", sa.DateTime(timezone=True), nullable=True))
+    # Existing assets start a fresh demand TTL instead of going dormant on the first cycle.
+    op.execute("UPDATE assets SET last_demanded_at = now() WHERE last_demanded_at IS NULL")
+    op.create_index("ix_assets_is_active", "assets", ["is_active"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_assets_is_active", table_name="assets")
+    op.drop_column("assets", "last_demanded_at")
+    op.drop_column("assets", "is_active")
@@ -0,0 +1,101 @@
+"""Create asset_latest table
+
+Revision ID: 202610191000
+Revises: 202610190900
+Create Date: 2026-10-19 10:00:00
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "202610191000"
+down_revision: Union[str, None] = "202610190900"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "asset_latest",
+        sa.Column("asset_id", sa.dialects.postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("market_as_of", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("price", sa.Float(), nullable=True),
+        sa.Column("price_change_pct", sa.Float(), nullable=True),
+        sa.Column("volume", sa.Float(), nullable=True),
+        sa.Column("vwap", sa.Float(), nullable=True),
+        sa.Column("volatility_1d", sa.Float(), nullable=True),
+        sa.Column("indicator_as_of", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("rsi_14", sa.Float(), nullable=True),
+        sa.Column("macd", sa.Float(), nullable=True),
+        sa.Column("macd_signal", sa.Float(), nullable=True),
+        sa.Column("atr_14", sa.Float(), nullable=True),
+        sa.Column("phase", sa.String(length=16), nullable=True),
+        sa.Column("confidence", sa.Float(), nullable=True),
+        sa.Column("rationale", sa.String(length=512), nullable=True),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("sentiment_score", sa.Float(), nullable=True),
+        sa.Column("sentiment_delta", sa.Float(), nullable=True),
+        sa.Column("sentiment_observed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        sa.ForeignKeyConstraint(["asset_id"], ["assets.id"], ondelete="CASCADE"),
+    )
+
+    # Backfill from the history tables so reads switch over without waiting for an ingest cycle.
+    op.execute(
+        """
+        INSERT INTO asset_latest (asset_id, updated_at)
+        SELECT id, now() FROM assets
+        """
+    )
+    op.execute(
+        """
+        UPDATE asset_latest AS l
+        SET market_as_of = m.as_of, price = m.price, price_change_pct = m.price_change_pct,
+            volume = m.volume, vwap = m.vwap, volatility_1d = m.volatility_1d
+        FROM (
+            SELECT DISTINCT ON (asset_id) * FROM market_snapshot ORDER BY asset_id, as_of DESC
+        ) AS m
+        WHERE m.asset_id = l.asset_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE asset_latest AS l
+        SET indicator_as_of = i.as_of, rsi_14 = i.rsi_14, macd = i.macd,
+            macd_signal = i.macd_signal, atr_14 = i.atr_14
+        FROM (
+            SELECT DISTINCT ON (asset_id) * FROM indicator_snapshot ORDER BY asset_id, as_of DESC
+        ) AS i
+        WHERE i.asset_id = l.asset_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE asset_latest AS l
+        SET phase = p.phase, confidence = p.confidence, rationale = p.rationale,
+            computed_at = p.computed_at
+        FROM phase_state AS p
+        WHERE p.asset_id = l.asset_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE asset_latest AS l
+        SET sentiment_score = s.score, sentiment_observed_at = s.observed_at,
+            sentiment_delta = s.score - s.previous_score
+        FROM (
+            SELECT asset_id, score, observed_at,
+                   LEAD(score) OVER (PARTITION BY asset_id ORDER BY observed_at DESC) AS previous_score,
+                   ROW_NUMBER() OVER (PARTITION BY asset_id ORDER BY observed_at DESC) AS rn
+            FROM sentiment_observation
+        ) AS s
+        WHERE s.asset_id = l.asset_id AND s.rn = 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("asset_latest")
@@ -0,0 +1,30 @@
+"""Index sentiment observations by asset and recency
+
+Revision ID: 202610191100
+Revises: 202610191000
+Create Date: 2026-10-19 11:00:00
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "202610191100"
+down_revision: Union[str, None] = "202610191000"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_sentiment_observation_asset_observed",
+        "sentiment_observation",
+        ["asset_id", sa.text("observed_at DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sentiment_observation_asset_observed", table_name="sentiment_observation")
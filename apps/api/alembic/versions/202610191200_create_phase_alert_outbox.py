@@ -0,0 +1,56 @@
+"""Create phase alert outbox and asset watcher index
+
+Revision ID: 202610191200
+Revises: 202610191100
+Create Date: 2026-10-19 12:00:00
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "202610191200"
+down_revision: Union[str, None] = "202610191100"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "phase_alert_outbox",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "asset_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("assets.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "history_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("phase_history.id", ondelete="SET NULL"),
+            nullable=True,
+        ),
+        sa.Column("from_phase", sa.String(length=16), nullable=True),
+        sa.Column("to_phase", sa.String(length=16), nullable=False),
+        sa.Column("confidence", sa.Float(), nullable=True),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("dispatched_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_phase_alert_outbox_pending",
+        "phase_alert_outbox",
+        ["changed_at"],
+        unique=False,
+        postgresql_where=sa.text("dispatched_at IS NULL"),
+    )
+    op.create_index("ix_user_asset_asset_id", "user_asset", ["asset_id", "user_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_user_asset_asset_id", table_name="user_asset")
+    op.drop_index("ix_phase_alert_outbox_pending", table_name="phase_alert_outbox")
+    op.drop_table("phase_alert_outbox")
@@ -0,0 +1,36 @@
+"""Index phase history for keyset pagination
+
+Revision ID: 202610191300
+Revises: 202610191200
+Create Date: 2026-10-19 13:00:00
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+revision: str = "202610191300"
+down_revision: Union[str, None] = "202610191200"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_phase_history_asset_changed",
+        "phase_history",
+        ["asset_id", "changed_at", "id"],
+        unique=False,
+    )
+    op.drop_index("ix_phase_history_asset_time", table_name="phase_history")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_phase_history_asset_time",
+        "phase_history",
+        ["asset_id", "changed_at"],
+        unique=False,
+    )
+    op.drop_index("ix_phase_history_asset_changed", table_name="phase_history")
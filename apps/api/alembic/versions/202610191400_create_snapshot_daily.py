@@ -0,0 +1,54 @@
+"""Create daily snapshot rollups
+
+Revision ID: 202610191400
+Revises: 202610191300
+Create Date: 2026-10-19 14:00:00
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "202610191400"
+down_revision: Union[str, None] = "202610191300"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "snapshot_daily",
+        sa.Column(
+            "asset_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("assets.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("as_of", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("open", sa.Float(), nullable=True),
+        sa.Column("high", sa.Float(), nullable=True),
+        sa.Column("low", sa.Float(), nullable=True),
+        sa.Column("close", sa.Float(), nullable=True),
+        sa.Column("price", sa.Float(), nullable=True),
+        sa.Column("price_change_pct", sa.Float(), nullable=True),
+        sa.Column("volume", sa.Float(), nullable=True),
+        sa.Column("vwap", sa.Float(), nullable=True),
+        sa.Column("volatility_1d", sa.Float(), nullable=True),
+        sa.Column("rsi_14", sa.Float(), nullable=True),
+        sa.Column("macd", sa.Float(), nullable=True),
+        sa.Column("macd_signal", sa.Float(), nullable=True),
+        sa.Column("atr_14", sa.Float(), nullable=True),
+        sa.Column("samples", sa.Integer(), nullable=False),
+    )
+    # Retention walks the oldest raw day first; make that lookup an index probe.
+    op.create_index("ix_market_snapshot_as_of", "market_snapshot", ["as_of"], unique=False)
+    op.create_index("ix_sentiment_observation_observed", "sentiment_observation", ["observed_at"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_sentiment_observation_observed", table_name="sentiment_observation")
+    op.drop_index("ix_market_snapshot_as_of", table_name="market_snapshot")
+    op.drop_table("snapshot_daily")
@@ -0,0 +1,267 @@
+"""Partition snapshot tables by month
+
+Revision ID: 202610191500
+Revises: 202610191400
+Create Date: 2026-10-19 15:00:00
+
+Rebuilds market_snapshot, indicator_snapshot, sentiment_observation and
+phase_history as RANGE-partitioned parents with one partition per month,
+copying existing rows across. Primary keys gain the partition key, the
+indicator -> market reference becomes (market_snapshot_id, as_of), and the
+outbox no longer references phase_history. The ingest unique constraints are
+kept; the standalone (asset_id, as_of) indexes they duplicate are not
+recreated. Rows are copied inside the migration transaction, so run it in a
+maintenance window on large databases.
+"""
+
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import context, op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "202610191500"
+down_revision: Union[str, None] = "202610191400"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Referenced tables first when creating and copying; reversed when dropping.
+TABLES = ("market_snapshot", "indicator_snapshot", "sentiment_observation", "phase_history")
+PARTITION_KEYS = {
+    "market_snapshot": "as_of",
+    "indicator_snapshot": "as_of",
+    "sentiment_observation": "observed_at",
+    "phase_history": "changed_at",
+}
+MONTHS_AHEAD = 3
+
+
+# Copies of the app.db.partitions helpers as of this revision, so the migration
+# neither imports the app nor changes when it does.
+def _month_start(value: datetime) -> datetime:
+    value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _partition_ddl(table: str, month: datetime) -> str:
+    start = _month_start(month)
+    end = _add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table}_p{start:%Y%m} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def _uuid() -> postgresql.UUID:
+    return postgresql.UUID(as_uuid=True)
+
+
+def _asset_fk() -> sa.ForeignKeyConstraint:
+    return sa.ForeignKeyConstraint(["asset_id"], ["assets.id"], ondelete="CASCADE")
+
+
+def _create_tables(partitioned: bool) -> None:
+    def options(table: str) -> dict[str, str]:
+        return {"postgresql_partition_by": f"RANGE ({PARTITION_KEYS[table]})"} if partitioned else {}
+
+    def primary_key(table: str) -> sa.PrimaryKeyConstraint:
+        return sa.PrimaryKeyConstraint("id", PARTITION_KEYS[table]) if partitioned else sa.PrimaryKeyConstraint("id")
+
+    op.create_table(
+        "market_snapshot",
+        sa.Column("id", _uuid(), nullable=False),
+        sa.Column("asset_id", _uuid(), nullable=False),
+        sa.Column("price", sa.Float(), nullable=True),
+        sa.Column("price_change_pct", sa.Float(), nullable=True),
+        sa.Column("volume", sa.Float(), nullable=True),
+        sa.Column("vwap", sa.Float(), nullable=True),
+        sa.Column("volatility_1d", sa.Float(), nullable=True),
+        sa.Column("as_of", sa.DateTime(timezone=True), nullable=False),
+        primary_key("market_snapshot"),
+        _asset_fk(),
+        sa.UniqueConstraint("asset_id", "as_of", name="uq_market_snapshot_asset_time"),
+        **options("market_snapshot"),
+    )
+    op.create_index("ix_market_snapshot_as_of", "market_snapshot", ["as_of"], unique=False)
+
+    if partitioned:
+        market_reference: list[sa.SchemaItem] = [
+            sa.UniqueConstraint("market_snapshot_id", "as_of", name="uq_indicator_snapshot_market"),
+            sa.ForeignKeyConstraint(
+                ["market_snapshot_id", "as_of"],
+                ["market_snapshot.id", "market_snapshot.as_of"],
+                name="fk_indicator_snapshot_market",
+                ondelete="CASCADE",
+            ),
+        ]
+    else:
+        market_reference = [
+            sa.UniqueConstraint("market_snapshot_id"),
+            sa.ForeignKeyConstraint(["market_snapshot_id"], ["market_snapshot.id"], ondelete="CASCADE"),
+        ]
+    op.create_table(
+        "indicator_snapshot",
+        sa.Column("id", _uuid(), nullable=False),
+        sa.Column("asset_id", _uuid(), nullable=False),
+        sa.Column("market_snapshot_id", _uuid(), nullable=False),
+        sa.Column("rsi_14", sa.Numeric(10, 4), nullable=True),
+        sa.Column("macd", sa.Numeric(10, 4), nullable=True),
+        sa.Column("macd_signal", sa.Numeric(10, 4), nullable=True),
+        sa.Column("atr_14", sa.Numeric(10, 4), nullable=True),
+        sa.Column("as_of", sa.DateTime(timezone=True), nullable=False),
+        primary_key("indicator_snapshot"),
+        _asset_fk(),
+        sa.UniqueConstraint("asset_id", "as_of", name="uq_indicator_snapshot_asset_time"),
+        *market_reference,
+        **options("indicator_snapshot"),
+    )
+
+    op.create_table(
+        "sentiment_observation",
+        sa.Column("id", _uuid(), nullable=False),
+        sa.Column("asset_id", _uuid(), nullable=False),
+        sa.Column("source_id", _uuid(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=True),
+        sa.Column("magnitude", sa.Float(), nullable=True),
+        sa.Column("features", sa.JSON(), nullable=True),
+        sa.Column("observed_at", sa.DateTime(timezone=True), nullable=False),
+        primary_key("sentiment_observation"),
+        _asset_fk(),
+        sa.ForeignKeyConstraint(["source_id"], ["sentiment_source.id"], ondelete="RESTRICT"),
+        sa.UniqueConstraint("asset_id", "source_id", "observed_at", name="uq_sentiment_unique"),
+        **options("sentiment_observation"),
+    )
+    op.create_index(
+        "ix_sentiment_observation_asset_observed",
+        "sentiment_observation",
+        ["asset_id", sa.text("observed_at DESC")],
+        unique=False,
+    )
+    op.create_index("ix_sentiment_observation_observed", "sentiment_observation", ["observed_at"], unique=False)
+
+    op.create_table(
+        "phase_history",
+        sa.Column("id", _uuid(), nullable=False),
+        sa.Column("asset_id", _uuid(), nullable=False),
+        sa.Column("from_phase", sa.String(length=16), nullable=True),
+        sa.Column("to_phase", sa.String(length=16), nullable=False),
+        sa.Column("confidence", sa.Float(), nullable=True),
+        sa.Column("rationale", sa.String(length=512), nullable=True),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+        primary_key("phase_history"),
+        _asset_fk(),
+        **options("phase_history"),
+    )
+    op.create_index(
+        "ix_phase_history_asset_changed", "phase_history", ["asset_id", "changed_at", "id"], unique=False
+    )
+    if not partitioned:
+        op.create_index("ix_market_snapshot_asset_time", "market_snapshot", ["asset_id", "as_of"], unique=False)
+        op.create_index(
+            "ix_indicator_snapshot_asset_time", "indicator_snapshot", ["asset_id", "as_of"], unique=False
+        )
+
+
+def _set_aside(table: str) -> None:
+    """Rename ``table`` and its indexes (whose names are schema-wide) out of the way."""
+    op.rename_table(table, f"{table}_legacy")
+    op.execute(
+        f"""
+        DO $$
+        DECLARE index_name text;
+        BEGIN
+            FOR index_name IN
+                SELECT indexrelid::regclass::text FROM pg_index
+                WHERE indrelid = '{table}_legacy'::regclass
+            LOOP
+                EXECUTE 'ALTER INDEX ' || quote_ident(index_name)
+                    || ' RENAME TO ' || quote_ident(left(index_name, 56) || '_legacy');
+            END LOOP;
+        END $$;
+        """
+    )
+
+
+def _copy_from_legacy(table: str) -> None:
+    # The column list is read on the server so the statement also works with ``--sql``.
+    # No format() here or below: offline SQL doubles every percent sign.
+    op.execute(
+        f"""
+        DO $$
+        DECLARE columns text;
+        BEGIN
+            SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO columns
+            FROM pg_attribute
+            WHERE attrelid = '{table}'::regclass AND attnum > 0 AND NOT attisdropped;
+            EXECUTE 'INSERT INTO {table} (' || columns || ') SELECT ' || columns || ' FROM {table}_legacy';
+        END $$;
+        """
+    )
+
+
+def _create_partitions(table: str) -> None:
+    """Create monthly partitions from the oldest legacy row's month (at most the previous month) onwards."""
+    key = PARTITION_KEYS[table]
+    if context.is_offline_mode():
+        # Nothing can be queried while generating SQL, so the same loop runs on the server.
+        op.execute(
+            f"""
+            DO $$
+            DECLARE start_month timestamp := least(
+                date_trunc('month', (SELECT min({key}) FROM {table}_legacy) AT TIME ZONE 'UTC'),
+                date_trunc('month', now() AT TIME ZONE 'UTC') - interval '1 month'
+            );
+            BEGIN
+                WHILE start_month <= date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months' LOOP
+                    EXECUTE 'CREATE TABLE IF NOT EXISTS {table}_p' || to_char(start_month, 'YYYYMM')
+                        || ' PARTITION OF {table} FOR VALUES FROM ('
+                        || quote_literal(start_month AT TIME ZONE 'UTC') || ') TO ('
+                        || quote_literal((start_month + interval '1 month') AT TIME ZONE 'UTC') || ')';
+                    start_month := start_month + interval '1 month';
+                END LOOP;
+            END $$;
+            """
+        )
+        return
+    current = _month_start(datetime.now(timezone.utc))
+    oldest = op.get_bind().scalar(sa.text(f"SELECT min({key}) FROM {table}_legacy"))
+    month = min(_month_start(oldest), _add_months(current, -1)) if oldest is not None else _add_months(current, -1)
+    while month <= _add_months(current, MONTHS_AHEAD):
+        op.execute(_partition_ddl(table, month))
+        month = _add_months(month, 1)
+
+
+def _rebuild(partitioned: bool) -> None:
+    for table in TABLES:
+        _set_aside(table)
+    _create_tables(partitioned)
+    for table in TABLES:
+        if partitioned:
+            _create_partitions(table)
+        _copy_from_legacy(table)
+    for table in reversed(TABLES):
+        op.execute(f"DROP TABLE {table}_legacy CASCADE")
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE phase_alert_outbox DROP CONSTRAINT IF EXISTS phase_alert_outbox_history_id_fkey")
+    _rebuild(partitioned=True)
+
+
+def downgrade() -> None:
+    _rebuild(partitioned=False)
+    op.create_foreign_key(
+        "phase_alert_outbox_history_id_fkey",
+        "phase_alert_outbox",
+        "phase_history",
+        ["history_id"],
+        ["id"],
+        ondelete="SET NULL",
+    )
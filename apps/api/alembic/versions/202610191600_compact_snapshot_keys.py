@@ -0,0 +1,336 @@
+"""Compact snapshot keys and float indicators
+
+Revision ID: 202610191600
+Revises: 202610191500
+Create Date: 2026-10-19 16:00:00
+
+Gives assets a SMALLINT identity ``key`` as primary key (``id`` stays unique
+and keeps every existing foreign key) and rebuilds market_snapshot,
+indicator_snapshot and snapshot_daily keyed by (asset_key, as_of) with no
+surrogate UUIDs. Indicator columns become double precision, which also lifts
+the NUMERIC(10,4) ceiling on MACD and ATR for high-priced assets. Rows are
+copied inside the migration transaction, so run it in a maintenance window
+on large databases. Downgrading regenerates snapshot ids and fails if an
+indicator no longer fits NUMERIC(10,4).
+"""
+
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import context, op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "202610191600"
+down_revision: Union[str, None] = "202610191500"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Referenced tables first when creating and copying; reversed when dropping.
+TABLES = ("market_snapshot", "indicator_snapshot", "snapshot_daily")
+PARTITIONED = ("market_snapshot", "indicator_snapshot")
+MONTHS_AHEAD = 3
+MARKET_COLUMNS = ("price", "price_change_pct", "volume", "vwap", "volatility_1d")
+INDICATOR_COLUMNS = ("rsi_14", "macd", "macd_signal", "atr_14")
+DAILY_COLUMNS = ("open", "high", "low", "close", *MARKET_COLUMNS, *INDICATOR_COLUMNS, "samples")
+
+
+# Copies of the app.db.partitions helpers as of this revision, so the migration
+# neither imports the app nor changes when it does.
+def _month_start(value: datetime) -> datetime:
+    value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _partition_ddl(table: str, month: datetime) -> str:
+    start = _month_start(month)
+    end = _add_months(start, 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {table}_p{start:%Y%m} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def _partitioned(table: str) -> dict[str, str]:
+    return {"postgresql_partition_by": "RANGE (as_of)"} if table in PARTITIONED else {}
+
+
+def _daily_columns() -> list[sa.Column]:
+    return [
+        *(sa.Column(name, sa.Float(), nullable=True) for name in DAILY_COLUMNS[:-1]),
+        sa.Column("samples", sa.Integer(), nullable=False),
+    ]
+
+
+def _asset_key_column() -> sa.Column:
+    return sa.Column("asset_key", sa.SmallInteger(), sa.ForeignKey("assets.key", ondelete="CASCADE"), nullable=False)
+
+
+def _create_compact_tables() -> None:
+    op.create_table(
+        "market_snapshot",
+        _asset_key_column(),
+        sa.Column("as_of", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("price", sa.Float(), nullable=False),
+        *(sa.Column(name, sa.Float(), nullable=True) for name in MARKET_COLUMNS[1:]),
+        sa.PrimaryKeyConstraint("asset_key", "as_of"),
+        **_partitioned("market_snapshot"),
+    )
+    op.create_index("ix_market_snapshot_as_of", "market_snapshot", ["as_of"], unique=False)
+    op.create_table(
+        "indicator_snapshot",
+        _asset_key_column(),
+        sa.Column("as_of", sa.DateTime(timezone=True), nullable=False),
+        *(sa.Column(name, sa.Float(), nullable=True) for name in INDICATOR_COLUMNS),
+        sa.PrimaryKeyConstraint("asset_key", "as_of"),
+        sa.ForeignKeyConstraint(
+            ["asset_key", "as_of"],
+            ["market_snapshot.asset_key", "market_snapshot.as_of"],
+            name="fk_indicator_snapshot_market",
+            ondelete="CASCADE",
+        ),
+        **_partitioned("indicator_snapshot"),
+    )
+    op.create_table(
+        "snapshot_daily",
+        _asset_key_column(),
+        sa.Column("as_of", sa.DateTime(timezone=True), nullable=False),
+        *_daily_columns(),
+        sa.PrimaryKeyConstraint("asset_key", "as_of"),
+    )
+
+
+def _create_uuid_tables() -> None:
+    def asset_id() -> sa.Column:
+        return sa.Column(
+            "asset_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("assets.id", ondelete="CASCADE"),
+            nullable=False,
+        )
+
+    op.create_table(
+        "market_snapshot",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        asset_id(),
+        sa.Column("price", sa.Float(), nullable=True),
+        *(sa.Column(name, sa.Float(), nullable=True) for name in MARKET_COLUMNS[1:]),
+        sa.Column("as_of", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", "as_of"),
+        sa.UniqueConstraint("asset_id", "as_of", name="uq_market_snapshot_asset_time"),
+        **_partitioned("market_snapshot"),
+    )
+    op.create_index("ix_market_snapshot_as_of", "market_snapshot", ["as_of"], unique=False)
+    op.create_table(
+        "indicator_snapshot",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        asset_id(),
+        sa.Column("market_snapshot_id", postgresql.UUID(as_uuid=True), nullable=False),
+        *(sa.Column(name, sa.Numeric(10, 4), nullable=True) for name in INDICATOR_COLUMNS),
+        sa.Column("as_of", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id", "as_of"),
+        sa.UniqueConstraint("asset_id", "as_of", name="uq_indicator_snapshot_asset_time"),
+        sa.UniqueConstraint("market_snapshot_id", "as_of", name="uq_indicator_snapshot_market"),
+        sa.ForeignKeyConstraint(
+            ["market_snapshot_id", "as_of"],
+            ["market_snapshot.id", "market_snapshot.as_of"],
+            name="fk_indicator_snapshot_market",
+            ondelete="CASCADE",
+        ),
+        **_partitioned("indicator_snapshot"),
+    )
+    op.create_table(
+        "snapshot_daily",
+        asset_id(),
+        sa.Column("as_of", sa.DateTime(timezone=True), nullable=False),
+        *_daily_columns(),
+        sa.PrimaryKeyConstraint("asset_id", "as_of"),
+    )
+
+
+def _set_aside(table: str) -> None:
+    """Rename ``table``, its partitions and its indexes (names are schema-wide) out of the way.
+
+    The names are looked up on the server so the statement also works with
+    ``--sql``; it builds statements without format(), since offline SQL doubles
+    every percent sign.
+    """
+    op.execute(
+        f"""
+        DO $$
+        DECLARE relation text;
+        BEGIN
+            FOR relation IN
+                SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = '{table}'::regclass
+            LOOP
+                EXECUTE 'ALTER TABLE ' || relation || ' RENAME TO ' || quote_ident(relation || '_legacy');
+            END LOOP;
+            ALTER TABLE {table} RENAME TO {table}_legacy;
+            FOR relation IN
+                SELECT indexrelid::regclass::text FROM pg_index
+                WHERE indrelid = '{table}_legacy'::regclass
+            LOOP
+                EXECUTE 'ALTER INDEX ' || relation || ' RENAME TO ' || quote_ident(left(relation, 56) || '_legacy');
+            END LOOP;
+        END $$;
+        """
+    )
+
+
+def _create_partitions(table: str) -> None:
+    if context.is_offline_mode():
+        # Nothing can be queried while generating SQL, so the same loop runs on the server.
+        op.execute(
+            f"""
+            DO $$
+            DECLARE start_month timestamp := least(
+                date_trunc('month', (SELECT min(as_of) FROM {table}_legacy) AT TIME ZONE 'UTC'),
+                date_trunc('month', now() AT TIME ZONE 'UTC') - interval '1 month'
+            );
+            BEGIN
+                WHILE start_month <= date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months' LOOP
+                    EXECUTE 'CREATE TABLE IF NOT EXISTS {table}_p' || to_char(start_month, 'YYYYMM')
+                        || ' PARTITION OF {table} FOR VALUES FROM ('
+                        || quote_literal(start_month AT TIME ZONE 'UTC') || ') TO ('
+                        || quote_literal((start_month + interval '1 month') AT TIME ZONE 'UTC') || ')';
+                    start_month := start_month + interval '1 month';
+                END LOOP;
+            END $$;
+            """
+        )
+        return
+    current = _month_start(datetime.now(timezone.utc))
+    oldest = op.get_bind().scalar(sa.text(f"SELECT min(as_of) FROM {table}_legacy"))
+    month = _add_months(current, -1)
+    if oldest is not None:
+        month = min(_month_start(oldest), month)
+    while month <= _add_months(current, MONTHS_AHEAD):
+        op.execute(_partition_ddl(table, month))
+        month = _add_months(month, 1)
+
+
+def _rebuild(create_tables, copy_statements: Sequence[str]) -> None:
+    for table in TABLES:
+        _set_aside(table)
+    create_tables()
+    for table in PARTITIONED:
+        _create_partitions(table)
+    for statement in copy_statements:
+        op.execute(statement)
+    for table in reversed(TABLES):
+        op.execute(f"DROP TABLE {table}_legacy CASCADE")
+
+
+def _swap_asset_primary_key(primary_key: str) -> None:
+    """Move the assets primary key to ``primary_key``, recreating the foreign keys that depend on it.
+
+    ``id`` keeps a unique constraint while ``key`` is the primary key, so the
+    foreign keys to ``assets.id`` survive unchanged. The foreign keys are read
+    on the server, as in ``_set_aside``.
+    """
+    if primary_key == "key":
+        unique = "ALTER TABLE assets ADD CONSTRAINT uq_assets_id UNIQUE (id);"
+    else:
+        unique = "ALTER TABLE assets DROP CONSTRAINT uq_assets_id;"
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            tables text[];
+            names text[];
+            definitions text[];
+        BEGIN
+            SELECT array_agg(conrelid::regclass::text), array_agg(conname), array_agg(pg_get_constraintdef(oid))
+            INTO tables, names, definitions
+            FROM pg_constraint
+            WHERE contype = 'f' AND confrelid = 'assets'::regclass AND conparentid = 0;
+            FOR i IN 1 .. coalesce(array_length(names, 1), 0) LOOP
+                EXECUTE 'ALTER TABLE ' || tables[i] || ' DROP CONSTRAINT ' || quote_ident(names[i]);
+            END LOOP;
+            ALTER TABLE assets DROP CONSTRAINT assets_pkey;
+            {unique}
+            ALTER TABLE assets ADD CONSTRAINT assets_pkey PRIMARY KEY ({primary_key});
+            FOR i IN 1 .. coalesce(array_length(names, 1), 0) LOOP
+                EXECUTE 'ALTER TABLE ' || tables[i] || ' ADD CONSTRAINT ' || quote_ident(names[i])
+                    || ' ' || definitions[i];
+            END LOOP;
+        END $$;
+        """
+    )
+
+
+def _copy(table: str, key_columns: Sequence[str], key_values: Sequence[str], columns: Sequence[str], source: str) -> str:
+    """``INSERT .. SELECT`` from ``source`` (aliased ``s``), mapping the asset and snapshot keys."""
+    targets = ", ".join((*key_columns, *columns))
+    values = ", ".join((*key_values, *(f"s.{name}" for name in columns)))
+    return f"INSERT INTO {table} ({targets}) SELECT {values} FROM {source}"
+
+
+def upgrade() -> None:
+    op.add_column("assets", sa.Column("key", sa.SmallInteger(), sa.Identity(), nullable=False))
+    _swap_asset_primary_key("key")
+
+    _rebuild(
+        _create_compact_tables,
+        [
+            _copy(
+                "market_snapshot",
+                ["asset_key"],
+                ["a.key"],
+                ["as_of", *MARKET_COLUMNS],
+                "market_snapshot_legacy s JOIN assets a ON a.id = s.asset_id",
+            ),
+            _copy(
+                "indicator_snapshot",
+                ["asset_key"],
+                ["a.key"],
+                ["as_of", *INDICATOR_COLUMNS],
+                "indicator_snapshot_legacy s JOIN assets a ON a.id = s.asset_id",
+            ),
+            _copy(
+                "snapshot_daily",
+                ["asset_key"],
+                ["a.key"],
+                ["as_of", *DAILY_COLUMNS],
+                "snapshot_daily_legacy s JOIN assets a ON a.id = s.asset_id",
+            ),
+        ],
+    )
+
+
+def downgrade() -> None:
+    _rebuild(
+        _create_uuid_tables,
+        [
+            _copy(
+                "market_snapshot",
+                ["id", "asset_id"],
+                ["gen_random_uuid()", "a.id"],
+                ["as_of", *MARKET_COLUMNS],
+                "market_snapshot_legacy s JOIN assets a ON a.key = s.asset_key",
+            ),
+            _copy(
+                "indicator_snapshot",
+                ["id", "asset_id", "market_snapshot_id"],
+                ["gen_random_uuid()", "a.id", "m.id"],
+                ["as_of", *INDICATOR_COLUMNS],
+                "indicator_snapshot_legacy s JOIN assets a ON a.key = s.asset_key "
+                "JOIN market_snapshot m ON m.asset_id = a.id AND m.as_of = s.as_of",
+            ),
+            _copy(
+                "snapshot_daily",
+                ["asset_id"],
+                ["a.id"],
+                ["as_of", *DAILY_COLUMNS],
+                "snapshot_daily_legacy s JOIN assets a ON a.key = s.asset_key",
+            ),
+        ],
+    )
+    _swap_asset_primary_key("id")
+    op.drop_column("assets", "key")
@@ -0,0 +1,49 @@
+"""Add enqueued_at to the phase alert outbox
+
+Revision ID: 202610191700
+Revises: 202610191600
+Create Date: 2026-10-19 17:00:00
+
+``changed_at`` is the bar's ``as_of``, usually an hour or more behind the
+wall clock, so the dispatcher's dedupe window now runs on the insert time.
+Existing rows are backfilled with ``now()`` and wait one more window. The
+pending index moves to (asset_id, enqueued_at) for per-asset batching.
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "202610191700"
+down_revision: Union[str, None] = "202610191600"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "phase_alert_outbox",
+        sa.Column("enqueued_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.text("now()")),
+    )
+    op.drop_index("ix_phase_alert_outbox_pending", table_name="phase_alert_outbox")
+    op.create_index(
+        "ix_phase_alert_outbox_pending",
+        "phase_alert_outbox",
+        ["asset_id", "enqueued_at"],
+        unique=False,
+        postgresql_where=sa.text("dispatched_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_phase_alert_outbox_pending", table_name="phase_alert_outbox")
+    op.create_index(
+        "ix_phase_alert_outbox_pending",
+        "phase_alert_outbox",
+        ["changed_at"],
+        unique=False,
+        postgresql_where=sa.text("dispatched_at IS NULL"),
+    )
+    op.drop_column("phase_alert_outbox", "enqueued_at")
@@ -0,0 +1,53 @@
+"""Add delivery retry columns to the phase alert outbox
+
+Revision ID: 202610191800
+Revises: 202610191700
+Create Date: 2026-10-19 18:00:00
+
+A failing delivery no longer blocks the outbox: the dispatcher counts
+``attempts`` per row, backs off until ``next_attempt_at`` and, after the last
+attempt, sets ``dead_lettered_at``. The pending index leaves dead-lettered rows
+out. Existing rows start at zero attempts.
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "202610191800"
+down_revision: Union[str, None] = "202610191700"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "phase_alert_outbox",
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default=sa.text("0")),
+    )
+    op.add_column("phase_alert_outbox", sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("phase_alert_outbox", sa.Column("dead_lettered_at", sa.DateTime(timezone=True), nullable=True))
+    op.drop_index("ix_phase_alert_outbox_pending", table_name="phase_alert_outbox")
+    op.create_index(
+        "ix_phase_alert_outbox_pending",
+        "phase_alert_outbox",
+        ["asset_id", "enqueued_at"],
+        unique=False,
+        postgresql_where=sa.text("dispatched_at IS NULL AND dead_lettered_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_phase_alert_outbox_pending", table_name="phase_alert_outbox")
+    op.create_index(
+        "ix_phase_alert_outbox_pending",
+        "phase_alert_outbox",
+        ["asset_id", "enqueued_at"],
+        unique=False,
+        postgresql_where=sa.text("dispatched_at IS NULL"),
+    )
+    op.drop_column("phase_alert_outbox", "dead_lettered_at")
+    op.drop_column("phase_alert_outbox", "next_attempt_at")
+    op.drop_column("phase_alert_outbox", "attempts")
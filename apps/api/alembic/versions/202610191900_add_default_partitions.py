@@ -0,0 +1,35 @@
+"""Add a DEFAULT partition to each monthly partitioned table
+
+Revision ID: 202610191900
+Revises: 202610191800
+Create Date: 2026-10-19 19:00:00
+
+Rows whose month has no partition, such as late or backfilled snapshots older
+than the previous month, were rejected on insert. Each partitioned parent now
+gets a ``<table>_default`` partition to hold them; retention rolls those rows
+up or deletes them row by row. Downgrading drops the default partitions and
+any rows in them.
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+revision: str = "202610191900"
+down_revision: Union[str, None] = "202610191800"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Referenced tables first when creating; reversed when dropping.
+TABLES = ("market_snapshot", "indicator_snapshot", "sentiment_observation", "phase_history")
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.execute(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.execute(f"DROP TABLE IF EXISTS {table}_default")
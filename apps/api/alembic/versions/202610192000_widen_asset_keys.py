@@ -0,0 +1,45 @@
+"""Widen asset keys to INTEGER
+
+Revision ID: 202610192000
+Revises: 202610191900
+Create Date: 2026-10-19 20:00:00
+
+``assets.key`` was a SMALLINT identity, which caps the asset universe at
+32,767 rows and fails inserts after that. The key, its identity sequence and
+the ``asset_key`` columns of market_snapshot, indicator_snapshot and
+snapshot_daily become INTEGER; the partitioned tables rewrite every partition,
+so run it in a maintenance window on large databases. Downgrading fails once a
+key no longer fits SMALLINT.
+"""
+
+from collections.abc import Sequence
+from typing import Union
+
+from alembic import op
+
+revision: str = "202610192000"
+down_revision: Union[str, None] = "202610191900"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("market_snapshot", "indicator_snapshot", "snapshot_daily")
+
+
+def _set_key_type(type_: str) -> None:
+    op.execute(f"ALTER TABLE assets ALTER COLUMN key TYPE {type_}")
+    # The identity sequence keeps its own type, and with it the old maximum.
+    op.execute(
+        "DO $$ BEGIN "
+        f"EXECUTE 'ALTER SEQUENCE ' || pg_get_serial_sequence('assets', 'key') || ' AS {type_}'; "
+        "END $$"
+    )
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN asset_key TYPE {type_}")
+
+
+def upgrade() -> None:
+    _set_key_type("integer")
+
+
+def downgrade() -> None:
+    _set_key_type("smallint")
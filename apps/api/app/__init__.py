@@ -1,3 +1,13 @@
+from typing import Any
+
 __all__ = ["create_app"]
 
-from .main import create_app
+
+def __getattr__(name: str) -> Any:
+    # Deferred so that importing ``app.config`` or ``app.db`` (Alembic, workers,
+    # scripts) does not build the API and its routers.
+    if name == "create_app":
+        from .main import create_app
+
+        return create_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
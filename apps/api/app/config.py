@@ -14,6 +14,11 @@ class Settings(BaseSettings):
     ingest_tickers: Sequence[str] = ("NVDA", "BTC-USD")
     ingest_window_days: int = 7
     ingest_interval_minutes: int = 1
+    ingest_jitter_seconds: float = 5.0
+    asset_demand_ttl_hours: int = 72
+    demand_flush_seconds: float = 60.0
+    ingest_fetch_concurrency: int = 4
+    ingest_queue_size: int = 8
     allowed_origins: Sequence[str] = (
         "http://localhost:3000",
         "http://127.0.0.1:3000",
@@ -21,7 +26,33 @@ class Settings(BaseSettings):
     enable_sentiment: bool = True
     sentiment_window_minutes: int = 60
     enable_phase_alerts: bool = True
+    phase_alert_interval_seconds: float = 15.0
+    phase_alert_dedupe_seconds: int = 120
+    phase_alert_max_attempts: int = 5
+    phase_alert_retry_seconds: float = 60.0
+    phase_alert_webhook_url: str | None = None
+    phase_alert_file: str | None = None
     requests_per_minute: int = 120
+    rate_limit_max_keys: int = 100_000
+    rate_limit_route_weights: dict[str, int] = Field(
+        default_factory=lambda: {
+            "/ingest/run": 10,
+        }
+    )
+    # Without Redis each worker caches responses in-process and only sees its own
+    # invalidations, so other workers can serve a stale response for up to this long.
+    response_cache_ttl_seconds: int = 60
+    response_cache_max_entries: int = 1024
+    phase_stream_buffer_size: int = 64
+    phase_stream_heartbeat_seconds: float = 15.0
+    retention_interval_minutes: int = 60
+    retention_rollup_after_days: int = 90
+    retention_sentiment_days: int = 30
+    retention_alert_outbox_days: int = 7
+    retention_batch_size: int = 5000
+    partition_months_ahead: int = 3
+    partition_detach_only: bool = False
+    schema_wait_seconds: float = 0.0
     sentry_dsn: str | None = None
     ticker_aliases: dict[str, str] = Field(
         default_factory=lambda: {
@@ -29,6 +60,12 @@ class Settings(BaseSettings):
         }
     )
     redis_url: str | None = None
+    redis_max_connections: int = 50
+    redis_socket_timeout: float = 0.25
+    # Without Redis each worker caches tokens in-process, so a revoked token is
+    # accepted by the other workers for up to this long.
+    session_cache_ttl_seconds: int = 300
+    session_cache_max_entries: int = 10_000
 
 
 @lru_cache
@@ -1,17 +1,25 @@
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Any, Optional
 from uuid import UUID, uuid4
 
 from sqlalchemy import (
     CHAR,
+    Boolean,
+    ColumnElement,
     DateTime,
     Float,
     ForeignKey,
+    ForeignKeyConstraint,
+    Identity,
+    Index,
+    Integer,
     JSON,
-    Numeric,
+    SQLColumnExpression,
     String,
     TypeDecorator,
     UniqueConstraint,
+    func,
+    type_coerce,
 )
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
@@ -36,9 +44,18 @@ class GUID(TypeDecorator):
         return str(value)
 
     def process_result_value(self, value, dialect):
-        if value is None:
+        if value is None or isinstance(value, UUID):
             return value
-        return UUID(str(value))
+        return UUID(value)
+
+
+def raw_guid(column: SQLColumnExpression[Any]) -> ColumnElement[str]:
+    """Select a GUID column without per-row conversion to ``uuid.UUID``.
+
+    PostgreSQL drivers already return ``uuid.UUID``; SQLite returns the stored
+    string. Both encode to the same JSON, Arrow and MessagePack value.
+    """
+    return type_coerce(column, String())
 
 
 class Base(DeclarativeBase):
@@ -47,14 +64,26 @@ class Base(DeclarativeBase):
 
 class Asset(Base):
     __tablename__ = "assets"
-    __table_args__ = (UniqueConstraint("ticker", "type", name="uq_assets_ticker_type"),)
+    __table_args__ = (
+        UniqueConstraint("ticker", "type", name="uq_assets_ticker_type"),
+        UniqueConstraint("id", name="uq_assets_id"),
+    )
 
-    id: Mapped[UUID] = mapped_column(GUID(), primary_key=True, default=uuid4)
+    # ``key`` is the compact internal key the snapshot tables reference; ``id``
+    # stays the public identifier and the target of every other foreign key.
+    # As the insert sentinel, ``id`` lets a batch of new assets share one
+    # INSERT .. RETURNING although the key is generated by the database.
+    key: Mapped[int] = mapped_column(Integer, Identity(), primary_key=True)
+    id: Mapped[UUID] = mapped_column(GUID(), nullable=False, default=uuid4, insert_sentinel=True)
     ticker: Mapped[str] = mapped_column(String(32), nullable=False)
     name: Mapped[Optional[str]] = mapped_column(String(255))
     type: Mapped[str] = mapped_column(String(16), default="stock")
     exchange: Mapped[Optional[str]] = mapped_column(String(64))
     display_ticker: Mapped[Optional[str]] = mapped_column(String(64))
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False, index=True)
+    last_demanded_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False
     )
@@ -79,49 +108,85 @@ class Asset(Base):
     watchlist_entries: Mapped[list["UserAsset"]] = relationship(
         back_populates="asset", cascade="all, delete-orphan"
     )
+    latest: Mapped[Optional["AssetLatest"]] = relationship(
+        back_populates="asset", uselist=False, cascade="all, delete-orphan"
+    )
 
 
 class MarketSnapshot(Base):
     __tablename__ = "market_snapshot"
-    __table_args__ = (UniqueConstraint("asset_id", "as_of", name="uq_market_snapshot_asset_time"),)
+    # Keyed by (asset, time) with no surrogate id. On PostgreSQL the table is
+    # range-partitioned by month (see app.db.partitions), so the key includes ``as_of``.
+    __table_args__ = ({"postgresql_partition_by": "RANGE (as_of)"},)
 
-    id: Mapped[UUID] = mapped_column(GUID(), primary_key=True, default=uuid4)
-    asset_id: Mapped[UUID] = mapped_column(GUID(), ForeignKey("assets.id"), nullable=False)
+    asset_key: Mapped[int] = mapped_column(
+        Integer, ForeignKey("assets.key", ondelete="CASCADE"), primary_key=True
+    )
+    as_of: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
     price: Mapped[float] = mapped_column(Float)
     price_change_pct: Mapped[Optional[float]] = mapped_column(Float)
     volume: Mapped[Optional[float]] = mapped_column(Float)
     vwap: Mapped[Optional[float]] = mapped_column(Float)
     volatility_1d: Mapped[Optional[float]] = mapped_column(Float)
-    as_of: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
 
     asset: Mapped[Asset] = relationship(back_populates="market_snapshots")
-    indicator_snapshot: Mapped["IndicatorSnapshot"] = relationship(
-        back_populates="market_snapshot", uselist=False
+    indicator_snapshot: Mapped[Optional["IndicatorSnapshot"]] = relationship(
+        back_populates="market_snapshot", uselist=False, viewonly=True
     )
 
 
 class IndicatorSnapshot(Base):
     __tablename__ = "indicator_snapshot"
+    # One indicator row per market row, sharing its key.
     __table_args__ = (
-        UniqueConstraint("asset_id", "as_of", name="uq_indicator_snapshot_asset_time"),
+        ForeignKeyConstraint(
+            ["asset_key", "as_of"],
+            ["market_snapshot.asset_key", "market_snapshot.as_of"],
+            name="fk_indicator_snapshot_market",
+            ondelete="CASCADE",
+        ),
+        {"postgresql_partition_by": "RANGE (as_of)"},
     )
 
-    id: Mapped[UUID] = mapped_column(GUID(), primary_key=True, default=uuid4)
-    asset_id: Mapped[UUID] = mapped_column(GUID(), ForeignKey("assets.id"), nullable=False)
-    market_snapshot_id: Mapped[UUID] = mapped_column(
-        GUID(),
-        ForeignKey("market_snapshot.id"),
-        nullable=False,
-        unique=True,
+    asset_key: Mapped[int] = mapped_column(
+        Integer, ForeignKey("assets.key", ondelete="CASCADE"), primary_key=True
     )
-    rsi_14: Mapped[Optional[float]] = mapped_column(Numeric(10, 4))
-    macd: Mapped[Optional[float]] = mapped_column(Numeric(10, 4))
-    macd_signal: Mapped[Optional[float]] = mapped_column(Numeric(10, 4))
-    atr_14: Mapped[Optional[float]] = mapped_column(Numeric(10, 4))
-    as_of: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    as_of: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    rsi_14: Mapped[Optional[float]] = mapped_column(Float)
+    macd: Mapped[Optional[float]] = mapped_column(Float)
+    macd_signal: Mapped[Optional[float]] = mapped_column(Float)
+    atr_14: Mapped[Optional[float]] = mapped_column(Float)
 
     asset: Mapped[Asset] = relationship(back_populates="indicator_snapshots")
-    market_snapshot: Mapped[MarketSnapshot] = relationship(back_populates="indicator_snapshot")
+    market_snapshot: Mapped[MarketSnapshot] = relationship(back_populates="indicator_snapshot", viewonly=True)
+
+
+class DailySnapshot(Base):
+    """Daily rollup of market and indicator snapshots past the retention horizon.
+
+    ``price`` is the mean of the day's prices; indicators are the day's last values.
+    """
+
+    __tablename__ = "snapshot_daily"
+
+    asset_key: Mapped[int] = mapped_column(
+        Integer, ForeignKey("assets.key", ondelete="CASCADE"), primary_key=True
+    )
+    as_of: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    open: Mapped[Optional[float]] = mapped_column(Float)
+    high: Mapped[Optional[float]] = mapped_column(Float)
+    low: Mapped[Optional[float]] = mapped_column(Float)
+    close: Mapped[Optional[float]] = mapped_column(Float)
+    price: Mapped[Optional[float]] = mapped_column(Float)
+    price_change_pct: Mapped[Optional[float]] = mapped_column(Float)
+    volume: Mapped[Optional[float]] = mapped_column(Float)
+    vwap: Mapped[Optional[float]] = mapped_column(Float)
+    volatility_1d: Mapped[Optional[float]] = mapped_column(Float)
+    rsi_14: Mapped[Optional[float]] = mapped_column(Float)
+    macd: Mapped[Optional[float]] = mapped_column(Float)
+    macd_signal: Mapped[Optional[float]] = mapped_column(Float)
+    atr_14: Mapped[Optional[float]] = mapped_column(Float)
+    samples: Mapped[int] = mapped_column(Integer, nullable=False)
 
 
 class PhaseState(Base):
@@ -142,6 +207,11 @@ class PhaseState(Base):
 
 class PhaseHistory(Base):
     __tablename__ = "phase_history"
+    __table_args__ = (
+        # Keyset pagination range: newest-first by (changed_at, id) within an asset.
+        Index("ix_phase_history_asset_changed", "asset_id", "changed_at", "id"),
+        {"postgresql_partition_by": "RANGE (changed_at)"},
+    )
 
     id: Mapped[UUID] = mapped_column(GUID(), primary_key=True, default=uuid4)
     asset_id: Mapped[UUID] = mapped_column(
@@ -152,12 +222,48 @@ class PhaseHistory(Base):
     confidence: Mapped[Optional[float]] = mapped_column(Float)
     rationale: Mapped[Optional[str]] = mapped_column(String(512))
     changed_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), nullable=False, default=lambda: datetime.now(timezone.utc)
+        DateTime(timezone=True), primary_key=True, default=lambda: datetime.now(timezone.utc)
     )
 
     asset: Mapped[Asset] = relationship(back_populates="phase_history")
 
 
+class AssetLatest(Base):
+    """Denormalized newest market, indicator, phase and sentiment values per asset."""
+
+    __tablename__ = "asset_latest"
+
+    asset_id: Mapped[UUID] = mapped_column(
+        GUID(), ForeignKey("assets.id", ondelete="CASCADE"), primary_key=True
+    )
+    market_as_of: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    price: Mapped[Optional[float]] = mapped_column(Float)
+    price_change_pct: Mapped[Optional[float]] = mapped_column(Float)
+    volume: Mapped[Optional[float]] = mapped_column(Float)
+    vwap: Mapped[Optional[float]] = mapped_column(Float)
+    volatility_1d: Mapped[Optional[float]] = mapped_column(Float)
+    indicator_as_of: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    rsi_14: Mapped[Optional[float]] = mapped_column(Float)
+    macd: Mapped[Optional[float]] = mapped_column(Float)
+    macd_signal: Mapped[Optional[float]] = mapped_column(Float)
+    atr_14: Mapped[Optional[float]] = mapped_column(Float)
+    phase: Mapped[Optional[str]] = mapped_column(String(16))
+    confidence: Mapped[Optional[float]] = mapped_column(Float)
+    rationale: Mapped[Optional[str]] = mapped_column(String(512))
+    computed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    sentiment_score: Mapped[Optional[float]] = mapped_column(Float)
+    sentiment_delta: Mapped[Optional[float]] = mapped_column(Float)
+    sentiment_observed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    asset: Mapped[Asset] = relationship(back_populates="latest")
+
+
 class SentimentSource(Base):
     __tablename__ = "sentiment_source"
 
@@ -179,6 +285,7 @@ class SentimentObservation(Base):
     __tablename__ = "sentiment_observation"
     __table_args__ = (
         UniqueConstraint("asset_id", "source_id", "observed_at", name="uq_sentiment_unique"),
+        {"postgresql_partition_by": "RANGE (observed_at)"},
     )
 
     id: Mapped[UUID] = mapped_column(GUID(), primary_key=True, default=uuid4)
@@ -187,12 +294,22 @@ class SentimentObservation(Base):
     score: Mapped[Optional[float]] = mapped_column(Float)
     magnitude: Mapped[Optional[float]] = mapped_column(Float)
     features: Mapped[dict] = mapped_column(JSON, default=dict)
-    observed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    observed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
 
     asset: Mapped[Asset] = relationship(back_populates="sentiment_observations")
     source: Mapped[SentimentSource] = relationship(back_populates="observations")
 
 
+Index(
+    "ix_sentiment_observation_asset_observed",
+    SentimentObservation.asset_id,
+    SentimentObservation.observed_at.desc(),
+)
+# Retention scans: oldest raw day and expired sentiment across all assets.
+Index("ix_market_snapshot_as_of", MarketSnapshot.as_of)
+Index("ix_sentiment_observation_observed", SentimentObservation.observed_at)
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -216,7 +333,11 @@ class User(Base):
 
 class UserAsset(Base):
     __tablename__ = "user_asset"
-    __table_args__ = (UniqueConstraint("user_id", "asset_id", name="uq_user_asset_unique"),)
+    __table_args__ = (
+        UniqueConstraint("user_id", "asset_id", name="uq_user_asset_unique"),
+        # Asset -> watchers lookups for alert fan-out.
+        Index("ix_user_asset_asset_id", "asset_id", "user_id"),
+    )
 
     id: Mapped[UUID] = mapped_column(GUID(), primary_key=True, default=uuid4)
     user_id: Mapped[UUID] = mapped_column(GUID(), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
@@ -228,3 +349,40 @@ class UserAsset(Base):
 
     user: Mapped[User] = relationship(back_populates="watchlist_items")
     asset: Mapped[Asset] = relationship(back_populates="watchlist_entries")
+
+
+class PhaseAlertOutbox(Base):
+    """Phase transitions awaiting alert delivery, written in the classify transaction."""
+
+    __tablename__ = "phase_alert_outbox"
+
+    id: Mapped[UUID] = mapped_column(GUID(), primary_key=True, default=uuid4)
+    asset_id: Mapped[UUID] = mapped_column(GUID(), ForeignKey("assets.id", ondelete="CASCADE"), nullable=False)
+    # Not a foreign key: phase_history is partitioned on changed_at, and its
+    # partitions are dropped independently of the outbox.
+    history_id: Mapped[Optional[UUID]] = mapped_column(GUID())
+    from_phase: Mapped[Optional[str]] = mapped_column(String(16))
+    to_phase: Mapped[str] = mapped_column(String(16), nullable=False)
+    confidence: Mapped[Optional[float]] = mapped_column(Float)
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Wall-clock insert time; the dedupe window runs on this, since changed_at is the bar's as_of.
+    enqueued_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+    )
+    dispatched_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    # Failed deliveries back off until next_attempt_at; after the last attempt the
+    # rows are dead-lettered and kept, undelivered, until retention purges them.
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    dead_lettered_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+Index(
+    "ix_phase_alert_outbox_pending",
+    PhaseAlertOutbox.asset_id,
+    PhaseAlertOutbox.enqueued_at,
+    postgresql_where=PhaseAlertOutbox.dispatched_at.is_(None) & PhaseAlertOutbox.dead_lettered_at.is_(None),
+)
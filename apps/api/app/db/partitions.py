@@ -0,0 +1,174 @@
+"""Monthly range partitions for the append-only snapshot tables on PostgreSQL.
+
+The parents are declared with ``postgresql_partition_by`` in ``app.db.models``;
+this module creates the monthly children ahead of the ingestors and retires old
+ones in a single DDL statement instead of deleting their rows. Partitions are
+named ``<table>_pYYYYMM`` and cover ``[month start, next month start)`` in UTC.
+Each table also has a ``<table>_default`` partition so late or backfilled rows
+for a month without a partition are still accepted; retention rolls them up or
+deletes them row by row. On other databases the tables are plain and every function here is a no-op.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Connection, text
+
+log = logging.getLogger(__name__)
+
+# Parent table -> partition key. Ordered so referencing tables come before the
+# tables they reference, which is the order their partitions must be retired in.
+PARTITIONED_TABLES: dict[str, str] = {
+    "indicator_snapshot": "as_of",
+    "market_snapshot": "as_of",
+    "sentiment_observation": "observed_at",
+    "phase_history": "changed_at",
+}
+
+_PARTITION_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+@dataclass(frozen=True)
+class Partition:
+    table: str
+    name: str
+    start: datetime
+    end: datetime
+
+
+def month_start(value: datetime) -> datetime:
+    value = value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def partition_ddl(table: str, month: datetime) -> str:
+    start, end = month_start(month), add_months(month_start(month), 1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(table, start)} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def default_partition_ddl(table: str) -> str:
+    return f"CREATE TABLE IF NOT EXISTS {default_partition_name(table)} PARTITION OF {table} DEFAULT"
+
+
+def _is_postgres(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql"
+
+
+def is_partitioned(connection: Connection, table: str) -> bool:
+    if not _is_postgres(connection):
+        return False
+    kind = connection.scalar(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    )
+    return kind == "p"
+
+
+def list_partitions(connection: Connection, table: str) -> list[Partition]:
+    """Monthly partitions attached to ``table``, oldest first."""
+    if not _is_postgres(connection):
+        return []
+    names = connection.scalars(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table)"
+        ),
+        {"table": table},
+    )
+    partitions = []
+    for name in names:
+        match = _PARTITION_SUFFIX.search(name)
+        if match is None:
+            continue
+        start = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+        partitions.append(Partition(table, name, start, add_months(start, 1)))
+    return sorted(partitions, key=lambda partition: partition.start)
+
+
+def _default_holds(connection: Connection, table: str, month: datetime) -> bool:
+    key = PARTITIONED_TABLES[table]
+    start = month_start(month)
+    row = connection.scalar(
+        text(f"SELECT 1 FROM {default_partition_name(table)} WHERE {key} >= :start AND {key} < :end LIMIT 1"),
+        {"start": start, "end": add_months(start, 1)},
+    )
+    return row is not None
+
+
+def ensure_partitions(
+    connection: Connection,
+    now: Optional[datetime] = None,
+    months_ahead: int = 3,
+    months_back: int = 1,
+) -> list[str]:
+    """Create missing partitions from ``months_back`` before ``now`` to ``months_ahead`` after it.
+
+    The previous month is included by default because ingest backfills a few
+    days of history; anything older lands in the default partition, which is
+    created too if missing. A month whose rows are already in the default
+    partition is skipped with a warning, since PostgreSQL refuses to attach a
+    range that the default partition holds rows for. Returns the names of the
+    partitions that were created.
+    """
+    if not _is_postgres(connection):
+        return []
+    current = month_start(now or datetime.now(timezone.utc))
+    created = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(connection, table):
+            continue
+        default = default_partition_name(table)
+        if connection.scalar(text("SELECT to_regclass(:name)"), {"name": default}) is None:
+            connection.execute(text(default_partition_ddl(table)))
+            created.append(default)
+        existing = {partition.name for partition in list_partitions(connection, table)}
+        for offset in range(-months_back, months_ahead + 1):
+            month = add_months(current, offset)
+            if partition_name(table, month) in existing:
+                continue
+            if _default_holds(connection, table, month):
+                log.warning("Rows for %s are in %s; not creating its partition", partition_name(table, month), default)
+                continue
+            connection.execute(text(partition_ddl(table, month)))
+            created.append(partition_name(table, month))
+    if created:
+        log.info("Created partitions: %s", ", ".join(created))
+    return created
+
+
+def retire_partitions(
+    connection: Connection, table: str, before: datetime, detach_only: bool = False
+) -> list[Partition]:
+    """Detach every partition of ``table`` ending at or before ``before`` and drop it.
+
+    With ``detach_only`` the detached tables are kept for archiving. Callers
+    retire referencing tables first (see ``PARTITIONED_TABLES``), since a
+    partition cannot be detached while rows elsewhere still reference it.
+    """
+    retired = [partition for partition in list_partitions(connection, table) if partition.end <= before]
+    for partition in retired:
+        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition.name}"))
+        if not detach_only:
+            connection.execute(text(f"DROP TABLE {partition.name}"))
+    return retired
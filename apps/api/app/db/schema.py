@@ -0,0 +1,154 @@
+"""Schema version check for startup and a bootstrap command for empty databases.
+
+Alembic owns the schema. The API does not reflect or create tables on start:
+it reads ``alembic_version`` once and refuses to serve (or waits, see
+``TFT_SCHEMA_WAIT_SECONDS``) until the database is at ``SCHEMA_REVISION``,
+then creates any missing monthly partitions (PostgreSQL only).
+
+    python -m app.db.schema check      # exit 1 unless the database reaches this build's revision
+    python -m app.db.schema bootstrap  # create the schema on an empty database and stamp it
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from typing import Callable
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    Engine,
+    MetaData,
+    PrimaryKeyConstraint,
+    String,
+    Table,
+    inspect,
+    select,
+)
+
+from app.config import get_settings
+from app.db.models import Base
+from app.db.partitions import ensure_partitions
+from app.db.session import get_engine
+
+log = logging.getLogger(__name__)
+
+# Head of alembic/versions; tests/test_schema.py keeps the two in step.
+SCHEMA_REVISION = "202610192000"
+
+# Alembic's own version table, declared apart from ``Base.metadata``.
+alembic_version = Table(
+    "alembic_version",
+    MetaData(),
+    Column("version_num", String(32), nullable=False),
+    PrimaryKeyConstraint("version_num", name="alembic_version_pkc"),
+)
+
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+
+def current_revisions(connection: Connection) -> set[str]:
+    """Revisions recorded in ``alembic_version``; empty when Alembic has never run."""
+    if not inspect(connection).has_table(alembic_version.name):
+        return set()
+    return set(connection.scalars(select(alembic_version.c.version_num)))
+
+
+def _mismatch(revisions: set[str]) -> str:
+    if not revisions:
+        return (
+            "Database has no Alembic revision. Run `python -m app.db.schema bootstrap` "
+            "on an empty database, or `alembic upgrade head`"
+        )
+    return (
+        f"Database is at revision {', '.join(sorted(revisions))}; this build expects "
+        f"{SCHEMA_REVISION}. Run `alembic upgrade head` or deploy the matching build"
+    )
+
+
+def check_schema(
+    engine: Engine,
+    wait_seconds: float = 0.0,
+    poll_seconds: float = 2.0,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+) -> None:
+    """Raise ``SchemaVersionError`` unless the database is at ``SCHEMA_REVISION``.
+
+    With ``wait_seconds`` the check is repeated every ``poll_seconds`` until it
+    passes or the time is up, so replicas can start alongside a migration job.
+    """
+    deadline = clock() + wait_seconds
+    while True:
+        with engine.connect() as connection:
+            revisions = current_revisions(connection)
+        if revisions == {SCHEMA_REVISION}:
+            return
+        if clock() >= deadline:
+            raise SchemaVersionError(_mismatch(revisions))
+        log.warning("%s; waiting for migrations", _mismatch(revisions))
+        sleep(poll_seconds)
+
+
+def prepare_schema(engine: Engine, wait_seconds: float = 0.0, months_ahead: int = 3) -> list[str]:
+    """Startup step: ``check_schema``, then create partitions ``months_ahead`` in advance.
+
+    Retention also creates partitions, but it may be disabled or run in another
+    process, so every API start makes sure the coming months exist. Returns the
+    partitions that were created.
+    """
+    check_schema(engine, wait_seconds)
+    with engine.begin() as connection:
+        return ensure_partitions(connection, months_ahead=months_ahead)
+
+
+def bootstrap_schema(engine: Engine, months_ahead: int = 3) -> bool:
+    """Create every table on an empty database and stamp it at ``SCHEMA_REVISION``.
+
+    Returns ``False`` when the database is already at that revision. Databases
+    holding other tables are refused; migrate those with Alembic instead.
+    """
+    with engine.begin() as connection:
+        if current_revisions(connection) == {SCHEMA_REVISION}:
+            return False
+        existing = inspect(connection).get_table_names()
+        if existing:
+            raise SchemaVersionError(
+                f"Refusing to bootstrap a database that already has tables ({', '.join(sorted(existing))}); "
+                "run `alembic upgrade head` instead"
+            )
+        Base.metadata.create_all(connection)
+        ensure_partitions(connection, months_ahead=months_ahead)
+        alembic_version.create(connection)
+        connection.execute(alembic_version.insert().values(version_num=SCHEMA_REVISION))
+    return True
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=("check", "bootstrap"))
+    args = parser.parse_args(argv)
+    settings = get_settings()
+    engine = get_engine()
+    try:
+        if args.command == "bootstrap":
+            created = bootstrap_schema(engine, months_ahead=settings.partition_months_ahead)
+            print(f"Bootstrapped schema at {SCHEMA_REVISION}" if created else f"Schema already at {SCHEMA_REVISION}")
+        else:
+            check_schema(engine, settings.schema_wait_seconds)
+            print(f"Schema at {SCHEMA_REVISION}")
+    except SchemaVersionError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    finally:
+        engine.dispose()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,67 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
+from functools import lru_cache
+from typing import Any
 
-from sqlalchemy import create_engine
+from sqlalchemy import URL, Engine, create_engine, make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import get_settings
-from app.db.models import Base
 
-settings = get_settings()
 
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
+@lru_cache
+def get_engine() -> Engine:
+    settings = get_settings()
+    connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
+    return create_engine(
+        settings.database_url,
+        pool_pre_ping=True,
+        future=True,
+        connect_args=connect_args,
+    )
+
+
+def async_database_url(database_url: str) -> URL:
+    """Map a sync database URL onto its asyncio driver (psycopg async or aiosqlite)."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        return url.set(drivername="postgresql+psycopg")
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+# Request handlers read through the async engine; ingest jobs keep the sync one.
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    return create_async_engine(async_database_url(get_settings().database_url), pool_pre_ping=True)
 
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,
-    future=True,
-    connect_args=connect_args,
-)
 
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, class_=Session)
+class _LazySessionmaker(sessionmaker[Session]):
+    """Binds to ``get_engine()`` on first use, so importing the app loads no database driver."""
 
+    def __call__(self, **local_kw: Any) -> Session:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
 
-def init_database() -> None:
-    Base.metadata.create_all(bind=engine)
+
+class _LazyAsyncSessionmaker(async_sessionmaker[AsyncSession]):
+    def __call__(self, **local_kw: Any) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_async_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(autocommit=False, autoflush=False, class_=Session)
+
+AsyncSessionLocal = _LazyAsyncSessionmaker(autoflush=False, expire_on_commit=False)
 
 
 def get_session() -> Generator[Session, None, None]:
@@ -34,3 +74,13 @@ def get_session() -> Generator[Session, None, None]:
         raise
     finally:
         session.close()
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
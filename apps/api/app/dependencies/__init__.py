@@ -1 +1 @@
-__all__ = ["rate_limit"]
+__all__ = ["rate_limit", "response_cache"]
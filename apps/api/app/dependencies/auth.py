@@ -1,20 +1,221 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+from uuid import UUID
+
 from fastapi import Depends, Header, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.config import Settings, get_settings
 from app.db.models import User
-from app.db.session import get_session
+from app.db.session import get_async_session, get_session
 
+try:  # pragma: no cover - optional redis dependency
+    import redis
+    import redis.asyncio
+except ImportError:  # pragma: no cover
+    redis = None  # type: ignore[assignment]
 
-def get_current_user(
+log = logging.getLogger(__name__)
+
+
+class InMemorySessionCache:
+    """TTL-bounded LRU of session token -> user id.
+
+    Only successful lookups are cached, so unknown tokens always reach the
+    database and cannot flood the cache.
+    """
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: int = 300) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, UUID]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> UUID | None:
+        with self._lock:
+            item = self._entries.get(token)
+            if item is None:
+                return None
+            expires_at, user_id = item
+            if expires_at <= time.monotonic():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return user_id
+
+    def set(self, token: str, user_id: UUID) -> None:
+        with self._lock:
+            self._entries[token] = (time.monotonic() + self.ttl_seconds, user_id)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        with self._lock:
+            self._entries.pop(token, None)
+
+    # The dict lookups never block, so the event loop calls them directly.
+    async def aget(self, token: str) -> UUID | None:
+        return self.get(token)
+
+    async def aset(self, token: str, user_id: UUID) -> None:
+        self.set(token, user_id)
+
+
+class RedisSessionCache:
+    """Session cache shared by every worker.
+
+    ``get``/``set`` use the blocking ``client``; the async request path goes
+    through ``async_client`` (a ``redis.asyncio`` client), or through a worker
+    thread when there is none, so a slow Redis never stalls the event loop.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        ttl_seconds: int = 300,
+        prefix: str = "tft:session",
+        async_client: Any | None = None,
+    ) -> None:
+        self.client = client
+        self.async_client = async_client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def get(self, token: str) -> UUID | None:
+        try:
+            value = self.client.get(f"{self.prefix}:{token}")
+        except Exception:  # pragma: no cover - redis outage falls back to the database
+            log.warning("Session cache unavailable", exc_info=True)
+            return None
+        if value is None:
+            return None
+        return UUID(value.decode() if isinstance(value, bytes) else value)
+
+    def set(self, token: str, user_id: UUID) -> None:
+        try:
+            self.client.setex(f"{self.prefix}:{token}", self.ttl_seconds, str(user_id))
+        except Exception:  # pragma: no cover
+            log.warning("Session cache unavailable", exc_info=True)
+
+    def invalidate(self, token: str) -> None:
+        try:
+            self.client.delete(f"{self.prefix}:{token}")
+        except Exception:  # pragma: no cover - the entry expires after ttl_seconds
+            log.warning("Session cache unavailable; revoked token stays cached until it expires", exc_info=True)
+
+    async def aget(self, token: str) -> UUID | None:
+        if self.async_client is None:
+            return await asyncio.to_thread(self.get, token)
+        try:
+            value = await self.async_client.get(f"{self.prefix}:{token}")
+        except Exception:  # pragma: no cover - redis outage falls back to the database
+            log.warning("Session cache unavailable", exc_info=True)
+            return None
+        if value is None:
+            return None
+        return UUID(value.decode() if isinstance(value, bytes) else value)
+
+    async def aset(self, token: str, user_id: UUID) -> None:
+        if self.async_client is None:
+            await asyncio.to_thread(self.set, token, user_id)
+            return
+        try:
+            await self.async_client.setex(f"{self.prefix}:{token}", self.ttl_seconds, str(user_id))
+        except Exception:  # pragma: no cover
+            log.warning("Session cache unavailable", exc_info=True)
+
+
+SessionCache = InMemorySessionCache | RedisSessionCache
+
+
+def build_session_cache(settings: Settings | None = None) -> SessionCache:
+    settings = settings or get_settings()
+    if settings.redis_url and redis is not None:
+        try:
+            return RedisSessionCache(
+                redis.from_url(settings.redis_url),
+                ttl_seconds=settings.session_cache_ttl_seconds,
+                async_client=redis.asyncio.from_url(settings.redis_url),
+            )
+        except Exception:  # pragma: no cover - fallback to memory
+            log.warning("Redis unavailable for session cache; using in-process cache", exc_info=True)
+    return InMemorySessionCache(
+        max_entries=settings.session_cache_max_entries,
+        ttl_seconds=settings.session_cache_ttl_seconds,
+    )
+
+
+@lru_cache
+def get_session_cache() -> SessionCache:
+    """The process-wide session cache, built on the first lookup."""
+    return build_session_cache()
+
+
+def _require_token(token: str | None) -> str:
+    if not token:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing session token")
+    return token
+
+
+def _require_user_id(user_id: UUID | None) -> UUID:
+    if user_id is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session token")
+    return user_id
+
+
+def _user_id_query(token: str) -> Select[UUID]:
+    return select(User.id).where(User.session_token == token)
+
+
+def lookup_user_id(session: Session, token: str) -> UUID | None:
+    cache = get_session_cache()
+    user_id = cache.get(token)
+    if user_id is None:
+        user_id = session.scalar(_user_id_query(token))
+        if user_id is not None:
+            cache.set(token, user_id)
+    return user_id
+
+
+async def lookup_user_id_async(session: AsyncSession, token: str) -> UUID | None:
+    cache = get_session_cache()
+    user_id = await cache.aget(token)
+    if user_id is None:
+        user_id = await session.scalar(_user_id_query(token))
+        if user_id is not None:
+            await cache.aset(token, user_id)
+    return user_id
+
+
+def get_current_user_id(
     session: Session = Depends(get_session),
     token: str | None = Header(None, alias="X-Session-Token"),
+) -> UUID:
+    return _require_user_id(lookup_user_id(session, _require_token(token)))
+
+
+async def get_current_user_id_async(
+    session: AsyncSession = Depends(get_async_session),
+    token: str | None = Header(None, alias="X-Session-Token"),
+) -> UUID:
+    return _require_user_id(await lookup_user_id_async(session, _require_token(token)))
+
+
+def get_current_user(
+    session: Session = Depends(get_session),
+    user_id: UUID = Depends(get_current_user_id),
 ) -> User:
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing session token")
-    user = session.scalars(select(User).where(User.session_token == token)).first()
-    if not user:
+    user = session.get(User, user_id)
+    if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session token")
     return user
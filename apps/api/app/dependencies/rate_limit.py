@@ -1,26 +1,65 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import math
+import threading
 import time
-from collections import defaultdict
-from typing import DefaultDict, Tuple
+from functools import lru_cache
+from typing import Any
 
 from fastapi import HTTPException, Request, status
 
-from app.config import get_settings
+from app.config import Settings, get_settings
 
 try:  # pragma: no cover - optional redis dependency
-    import redis  # type: ignore
+    import redis
+    import redis.asyncio
+    import redis.asyncio.retry
+    from redis.backoff import NoBackoff
+    from redis.retry import Retry
 except ImportError:  # pragma: no cover
-    redis = None
+    redis = None  # type: ignore[assignment]
 
-RateBucket = Tuple[int, int]
+log = logging.getLogger(__name__)
+
+# Keys that arrive after a shard is full share this bucket until the window rolls over.
+OVERFLOW_KEY = "__overflow__"
+
+
+class _Shard:
+    __slots__ = ("lock", "window", "counts")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.window = -1
+        self.counts: dict[str, int] = {}
 
 
 class InMemoryRateLimiter:
-    def __init__(self, max_requests: int, window_seconds: int = 60) -> None:
+    """Fixed-window limiter with sharded locking and bounded memory.
+
+    Keys hash onto ``shards`` independently locked dictionaries, so threads
+    checking different clients rarely contend and every increment is exact.
+    A shard drops all of its counters when it first sees a new window, which
+    is the only expiry needed for fixed windows. Each shard tracks at most
+    ``max_keys / shards`` clients; further clients in that window are counted
+    together under one overflow bucket rather than growing the table. That
+    bucket allows ``max_requests * shards`` so a burst of new clients does not
+    lock every later arrival out on a single client's budget.
+    """
+
+    def __init__(
+        self,
+        max_requests: int,
+        window_seconds: int = 60,
+        max_keys: int = 100_000,
+        shards: int = 16,
+    ) -> None:
         self._max_requests = max_requests
         self.window_seconds = window_seconds
-        self.counters: DefaultDict[str, RateBucket] = defaultdict(lambda: (0, 0))
+        self._shards = [_Shard() for _ in range(max(shards, 1))]
+        self._keys_per_shard = max(max_keys // len(self._shards), 1)
 
     @property
     def max_requests(self) -> int:
@@ -30,69 +69,192 @@ class InMemoryRateLimiter:
     def max_requests(self, value: int) -> None:
         self._max_requests = value
 
-    def check(self, key: str) -> None:
-        now = int(time.time())
-        window = now // self.window_seconds
-        count, stored_window = self.counters[key]
-        if window != stored_window:
-            count = 0
-        count += 1
-        self.counters[key] = (count, window)
-        if count > self._max_requests:
-            reset_in = (stored_window + 1) * self.window_seconds - now
+    @property
+    def tracked_keys(self) -> int:
+        return sum(len(shard.counts) for shard in self._shards)
+
+    def check(self, key: str, cost: int = 1) -> None:
+        now = time.time()
+        window = int(now // self.window_seconds)
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            if shard.window != window:
+                shard.window = window
+                shard.counts.clear()
+            limit = self._max_requests
+            if key not in shard.counts and len(shard.counts) >= self._keys_per_shard:
+                key = OVERFLOW_KEY
+                limit *= len(self._shards)
+            count = shard.counts.get(key, 0) + cost
+            shard.counts[key] = count
+        if count > limit:
+            reset_in = (window + 1) * self.window_seconds - now
             raise HTTPException(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail=f"Rate limit exceeded. Try again in {max(reset_in, 1)}s.",
+                detail=f"Rate limit exceeded. Try again in {max(int(reset_in), 1)}s.",
             )
 
+    async def acheck(self, key: str, cost: int = 1) -> None:
+        # Shard locks are held for a dict update only, so the event loop checks inline.
+        self.check(key, cost)
+
 
-settings = get_settings()
+# Token bucket stored as a hash of (tokens, ts). The clock comes from the
+# server so every API worker refills against the same time source.
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil then
+  tokens = capacity
+  ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_ms = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  retry_ms = math.ceil((cost - tokens) / rate)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+return {allowed, retry_ms}
+"""
 
 
 class RedisRateLimiter:
-    def __init__(self, client: "redis.Redis[Any, Any]", max_requests: int, window_seconds: int = 60) -> None:
+    """Token-bucket limiter evaluated in one ``EVALSHA`` round trip.
+
+    Each key holds up to ``max_requests`` tokens and refills at
+    ``max_requests / window_seconds``. When Redis errors the check falls back
+    to ``fallback`` and Redis is skipped for ``retry_seconds``, so an outage
+    costs one timeout rather than one per request.
+
+    ``acheck`` runs the same script on ``async_client`` (``redis.asyncio``) so
+    request handlers never block the event loop on Redis; without an async
+    client it runs ``check`` on a worker thread.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        max_requests: int,
+        window_seconds: int = 60,
+        fallback: InMemoryRateLimiter | None = None,
+        retry_seconds: float = 5.0,
+        async_client: redis.asyncio.Redis | None = None,
+    ) -> None:
         self.client = client
-        self.max_requests = max_requests
+        self.async_client = async_client
         self.window_seconds = window_seconds
+        self.fallback = fallback or InMemoryRateLimiter(max_requests, window_seconds)
+        self.retry_seconds = retry_seconds
+        self.max_requests = max_requests
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+        self._async_script = async_client.register_script(TOKEN_BUCKET_SCRIPT) if async_client else None
+        self._skip_until = 0.0
+
+    @property
+    def max_requests(self) -> int:
+        return self._max_requests
+
+    @max_requests.setter
+    def max_requests(self, value: int) -> None:
+        self._max_requests = value
+        self.fallback.max_requests = value
+
+    def _script_args(self, cost: int) -> list[float]:
+        return [self._max_requests, self._max_requests / (self.window_seconds * 1000), cost]
+
+    def _fail_open(self, key: str, cost: int) -> None:
+        log.warning("Redis rate limiter unavailable; failing open to in-process limits", exc_info=True)
+        self._skip_until = time.monotonic() + self.retry_seconds
+        self.fallback.check(key, cost)
+
+    @staticmethod
+    def _enforce(allowed: int, retry_ms: int) -> None:
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded. Try again in {max(math.ceil(int(retry_ms) / 1000), 1)}s.",
+            )
+
+    def check(self, key: str, cost: int = 1) -> None:
+        if time.monotonic() < self._skip_until:
+            self.fallback.check(key, cost)
+            return
+        try:
+            allowed, retry_ms = self._script(keys=[f"rate:{key}"], args=self._script_args(cost))
+        except redis.RedisError:
+            self._fail_open(key, cost)
+            return
+        self._enforce(allowed, retry_ms)
+
+    async def acheck(self, key: str, cost: int = 1) -> None:
+        if self._async_script is None:
+            await asyncio.to_thread(self.check, key, cost)
+            return
+        if time.monotonic() < self._skip_until:
+            self.fallback.check(key, cost)
+            return
+        try:
+            allowed, retry_ms = await self._async_script(keys=[f"rate:{key}"], args=self._script_args(cost))
+        except redis.RedisError:
+            self._fail_open(key, cost)
+            return
+        self._enforce(allowed, retry_ms)
+
+
+RateLimiter = InMemoryRateLimiter | RedisRateLimiter
+
+
+def build_rate_limiter(settings: Settings | None = None) -> RateLimiter:
+    settings = settings or get_settings()
+    memory = InMemoryRateLimiter(
+        max_requests=settings.requests_per_minute, max_keys=settings.rate_limit_max_keys
+    )
+    if settings.redis_url and redis is not None:
+        pool_options: dict[str, Any] = {
+            "max_connections": settings.redis_max_connections,
+            "socket_timeout": settings.redis_socket_timeout,
+            "socket_connect_timeout": settings.redis_socket_timeout,
+        }
+        try:
+            # Retrying with backoff would stall requests; the fallback limiter covers outages.
+            pool = redis.ConnectionPool.from_url(settings.redis_url, retry=Retry(NoBackoff(), 0), **pool_options)
+            async_pool = redis.asyncio.ConnectionPool.from_url(
+                settings.redis_url, retry=redis.asyncio.retry.Retry(NoBackoff(), 0), **pool_options
+            )
+            return RedisRateLimiter(
+                redis.Redis(connection_pool=pool),
+                max_requests=settings.requests_per_minute,
+                fallback=memory,
+                async_client=redis.asyncio.Redis(connection_pool=async_pool),
+            )
+        except Exception:  # pragma: no cover - fallback to memory
+            log.warning("Redis unavailable for rate limiting; using in-process limiter", exc_info=True)
+    return memory
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter:
+    """The process-wide limiter, built on the first rate-limited request."""
+    return build_rate_limiter()
+
+
+def route_weight(request: Request) -> int:
+    route = request.scope.get("route")
+    path = getattr(route, "path", request.url.path)
+    return get_settings().rate_limit_route_weights.get(path, 1)
+
 
-    def check(self, key: str) -> None:
-        redis_key = f"rate:{key}"
-        with self.client.pipeline() as pipe:
-            while True:
-                try:
-                    pipe.watch(redis_key)
-                    current = pipe.get(redis_key)
-                    if current is None:
-                        pipe.multi()
-                        pipe.setex(redis_key, self.window_seconds, 1)
-                        pipe.execute()
-                        return
-                    count = int(current)
-                    if count >= self.max_requests:
-                        ttl = self.client.ttl(redis_key)
-                        reset_in = ttl if ttl and ttl > 0 else self.window_seconds
-                        raise HTTPException(
-                            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                            detail=f"Rate limit exceeded. Try again in {reset_in}s.",
-                        )
-                    pipe.multi()
-                    pipe.incr(redis_key)
-                    pipe.execute()
-                    return
-                except redis.WatchError:  # type: ignore[attr-defined]
-                    continue
-
-
-if settings.redis_url and redis is not None:
-    try:
-        redis_client = redis.from_url(settings.redis_url)  # type: ignore[attr-defined]
-        rate_limiter = RedisRateLimiter(redis_client, max_requests=settings.requests_per_minute)
-    except Exception:  # pragma: no cover - fallback to memory
-        rate_limiter = InMemoryRateLimiter(max_requests=settings.requests_per_minute)
-else:
-    rate_limiter = InMemoryRateLimiter(max_requests=settings.requests_per_minute)
-
-
-def enforce_rate_limit(request: Request) -> None:
+async def enforce_rate_limit(request: Request) -> None:
     client_host = request.client.host if request.client else "anonymous"
-    rate_limiter.check(client_host)
+    await get_rate_limiter().acheck(client_host, route_weight(request))
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence
+
+from fastapi import Request, Response, status
+
+from app.config import Settings, get_settings
+from app.utils.encoding import JSON_MEDIA_TYPE
+
+try:  # pragma: no cover - optional redis dependency
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None  # type: ignore[assignment]
+
+log = logging.getLogger(__name__)
+
+ALL_TICKERS = "*"
+
+# Builders return the encoded body and the newest timestamp it reflects.
+Builder = Callable[[], Awaitable[tuple[bytes, Optional[datetime]]]]
+
+
+@dataclass
+class CachedResponse:
+    token: str
+    body: bytes
+    etag: str
+    last_modified: Optional[datetime]
+
+
+def normalize_tickers(tickers: Iterable[str] | None) -> list[str]:
+    if not tickers:
+        return []
+    return sorted({ticker.strip().upper() for ticker in tickers if ticker and ticker.strip()})
+
+
+def _utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def max_timestamp(values: Iterable[Optional[datetime]]) -> Optional[datetime]:
+    present = [_utc(value) for value in values if value is not None]
+    return max(present) if present else None
+
+
+class ResponseCache(ABC):
+    """Caches serialized read responses until ingest bumps an asset version.
+
+    Entries are keyed by route and normalized ticker set. Each entry records the
+    version token it was built under: the per-ticker versions for filtered
+    requests, or the global version for unfiltered ones. ``bump`` advances both,
+    so stale entries miss on their next lookup instead of being deleted.
+    """
+
+    def __init__(self) -> None:
+        _caches.add(self)
+
+    @abstractmethod
+    def version_token(self, tickers: Sequence[str]) -> str: ...
+
+    @abstractmethod
+    def bump(self, tickers: Iterable[str]) -> None: ...
+
+    @abstractmethod
+    def get(self, key: str) -> CachedResponse | None: ...
+
+    @abstractmethod
+    def set(self, key: str, entry: CachedResponse) -> None: ...
+
+    async def respond(
+        self,
+        request: Request,
+        tickers: Iterable[str] | None,
+        build: Builder,
+        media_type: str = JSON_MEDIA_TYPE,
+    ) -> Response:
+        normalized = normalize_tickers(tickers)
+        key = f"{request.url.path}|{','.join(normalized) or ALL_TICKERS}"
+        if media_type != JSON_MEDIA_TYPE:
+            key = f"{key}|{media_type}"
+        entry: CachedResponse | None = None
+        try:
+            token = self.version_token(normalized)
+            cached = self.get(key)
+            if cached is not None and cached.token == token:
+                entry = cached
+        except Exception:  # pragma: no cover - cache backend outage
+            log.warning("Response cache unavailable; serving %s uncached", key, exc_info=True)
+            token = None
+
+        if entry is None:
+            body, last_modified = await build()
+            stamp = int(last_modified.timestamp()) if last_modified else 0
+            digest = hashlib.sha1(body).hexdigest()[:16]
+            entry = CachedResponse(
+                token=token or "",
+                body=body,
+                etag=f'W/"{stamp}-{digest}"',
+                last_modified=last_modified,
+            )
+            if token is not None:
+                try:
+                    self.set(key, entry)
+                except Exception:  # pragma: no cover - cache backend outage
+                    log.warning("Failed to store %s in response cache", key, exc_info=True)
+
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+        if entry.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(entry.last_modified, usegmt=True)
+        if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=entry.body, media_type=media_type, headers=headers)
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    candidates = {candidate.strip() for candidate in header.split(",")}
+    bare = etag.removeprefix("W/")
+    return "*" in candidates or etag in candidates or bare in candidates or f"W/{bare}" in candidates
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Per-process cache; ``bump`` only reaches this process.
+
+    On a multi-worker deployment without Redis, the TTL bounds how long a worker
+    keeps serving responses another worker has already invalidated.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: int = 60) -> None:
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def version_token(self, tickers: Sequence[str]) -> str:
+        keys = tickers or [ALL_TICKERS]
+        with self._lock:
+            return ",".join(str(self._versions.get(key, 0)) for key in keys)
+
+    def bump(self, tickers: Iterable[str]) -> None:
+        with self._lock:
+            for key in {*normalize_tickers(tickers), ALL_TICKERS}:
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            expires_at, entry = item
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisResponseCache(ResponseCache):
+    def __init__(self, client: Any, ttl_seconds: int = 300, prefix: str = "tft:cache") -> None:
+        super().__init__()
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def version_token(self, tickers: Sequence[str]) -> str:
+        keys = [f"{self.prefix}:version:{key}" for key in (tickers or [ALL_TICKERS])]
+        values = self.client.mget(keys)
+        return ",".join((value.decode() if isinstance(value, bytes) else str(value or 0)) for value in values)
+
+    def bump(self, tickers: Iterable[str]) -> None:
+        with self.client.pipeline(transaction=False) as pipe:
+            for key in {*normalize_tickers(tickers), ALL_TICKERS}:
+                pipe.incr(f"{self.prefix}:version:{key}")
+            pipe.execute()
+
+    def get(self, key: str) -> CachedResponse | None:
+        # A hash keeps the body as raw bytes, so Arrow and MessagePack bodies round-trip.
+        # The ``response`` namespace avoids WRONGTYPE on string entries left by older builds.
+        fields = self.client.hgetall(f"{self.prefix}:response:{key}")
+        if not fields:
+            return None
+        last_modified = fields[b"last_modified"].decode()
+        return CachedResponse(
+            token=fields[b"token"].decode(),
+            body=fields[b"body"],
+            etag=fields[b"etag"].decode(),
+            last_modified=datetime.fromisoformat(last_modified) if last_modified else None,
+        )
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        name = f"{self.prefix}:response:{key}"
+        with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                name,
+                mapping={
+                    "token": entry.token,
+                    "body": entry.body,
+                    "etag": entry.etag,
+                    "last_modified": entry.last_modified.isoformat() if entry.last_modified else "",
+                },
+            )
+            pipe.expire(name, self.ttl_seconds)
+            pipe.execute()
+
+
+_caches: "weakref.WeakSet[ResponseCache]" = weakref.WeakSet()
+
+
+def invalidate_tickers(tickers: Iterable[str]) -> None:
+    """Bump the cached-response version of ``tickers`` in every cache of this process.
+
+    A Redis cache shares versions across workers; in-process caches elsewhere
+    keep their entries until they expire.
+    """
+    tickers = list(tickers)
+    for cache in list(_caches):
+        try:
+            cache.bump(tickers)
+        except Exception:  # pragma: no cover - cache backend outage
+            log.warning("Failed to invalidate response cache for %s", tickers, exc_info=True)
+
+
+def build_response_cache(settings: Settings | None = None) -> ResponseCache:
+    settings = settings or get_settings()
+    if settings.redis_url and redis is not None:
+        try:
+            client = redis.from_url(settings.redis_url)
+            return RedisResponseCache(client, ttl_seconds=settings.response_cache_ttl_seconds)
+        except Exception:  # pragma: no cover - fallback to memory
+            log.warning("Redis unavailable for response cache; using in-process cache", exc_info=True)
+    return InMemoryResponseCache(
+        max_entries=settings.response_cache_max_entries,
+        ttl_seconds=settings.response_cache_ttl_seconds,
+    )
+
+
+async def get_response_cache(request: Request) -> ResponseCache:
+    cache: ResponseCache = request.app.state.response_cache
+    return cache
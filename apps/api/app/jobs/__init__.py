@@ -1 +1 @@
-__all__ = ["scheduler"]
+__all__ = ["metrics", "pipeline", "scheduler"]
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable, Optional, Sequence
+from uuid import uuid4
+
+from app.schemas import IngestResult
+
+if TYPE_CHECKING:
+    from app.jobs.pipeline import IngestPipeline, TickerWork
+
+log = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class IngestJob:
+    id: str
+    tickers: list[str]
+    status: str = JOB_QUEUED
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    results: list[IngestResult] = field(default_factory=list)
+    failed_tickers: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self._done.wait(timeout)
+
+
+def _default_pipeline() -> IngestPipeline:
+    # Imported on the first job so API processes load pandas, yfinance and VADER only once they ingest.
+    from app.jobs.pipeline import IngestPipeline
+
+    return IngestPipeline()
+
+
+class IngestJobManager:
+    """Runs manual ingest requests in the background, one job at a time.
+
+    Submissions are single-flight: a request whose tickers are all part of the
+    running job is answered with that job, and anything else is merged into
+    the one queued job, so at most one job is running and one is waiting.
+    """
+
+    def __init__(
+        self,
+        pipeline_factory: Callable[[], IngestPipeline] = _default_pipeline,
+        max_retained: int = 256,
+    ) -> None:
+        self._pipeline_factory = pipeline_factory
+        self._max_retained = max_retained
+        self._jobs: OrderedDict[str, IngestJob] = OrderedDict()
+        self._queued: IngestJob | None = None
+        self._running: IngestJob | None = None
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._worker: threading.Thread | None = None
+
+    def submit(self, tickers: Sequence[str]) -> IngestJob:
+        requested = list(dict.fromkeys(tickers))
+        with self._lock:
+            running = self._running
+            if running is not None and set(requested) <= set(running.tickers):
+                return running
+            if self._queued is not None:
+                queued = self._queued
+                queued.tickers.extend(t for t in requested if t not in queued.tickers)
+                return queued
+
+            job = IngestJob(id=uuid4().hex, tickers=requested)
+            self._jobs[job.id] = job
+            self._queued = job
+            self._evict_finished()
+            self._ensure_worker()
+            self._wakeup.notify()
+            return job
+
+    def get(self, job_id: str) -> IngestJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._work, name="ingest-jobs", daemon=True)
+            self._worker.start()
+
+    def _evict_finished(self) -> None:
+        while len(self._jobs) > self._max_retained:
+            oldest_id = next(
+                (job_id for job_id, job in self._jobs.items() if job._done.is_set()),
+                None,
+            )
+            if oldest_id is None:
+                return
+            del self._jobs[oldest_id]
+
+    def _work(self) -> None:
+        while True:
+            with self._lock:
+                while self._queued is None:
+                    self._wakeup.wait()
+                job = self._queued
+                self._queued = None
+                self._running = job
+                job.status = JOB_RUNNING
+                job.started_at = datetime.now(timezone.utc)
+                tickers = list(job.tickers)
+
+            try:
+                works = asyncio.run(self._pipeline_factory().run(tickers))
+                job.results = [_to_result(work) for work in works if work.market is not None]
+                job.failed_tickers = [work.ticker for work in works if work.error]
+                job.status = JOB_SUCCEEDED
+            except Exception as exc:
+                log.exception("Ingest job %s failed", job.id)
+                job.error = str(exc)
+                job.status = JOB_FAILED
+            finally:
+                with self._lock:
+                    self._running = None
+                    job.finished_at = datetime.now(timezone.utc)
+                    job._done.set()
+
+
+def _to_result(work: TickerWork) -> IngestResult:
+    assert work.market is not None
+    sentiment_score = work.sentiment.average_score if work.sentiment else None
+    return IngestResult(
+        ticker=work.ticker,
+        ingested_at=work.market.ingested_at,
+        market_records=work.market.market_records,
+        indicator_records=work.market.indicator_records,
+        phase=work.phase,
+        phase_confidence=work.phase_confidence,
+        sentiment_score=round(sentiment_score, 4) if sentiment_score is not None else None,
+    )
+
+
+ingest_jobs = IngestJobManager()
+
+
+def get_ingest_jobs() -> IngestJobManager:
+    return ingest_jobs
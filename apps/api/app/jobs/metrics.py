@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+
+@dataclass
+class StageStats:
+    """Cumulative counters for one ingest pipeline stage."""
+
+    name: str
+    workers: int = 1
+    processed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+
+    @property
+    def throughput(self) -> float:
+        """Items completed per second of busy worker time."""
+        if self.busy_seconds <= 0:
+            return 0.0
+        return self.processed / self.busy_seconds
+
+    def observe_queue(self, depth: int) -> None:
+        self.queue_depth = depth
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+
+@dataclass
+class PipelineStats:
+    stages: dict[str, StageStats] = field(default_factory=dict)
+
+    def stage(self, name: str, workers: int = 1) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats(name=name)
+        stats.workers = workers
+        return stats
+
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0)
+
+
+@dataclass
+class LatencyHistogram:
+    """Cumulative histogram with Prometheus-style ``le`` buckets (seconds)."""
+
+    bounds: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    counts: list[int] = field(default_factory=list)
+    total: int = 0
+    sum_seconds: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, seconds: float) -> None:
+        self.total += 1
+        self.sum_seconds += seconds
+        for index, bound in enumerate(self.bounds):
+            if seconds <= bound:
+                self.counts[index] += 1
+                return
+        self.counts[-1] += 1
+
+    def buckets(self) -> list[dict[str, float | int | None]]:
+        cumulative = 0
+        rows: list[dict[str, float | int | None]] = []
+        for bound, count in zip((*self.bounds, None), self.counts):
+            cumulative += count
+            rows.append({"le": bound, "count": cumulative})
+        return rows
+
+
+@dataclass
+class CycleStats:
+    """Counters for the fixed-rate ingest scheduler."""
+
+    interval_seconds: float = 0.0
+    cycles: int = 0
+    overruns: int = 0
+    skipped_cycles: int = 0
+    last_cycle_seconds: float | None = None
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def record_cycle(self, seconds: float) -> None:
+        self.cycles += 1
+        self.last_cycle_seconds = seconds
+        self.latency.observe(seconds)
+
+    def record_overrun(self, skipped: int) -> None:
+        self.overruns += 1
+        self.skipped_cycles += skipped
+
+
+class IngestMetrics:
+    """Process-wide instrumentation for background ingest."""
+
+    def __init__(self) -> None:
+        self.pipeline = PipelineStats()
+        self.scheduler = CycleStats()
+
+    def snapshot(self) -> dict[str, object]:
+        scheduler = self.scheduler
+        return {
+            "scheduler": {
+                "interval_seconds": scheduler.interval_seconds,
+                "cycles": scheduler.cycles,
+                "overruns": scheduler.overruns,
+                "skipped_cycles": scheduler.skipped_cycles,
+                "last_cycle_seconds": scheduler.last_cycle_seconds,
+                "cycle_seconds_sum": round(scheduler.latency.sum_seconds, 4),
+                "cycle_latency": scheduler.latency.buckets(),
+            },
+            "stages": [
+                {
+                    "name": stats.name,
+                    "workers": stats.workers,
+                    "processed": stats.processed,
+                    "failed": stats.failed,
+                    "busy_seconds": round(stats.busy_seconds, 4),
+                    "throughput_per_second": round(stats.throughput, 4),
+                    "queue_depth": stats.queue_depth,
+                    "max_queue_depth": stats.max_queue_depth,
+                }
+                for stats in list(self.pipeline.stages.values())
+            ],
+        }
+
+
+ingest_metrics = IngestMetrics()
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional, Sequence
+
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from app.config import Settings, get_settings
+from app.db.models import Asset
+from app.db.session import SessionLocal
+from app.dependencies.response_cache import invalidate_tickers
+from app.jobs.metrics import PipelineStats, ingest_metrics
+from app.services.classify_phase import PhaseUpdateService
+from app.services.ingest_market import (
+    IngestSummary,
+    MarketIngestor,
+    fetch_price_history,
+    prepare_indicators,
+)
+from app.services.sentiment import (
+    SentimentEntry,
+    SentimentIngestor,
+    SentimentSummary,
+    fetch_recent_news,
+    score_news,
+)
+from app.utils.tickers import resolve_ticker
+
+log = logging.getLogger(__name__)
+
+STAGE_FETCH = "fetch"
+STAGE_INDICATORS = "indicators"
+STAGE_PERSIST = "persist"
+STAGE_CLASSIFY = "classify"
+
+
+@dataclass
+class TickerWork:
+    """State carried by one ticker through the pipeline stages."""
+
+    ticker: str
+    prices: Optional[pd.DataFrame] = None
+    news: list[dict[str, object]] = field(default_factory=list)
+    sentiment_entries: list[SentimentEntry] = field(default_factory=list)
+    market: Optional[IngestSummary] = None
+    sentiment: Optional[SentimentSummary] = None
+    phase: Optional[str] = None
+    phase_confidence: Optional[float] = None
+    error: Optional[str] = None
+
+
+Handler = Callable[[TickerWork], Awaitable[None]]
+
+
+class IngestPipeline:
+    """Streams tickers through fetch → indicators → persist → classify.
+
+    Stages are connected by bounded queues so that a slow stage applies
+    backpressure to the ones before it. Network and CPU bound work runs in
+    worker threads, and every ticker is persisted and classified in its own
+    session so one failure only loses that ticker.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session] = SessionLocal,
+        settings: Settings | None = None,
+        stats: PipelineStats | None = None,
+    ) -> None:
+        self.session_factory = session_factory
+        self.settings = settings or get_settings()
+        self.stats = stats or ingest_metrics.pipeline
+        self.fetch_workers = max(self.settings.ingest_fetch_concurrency, 1)
+        self.queue_size = max(self.settings.ingest_queue_size, 1)
+        self._analyzer: SentimentIntensityAnalyzer | None = None
+
+    @property
+    def analyzer(self) -> SentimentIntensityAnalyzer:
+        if self._analyzer is None:
+            self._analyzer = SentimentIntensityAnalyzer()
+        return self._analyzer
+
+    async def run(self, tickers: Sequence[str]) -> list[TickerWork]:
+        canonical = list(dict.fromkeys(resolve_ticker(t)[0] for t in tickers if t and t.strip()))
+        if not canonical:
+            return []
+
+        fetch_q: asyncio.Queue[TickerWork | None] = asyncio.Queue(self.queue_size)
+        indicator_q: asyncio.Queue[TickerWork | None] = asyncio.Queue(self.queue_size)
+        persist_q: asyncio.Queue[TickerWork | None] = asyncio.Queue(self.queue_size)
+        classify_q: asyncio.Queue[TickerWork | None] = asyncio.Queue(self.queue_size)
+        work_items = [TickerWork(ticker=ticker) for ticker in canonical]
+
+        async def produce() -> None:
+            for work in work_items:
+                await fetch_q.put(work)
+                self.stats.stage(STAGE_FETCH, self.fetch_workers).observe_queue(fetch_q.qsize())
+            for _ in range(self.fetch_workers):
+                await fetch_q.put(None)
+
+        await asyncio.gather(
+            produce(),
+            self._stage(STAGE_FETCH, self._fetch, fetch_q, indicator_q, self.fetch_workers),
+            self._stage(STAGE_INDICATORS, self._indicators, indicator_q, persist_q),
+            self._stage(STAGE_PERSIST, self._persist, persist_q, classify_q),
+            self._stage(STAGE_CLASSIFY, self._classify, classify_q, None),
+        )
+        return work_items
+
+    async def _stage(
+        self,
+        name: str,
+        handler: Handler,
+        inbox: asyncio.Queue[TickerWork | None],
+        outbox: asyncio.Queue[TickerWork | None] | None,
+        workers: int = 1,
+    ) -> None:
+        stats = self.stats.stage(name, workers)
+
+        async def worker() -> None:
+            while True:
+                work = await inbox.get()
+                stats.observe_queue(inbox.qsize())
+                if work is None:
+                    return
+                started = time.perf_counter()
+                try:
+                    await handler(work)
+                except Exception as exc:
+                    stats.failed += 1
+                    work.error = f"{name}: {exc}"
+                    log.exception("Ingest %s stage failed for %s", name, work.ticker)
+                    continue
+                finally:
+                    stats.busy_seconds += time.perf_counter() - started
+                stats.processed += 1
+                if outbox is not None:
+                    await outbox.put(work)
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        if outbox is not None:
+            await outbox.put(None)
+
+    async def _fetch(self, work: TickerWork) -> None:
+        work.prices = await asyncio.to_thread(self._fetch_prices, work.ticker)
+        if self.settings.enable_sentiment:
+            work.news = await asyncio.to_thread(self._fetch_news, work.ticker)
+
+    async def _indicators(self, work: TickerWork) -> None:
+        await asyncio.to_thread(self._compute_indicators, work)
+
+    async def _persist(self, work: TickerWork) -> None:
+        await asyncio.to_thread(self._persist_ticker, work)
+
+    async def _classify(self, work: TickerWork) -> None:
+        await asyncio.to_thread(self._classify_ticker, work)
+
+    def _fetch_prices(self, ticker: str) -> pd.DataFrame:
+        return fetch_price_history(ticker, self.settings.ingest_window_days)
+
+    def _fetch_news(self, ticker: str) -> list[dict[str, object]]:
+        return fetch_recent_news(ticker, timedelta(minutes=self.settings.sentiment_window_minutes))
+
+    def _compute_indicators(self, work: TickerWork) -> None:
+        if work.prices is not None and not work.prices.empty:
+            work.prices = prepare_indicators(work.prices)
+        if work.news:
+            work.sentiment_entries = score_news(self.analyzer, work.news)
+
+    def _persist_ticker(self, work: TickerWork) -> None:
+        with self.session_factory() as session:
+            ingestor = MarketIngestor(session=session, window_days=self.settings.ingest_window_days)
+            frame = work.prices if work.prices is not None else pd.DataFrame()
+            work.market = ingestor.persist_frame(work.ticker, frame)
+            if self.settings.enable_sentiment and work.sentiment_entries:
+                work.sentiment = SentimentIngestor(
+                    session=session,
+                    window_minutes=self.settings.sentiment_window_minutes,
+                    analyzer=self.analyzer,
+                ).persist_scores(work.ticker, work.sentiment_entries)
+            session.commit()
+        invalidate_tickers([work.ticker])
+        # Frames are only needed up to this stage; drop them to keep queued work small.
+        work.prices = None
+        work.news = []
+
+    def _classify_ticker(self, work: TickerWork) -> None:
+        with self.session_factory() as session:
+            asset = session.scalars(select(Asset).where(Asset.ticker == work.ticker)).first()
+            if asset is None:
+                return
+            state = PhaseUpdateService(session).update_asset(asset)
+            if state is not None:
+                work.phase = state.phase
+                work.phase_confidence = state.confidence
+            session.commit()
+        invalidate_tickers([work.ticker])
@@ -1,45 +1,85 @@
 import asyncio
 import logging
-
-from sqlalchemy import select
+import random
+from typing import Callable
 
 from app.config import get_settings
-from app.db.models import Asset
 from app.db.session import SessionLocal
-from app.services.classify_phase import PhaseUpdateService
-from app.services.ingest_market import MarketIngestor
-from app.services.sentiment import SentimentIngestor
-from app.utils.tickers import resolve_ticker
+from app.jobs.metrics import CycleStats, ingest_metrics
+from app.jobs.pipeline import IngestPipeline
+from app.services.universe import refresh_active_universe
 
 log = logging.getLogger(__name__)
 
 
+class FixedRateSchedule:
+    """Computes sleeps for a fixed-rate loop.
+
+    Deadlines advance by ``interval`` from the first run regardless of how long
+    each cycle takes. A cycle that finishes after its next deadline counts as an
+    overrun and the missed deadlines are skipped rather than run back-to-back.
+    Each sleep gets up to ``jitter`` extra seconds so replicas drift apart.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        jitter: float = 0.0,
+        stats: CycleStats | None = None,
+        rng: Callable[[float, float], float] = random.uniform,
+    ) -> None:
+        self.interval = interval
+        self.jitter = min(max(jitter, 0.0), interval / 2)
+        self.stats = stats or CycleStats()
+        self.stats.interval_seconds = interval
+        self._rng = rng
+        self._next_deadline: float | None = None
+
+    def initial_delay(self) -> float:
+        return self._rng(0.0, self.jitter) if self.jitter else 0.0
+
+    def next_delay(self, started: float, finished: float) -> float:
+        self.stats.record_cycle(finished - started)
+        deadline = (self._next_deadline if self._next_deadline is not None else started) + self.interval
+        if finished > deadline:
+            skipped = int((finished - deadline) // self.interval) + 1
+            deadline += skipped * self.interval
+            self.stats.record_overrun(skipped)
+            log.warning(
+                "Ingest cycle took %.1fs (interval %.0fs); skipping %d cycle(s)",
+                finished - started,
+                self.interval,
+                skipped,
+            )
+        self._next_deadline = deadline
+        jitter = self._rng(0.0, self.jitter) if self.jitter else 0.0
+        return max(deadline - finished, 0.0) + jitter
+
+
+def _load_tickers() -> list[str]:
+    with SessionLocal() as session:
+        tickers = refresh_active_universe(session)
+        session.commit()
+    return tickers
+
+
 async def poll_market_data() -> None:
     settings = get_settings()
-    interval = settings.ingest_interval_minutes * 60
+    loop = asyncio.get_running_loop()
+    schedule = FixedRateSchedule(
+        interval=settings.ingest_interval_minutes * 60,
+        jitter=settings.ingest_jitter_seconds,
+        stats=ingest_metrics.scheduler,
+    )
+    pipeline = IngestPipeline()
+    await asyncio.sleep(schedule.initial_delay())
     while True:
+        started = loop.time()
         try:
-            with SessionLocal() as session:
-                asset_rows = session.execute(select(Asset.ticker)).all()
-                dynamic_tickers = {row[0] for row in asset_rows if row[0]}
-                for ticker in settings.ingest_tickers:
-                    if ticker and ticker.strip():
-                        canonical, _ = resolve_ticker(ticker)
-                        dynamic_tickers.add(canonical)
-                tickers = sorted(dynamic_tickers)
-                if not tickers:
-                    await asyncio.sleep(interval)
-                    continue
-
-                ingestor = MarketIngestor(session=session, window_days=settings.ingest_window_days)
-                summaries = ingestor.ingest_many(tickers)
-                if settings.enable_sentiment:
-                    SentimentIngestor(session=session, window_minutes=settings.sentiment_window_minutes).ingest_many(
-                        tickers
-                    )
-                PhaseUpdateService(session).update_assets_by_ticker(tickers)
-                session.commit()
-                log.debug("Ingest summaries: %s", summaries)
+            tickers = await asyncio.to_thread(_load_tickers)
+            if tickers:
+                results = await pipeline.run(tickers)
+                log.debug("Ingest summaries: %s", [work.market for work in results])
         except Exception as exc:  # pragma: no cover - background logging
             log.exception("Scheduled ingest failed: %s", exc)
-        await asyncio.sleep(interval)
+        await asyncio.sleep(schedule.next_delay(started, loop.time()))
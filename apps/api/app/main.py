@@ -1,38 +1,65 @@
 from contextlib import asynccontextmanager
 import asyncio
 
-import sentry_sdk
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sentry_sdk.integrations.fastapi import FastApiIntegration
-from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
 
 from app.config import get_settings
-from app.db.session import init_database
-from app.jobs.scheduler import poll_market_data
-from app.routers import assets, auth, health, ingest, phase, snapshots, watchlist
+from app.db.schema import prepare_schema
+from app.db.session import get_engine
+from app.dependencies.response_cache import build_response_cache
+from app.routers import assets, auth, dashboard, health, ingest, phase, snapshots, watchlist
 
 
-def create_app(init_db: bool = True) -> FastAPI:
-    settings = get_settings()
+def _init_sentry(dsn: str) -> None:
+    import sentry_sdk
+    from sentry_sdk.integrations.fastapi import FastApiIntegration
+    from sentry_sdk.integrations.sqlalchemy import SqlalchemyIntegration
 
-    if settings.sentry_dsn and not sentry_sdk.Hub.current.client:
+    if not sentry_sdk.Hub.current.client:
         sentry_sdk.init(
-            dsn=settings.sentry_dsn,
+            dsn=dsn,
             integrations=[FastApiIntegration(), SqlalchemyIntegration()],
             traces_sample_rate=0.2,
         )
 
+
+def create_app(init_db: bool = True) -> FastAPI:
+    settings = get_settings()
+
+    if settings.sentry_dsn:
+        _init_sentry(settings.sentry_dsn)
+
+    # Background loops are imported only when enabled: the ingest poller pulls in
+    # pandas, yfinance and VADER, which API-only replicas never need.
     @asynccontextmanager
     async def lifespan(_: FastAPI):
-        background_task: asyncio.Task | None = None
+        background_tasks: list[asyncio.Task] = []
         if init_db:
-            init_database()
+            # Alembic (or `python -m app.db.schema bootstrap`) owns the schema; startup only checks
+            # its revision and creates upcoming partitions.
+            await asyncio.to_thread(
+                prepare_schema, get_engine(), settings.schema_wait_seconds, settings.partition_months_ahead
+            )
         if settings.ingest_interval_minutes > 0:
-            background_task = asyncio.create_task(poll_market_data())
+            from app.jobs.scheduler import poll_market_data
+
+            background_tasks.append(asyncio.create_task(poll_market_data()))
+        if settings.enable_phase_alerts:
+            from app.services.alerts import run_alert_dispatcher
+
+            background_tasks.append(asyncio.create_task(run_alert_dispatcher()))
+        if settings.demand_flush_seconds > 0:
+            from app.services.universe import run_demand_flusher
+
+            background_tasks.append(asyncio.create_task(run_demand_flusher()))
+        if settings.retention_interval_minutes > 0:
+            from app.services.retention import run_retention
+
+            background_tasks.append(asyncio.create_task(run_retention()))
         yield
-        if background_task:
-            background_task.cancel()
+        for task in background_tasks:
+            task.cancel()
 
     application = FastAPI(
         title=settings.api_title,
@@ -41,6 +68,7 @@ def create_app(init_db: bool = True) -> FastAPI:
         redoc_url="/redoc",
         lifespan=lifespan,
     )
+    application.state.response_cache = build_response_cache(settings)
 
     application.add_middleware(
         CORSMiddleware,
@@ -54,6 +82,7 @@ def create_app(init_db: bool = True) -> FastAPI:
     application.include_router(auth.router, tags=["auth"])
     application.include_router(assets.router, prefix="/assets", tags=["assets"])
     application.include_router(watchlist.router, tags=["watchlist"])
+    application.include_router(dashboard.router, tags=["dashboard"])
     application.include_router(ingest.router, prefix="/ingest", tags=["ingest"])
     application.include_router(phase.router, tags=["phase"])
     application.include_router(snapshots.router, tags=["snapshots"])
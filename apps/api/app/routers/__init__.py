@@ -1 +1 @@
-__all__ = ["health", "assets", "ingest", "phase", "snapshots", "auth", "watchlist"]
+__all__ = ["health", "assets", "ingest", "phase", "snapshots", "auth", "watchlist", "dashboard"]
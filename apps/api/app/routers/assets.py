@@ -8,6 +8,7 @@ from app.db.models import Asset
 from app.db.session import get_session
 from app.schemas import AssetCreate, AssetRead
 from app.dependencies.rate_limit import enforce_rate_limit
+from app.services.universe import record_demand
 from app.utils.assets import get_or_create_asset
 
 router = APIRouter()
@@ -35,6 +36,7 @@ def create_asset(
         name=payload.name,
         exchange=payload.exchange,
     )
+    record_demand(session, [asset.ticker])
     session.flush()
     session.refresh(asset)
     return asset
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 
 from app.db.models import User
 from app.db.session import get_session
+from app.dependencies.auth import get_session_cache
 from app.schemas import GuestSession
 
 router = APIRouter()
@@ -29,3 +30,6 @@ def revoke_session(token: str, session: Session = Depends(get_session)) -> None:
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
     session.delete(user)
+    session.commit()
+    # Evict after the commit so a concurrent lookup cannot re-cache the revoked token.
+    get_session_cache().invalidate(token)
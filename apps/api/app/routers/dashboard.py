@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Asset, AssetLatest, UserAsset
+from app.db.session import get_async_session
+from app.dependencies.auth import get_current_user_id_async
+from app.dependencies.rate_limit import enforce_rate_limit
+from app.schemas import DashboardItem
+from app.services.latest_state import indicator_snapshot_read, market_snapshot_read
+from app.services.phase_events import phase_state_read
+
+router = APIRouter()
+
+
+def _to_dashboard_item(user_asset: UserAsset, asset: Asset, latest: AssetLatest | None) -> DashboardItem:
+    item = DashboardItem(
+        ticker=asset.ticker,
+        display_ticker=asset.display_ticker or asset.ticker,
+        name=asset.name,
+        type=asset.type,
+        order=user_asset.display_order,
+    )
+    if latest is None:
+        return item
+    if latest.phase is not None:
+        item.phase = phase_state_read(latest, asset)
+    if latest.market_as_of is not None:
+        item.market = market_snapshot_read(latest, asset)
+    if latest.indicator_as_of is not None:
+        item.indicators = indicator_snapshot_read(latest, asset)
+    return item
+
+
+@router.get("/dashboard", response_model=list[DashboardItem])
+async def get_dashboard(
+    user_id: UUID = Depends(get_current_user_id_async),
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(enforce_rate_limit),
+) -> list[DashboardItem]:
+    """The watchlist with each asset's phase, sentiment, market and indicator state.
+
+    Served by one query against ``asset_latest`` regardless of watchlist size.
+    """
+    stmt = (
+        select(UserAsset, Asset, AssetLatest)
+        .join(Asset, UserAsset.asset_id == Asset.id)
+        .outerjoin(AssetLatest, AssetLatest.asset_id == Asset.id)
+        .where(UserAsset.user_id == user_id)
+        .order_by(UserAsset.display_order.asc().nullslast(), UserAsset.created_at.asc())
+    )
+    rows = (await session.execute(stmt)).all()
+    return [_to_dashboard_item(user_asset, asset, latest) for user_asset, asset, latest in rows]
@@ -1,16 +1,16 @@
 from typing import Sequence
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
 from app.db.models import Asset
 from app.db.session import get_session
-from app.schemas import IngestRequest, IngestResult
-from app.services.classify_phase import PhaseUpdateService
-from app.services.ingest_market import MarketIngestor
-from app.services.sentiment import SentimentIngestor, SentimentSummary
+from app.jobs.ingest_jobs import IngestJob, IngestJobManager, get_ingest_jobs
+from app.jobs.metrics import ingest_metrics
+from app.schemas import IngestJobRead, IngestRequest, IngestStats
+from app.services.universe import record_demand
 from app.dependencies.rate_limit import enforce_rate_limit
 from app.utils.tickers import resolve_ticker
 
@@ -28,55 +28,56 @@ def _resolve_tickers(session: Session, request_tickers: list[str] | None, defaul
             if ticker and ticker.strip():
                 canonical, _ = resolve_ticker(ticker)
                 tickers.add(canonical)
+        record_demand(session, request_tickers)
     if not tickers:
-        tickers = {row[0] for row in session.execute(select(Asset.ticker)).all() if row[0]}
+        tickers = {
+            row[0]
+            for row in session.execute(select(Asset.ticker).where(Asset.is_active.is_(True))).all()
+            if row[0]
+        }
     return sorted(tickers)
 
 
-@router.post("/run", response_model=Sequence[IngestResult])
+@router.post("/run", response_model=IngestJobRead, status_code=status.HTTP_202_ACCEPTED)
 def run_ingest(
     payload: IngestRequest | None = None,
     session: Session = Depends(get_session),
+    jobs: IngestJobManager = Depends(get_ingest_jobs),
     _: None = Depends(enforce_rate_limit),
-) -> Sequence[IngestResult]:
+) -> IngestJobRead:
     settings = get_settings()
     tickers = _resolve_tickers(session, payload.tickers if payload else None, settings.ingest_tickers)
     if not tickers:
-        return []
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No tickers to ingest")
+    return _to_job_read(jobs.submit(tickers))
 
-    ingestor = MarketIngestor(session=session, window_days=settings.ingest_window_days)
-    summaries = ingestor.ingest_many(tickers)
-    sentiment_summaries: list[SentimentSummary] = []
-    if settings.enable_sentiment:
-        sentiment_summaries = SentimentIngestor(
-            session=session, window_minutes=settings.sentiment_window_minutes
-        ).ingest_many(tickers)
-    phase_states = PhaseUpdateService(session).update_assets_by_ticker(tickers)
 
-    phase_by_ticker = {}
-    for state in phase_states:
-        asset = session.get(Asset, state.asset_id)
-        if asset:
-            phase_by_ticker[asset.ticker] = state
+@router.get("/jobs/{job_id}", response_model=IngestJobRead)
+def get_ingest_job(
+    job_id: str,
+    jobs: IngestJobManager = Depends(get_ingest_jobs),
+    _: None = Depends(enforce_rate_limit),
+) -> IngestJobRead:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Ingest job {job_id} not found")
+    return _to_job_read(job)
+
+
+def _to_job_read(job: IngestJob) -> IngestJobRead:
+    return IngestJobRead(
+        id=job.id,
+        status=job.status,
+        tickers=list(job.tickers),
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        results=list(job.results),
+        failed_tickers=list(job.failed_tickers),
+        error=job.error,
+    )
 
-    sentiment_by_ticker = {summary.ticker: summary for summary in sentiment_summaries}
 
-    results = []
-    for summary in summaries:
-        state = phase_by_ticker.get(summary.ticker)
-        results.append(
-            IngestResult(
-                ticker=summary.ticker,
-                ingested_at=summary.ingested_at,
-                market_records=summary.market_records,
-                indicator_records=summary.indicator_records,
-                phase=state.phase if state else None,
-                phase_confidence=state.confidence if state else None,
-                sentiment_score=(
-                    round(sentiment_by_ticker[summary.ticker].average_score, 4)
-                    if summary.ticker in sentiment_by_ticker and sentiment_by_ticker[summary.ticker].average_score is not None
-                    else None
-                ),
-            )
-        )
-    return results
+@router.get("/stats", response_model=IngestStats)
+def ingest_stats(_: None = Depends(enforce_rate_limit)) -> IngestStats:
+    return IngestStats.model_validate(ingest_metrics.snapshot())
@@ -1,166 +1,259 @@
+from __future__ import annotations
+
+import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, AsyncIterator, Optional, cast
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import Select, desc, select
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import Select, SQLColumnExpression, String, bindparam, desc, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Asset, PhaseHistory, PhaseState, SentimentObservation
-from app.db.session import get_session
+from app.config import get_settings
+from app.db.models import Asset, AssetLatest, PhaseHistory, UserAsset, raw_guid
+from app.db.session import get_async_session
 from app.schemas import PhaseHistoryRead, PhaseStateRead
+from app.dependencies.auth import lookup_user_id_async
 from app.dependencies.rate_limit import enforce_rate_limit
+from app.dependencies.response_cache import ResponseCache, get_response_cache, max_timestamp
+from app.services.phase_events import KEEPALIVE, PhaseEventBroker, get_phase_events
+from app.services.universe import demand_buffer
+from app.utils.assets import asset_by_ticker
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.encoding import (
+    BINARY_RESPONSES,
+    FLOAT_COLUMN,
+    JSON_MEDIA_TYPE,
+    STRING_COLUMN,
+    TIMESTAMP_COLUMN,
+    UUID_COLUMN,
+    ColumnSpec,
+    fast_json,
+    negotiate_media_type,
+    render_rows,
+    row_dicts,
+)
+from app.utils.tickers import resolve_ticker
 
 router = APIRouter()
 
+_PHASE_STATES = TypeAdapter(list[PhaseStateRead])
+_PHASE_STATE = TypeAdapter(PhaseStateRead)
 
-def _asset_by_ticker(session: Session, ticker: str) -> Asset:
-    normalized = ticker.upper()
-    asset = session.scalars(select(Asset).where(Asset.ticker == normalized)).first()
-    if not asset:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Asset with ticker {normalized} not found",
-        )
-    return asset
+_PHASE_COLUMNS: tuple[tuple[SQLColumnExpression[Any], ColumnSpec], ...] = (
+    (raw_guid(Asset.id), ColumnSpec("asset_id", UUID_COLUMN)),
+    (Asset.ticker, ColumnSpec("ticker", STRING_COLUMN)),
+    (func.coalesce(Asset.display_ticker, Asset.ticker), ColumnSpec("display_ticker", STRING_COLUMN)),
+    (Asset.name, ColumnSpec("asset_name", STRING_COLUMN)),
+    (Asset.type, ColumnSpec("asset_type", STRING_COLUMN)),
+    (AssetLatest.phase, ColumnSpec("phase", STRING_COLUMN)),
+    (AssetLatest.confidence, ColumnSpec("confidence", FLOAT_COLUMN)),
+    (AssetLatest.rationale, ColumnSpec("rationale", STRING_COLUMN)),
+    (AssetLatest.computed_at, ColumnSpec("computed_at", TIMESTAMP_COLUMN)),
+    (AssetLatest.sentiment_score, ColumnSpec("sentiment_score", FLOAT_COLUMN)),
+    (AssetLatest.sentiment_delta, ColumnSpec("sentiment_delta", FLOAT_COLUMN)),
+)
+_PHASE_SPECS = [spec for _, spec in _PHASE_COLUMNS]
+
+# Row shape of _PHASE_COLUMNS: asset_id, ticker, display_ticker, asset_name, asset_type,
+# phase, confidence, rationale, computed_at, sentiment_score, sentiment_delta.
+_PhaseRow = tuple[
+    str,
+    str,
+    str,
+    str | None,
+    str,
+    str | None,
+    float | None,
+    str | None,
+    datetime | None,
+    float | None,
+    float | None,
+]
+
+# Built once so requests reuse the compiled statements; tickers are bound per call.
+_PHASE_STATES_STMT: Select[*_PhaseRow] = (
+    select(*(column.label(spec.name) for column, spec in _PHASE_COLUMNS))
+    .select_from(AssetLatest)
+    .join(Asset, AssetLatest.asset_id == Asset.id)
+    .where(AssetLatest.phase.is_not(None))
+    .order_by(Asset.ticker.asc())
+)
+_PHASE_STATES_FOR_STMT: Select[*_PhaseRow] = _PHASE_STATES_STMT.where(
+    Asset.ticker.in_(bindparam("tickers", expanding=True))
+)
+# Outer join so a missing asset and a missing phase state can be told apart.
+_PHASE_STATE_STMT: Select[*_PhaseRow] = (
+    select(*(column.label(spec.name) for column, spec in _PHASE_COLUMNS))
+    .select_from(Asset)
+    .outerjoin(AssetLatest, AssetLatest.asset_id == Asset.id)
+    .where(Asset.ticker == bindparam("ticker"))
+    .limit(1)
+)
+_PHASE_HISTORY = TypeAdapter(list[PhaseHistoryRead])
+_PHASE_HISTORY_COLUMNS: tuple[tuple[SQLColumnExpression[Any], ColumnSpec], ...] = (
+    (raw_guid(PhaseHistory.id), ColumnSpec("id", UUID_COLUMN)),
+    (raw_guid(PhaseHistory.asset_id), ColumnSpec("asset_id", UUID_COLUMN)),
+    (bindparam("ticker", type_=String()), ColumnSpec("ticker", STRING_COLUMN)),
+    (PhaseHistory.from_phase, ColumnSpec("from_phase", STRING_COLUMN)),
+    (PhaseHistory.to_phase, ColumnSpec("to_phase", STRING_COLUMN)),
+    (PhaseHistory.confidence, ColumnSpec("confidence", FLOAT_COLUMN)),
+    (PhaseHistory.rationale, ColumnSpec("rationale", STRING_COLUMN)),
+    (PhaseHistory.changed_at, ColumnSpec("changed_at", TIMESTAMP_COLUMN)),
+)
+# id, asset_id, ticker, from_phase, to_phase, confidence, rationale, changed_at.
+_HistoryRow = tuple[str, str, str, str | None, str, float | None, str | None, datetime]
+# A cast because select() overloads cannot see the row shape through the generator.
+_PHASE_HISTORY_STMT = cast(
+    "Select[*_HistoryRow]",
+    select(*(column.label(spec.name) for column, spec in _PHASE_HISTORY_COLUMNS)).order_by(
+        desc(PhaseHistory.changed_at), desc(PhaseHistory.id)
+    ),
+)
 
 
-@router.get("/phase", response_model=list[PhaseStateRead])
-def list_phase_states(
+@router.get("/phase", response_model=list[PhaseStateRead], responses=BINARY_RESPONSES)
+async def list_phase_states(
+    request: Request,
     tickers: list[str] | None = Query(default=None, description="Optional tickers to filter"),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
+    cache: ResponseCache = Depends(get_response_cache),
     _: None = Depends(enforce_rate_limit),
-) -> list[PhaseStateRead]:
-    stmt: Select = (
-        select(PhaseState, Asset)
-        .join(Asset, PhaseState.asset_id == Asset.id)
-        .order_by(Asset.ticker.asc())
-    )
+) -> Response:
+    media_type = negotiate_media_type(request)
 
-    if tickers:
-        normalized = [t.strip().upper() for t in tickers if t.strip()]
+    async def build() -> tuple[bytes, Optional[datetime]]:
+        normalized = [t.strip().upper() for t in tickers or [] if t.strip()]
         if normalized:
-            stmt = stmt.where(Asset.ticker.in_(normalized))
-    rows = session.execute(stmt).all()
-    asset_ids = [state.asset_id for state, _ in rows]
-    sentiment_map: dict[str, tuple[float | None, float | None]] = {}
-
-    if asset_ids:
-        observations = session.execute(
-            select(SentimentObservation)
-            .where(SentimentObservation.asset_id.in_(asset_ids))
-            .order_by(SentimentObservation.asset_id, SentimentObservation.observed_at.desc())
-        ).scalars().all()
-
-        per_asset: dict[str, list[SentimentObservation]] = {}
-        for obs in observations:
-            bucket = per_asset.setdefault(str(obs.asset_id), [])
-            if len(bucket) < 2:
-                bucket.append(obs)
-
-        for asset_id, bucket in per_asset.items():
-            latest = bucket[0]
-            previous = bucket[1] if len(bucket) > 1 else None
-            latest_score = float(latest.score) if latest.score is not None else None
-            delta = None
-            if latest_score is not None and previous and previous.score is not None:
-                delta = float(latest.score - previous.score)
-            sentiment_map[asset_id] = (latest_score, delta)
-
-    results: list[PhaseStateRead] = []
-    for state, asset in rows:
-        sentiment_score, sentiment_delta = sentiment_map.get(str(state.asset_id), (None, None))
-        results.append(
-            PhaseStateRead(
-                asset_id=state.asset_id,
-                ticker=asset.ticker,
-                display_ticker=asset.display_ticker or asset.ticker,
-                asset_name=asset.name,
-                asset_type=asset.type,
-                phase=state.phase,
-                confidence=state.confidence,
-                rationale=state.rationale,
-                computed_at=state.computed_at,
-                sentiment_score=sentiment_score,
-                sentiment_delta=sentiment_delta,
-            )
+            demand_buffer.note(normalized)
+            result = await session.execute(_PHASE_STATES_FOR_STMT, {"tickers": normalized})
+        else:
+            result = await session.execute(_PHASE_STATES_STMT)
+        rows = result.all()
+        body = render_rows(media_type, _PHASE_SPECS, rows, _PHASE_STATES)
+        return body, max_timestamp(row.computed_at for row in rows)
+
+    return await cache.respond(request, tickers, build, media_type)
+
+
+@router.get("/phase/stream", response_class=StreamingResponse)
+async def stream_phase_events(
+    tickers: list[str] | None = Query(default=None, description="Optional tickers to follow"),
+    token: str | None = Header(default=None, alias="X-Session-Token", description="Follow this session's watchlist"),
+    session: AsyncSession = Depends(get_async_session, scope="function"),
+    broker: PhaseEventBroker = Depends(get_phase_events),
+    _: None = Depends(enforce_rate_limit),
+) -> StreamingResponse:
+    """Server-Sent Events for phase transitions and latest-state updates.
+
+    ``transition`` events carry a ``PhaseHistoryRead`` and ``latest`` events a
+    ``PhaseStateRead``. Without ``tickers`` or an ``X-Session-Token`` header every
+    asset is streamed; a watchlist is resolved once, when the stream opens. The
+    token is read from the header, never the URL, so it stays out of access logs.
+    """
+    wanted: set[str] | None = None
+    if tickers:
+        wanted = {resolve_ticker(t.strip())[0] for t in tickers if t.strip()}
+    if token:
+        user_id = await lookup_user_id_async(session, token)
+        if user_id is None:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid session token")
+        watched = await session.scalars(
+            select(Asset.ticker)
+            .join(UserAsset, UserAsset.asset_id == Asset.id)
+            .where(UserAsset.user_id == user_id)
         )
-    return results
+        wanted = (wanted or set()) | set(watched)
+
+    subscription = broker.subscribe(wanted)
+    heartbeat = get_settings().phase_stream_heartbeat_seconds
+
+    async def events() -> AsyncIterator[bytes]:
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(subscription.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE
+                    continue
+                if item is None:
+                    return
+                yield item.encode()
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/phase/{ticker}", response_model=PhaseStateRead)
-def get_phase_state(
+async def get_phase_state(
+    request: Request,
     ticker: str,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
+    cache: ResponseCache = Depends(get_response_cache),
     _: None = Depends(enforce_rate_limit),
-) -> PhaseStateRead:
-    asset = _asset_by_ticker(session, ticker)
-    state = session.get(PhaseState, asset.id)
-    if state is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Phase state not available for {asset.ticker}",
-        )
+) -> Response:
+    async def build() -> tuple[bytes, Optional[datetime]]:
+        normalized = ticker.upper()
+        row = (await session.execute(_PHASE_STATE_STMT, {"ticker": normalized})).first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Asset with ticker {normalized} not found",
+            )
+        demand_buffer.note([normalized])
+        if row.phase is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Phase state not available for {normalized}",
+            )
+        body = fast_json(row_dicts(_PHASE_SPECS, [row])[0])
+        if body is None:
+            body = _PHASE_STATE.dump_json(_PHASE_STATE.validate_python(row._mapping))
+        return body, max_timestamp([row.computed_at])
 
-    sentiment_score = None
-    sentiment_delta = None
-    sentiment_rows = session.execute(
-        select(SentimentObservation)
-        .where(SentimentObservation.asset_id == asset.id)
-        .order_by(SentimentObservation.observed_at.desc())
-        .limit(2)
-    ).scalars().all()
-    if sentiment_rows:
-        sentiment_score = float(sentiment_rows[0].score) if sentiment_rows[0].score is not None else None
-        if len(sentiment_rows) > 1 and sentiment_rows[0].score is not None and sentiment_rows[1].score is not None:
-            sentiment_delta = float(sentiment_rows[0].score - sentiment_rows[1].score)
-
-    return PhaseStateRead(
-        asset_id=asset.id,
-        ticker=asset.ticker,
-        display_ticker=asset.display_ticker or asset.ticker,
-        asset_name=asset.name,
-        asset_type=asset.type,
-        phase=state.phase,
-        confidence=state.confidence,
-        rationale=state.rationale,
-        computed_at=state.computed_at,
-        sentiment_score=sentiment_score,
-        sentiment_delta=sentiment_delta,
-    )
+    return await cache.respond(request, [ticker], build)
 
 
 @router.get("/phase/{ticker}/history", response_model=list[PhaseHistoryRead])
-def get_phase_history(
+async def get_phase_history(
     ticker: str,
     limit: int = Query(default=20, ge=1, le=200),
-    session: Session = Depends(get_session),
+    cursor: Optional[str] = Query(default=None, description="X-Next-Cursor from the previous page"),
+    session: AsyncSession = Depends(get_async_session),
     _: None = Depends(enforce_rate_limit),
     since_minutes: Optional[int] = Query(default=None, ge=1),
-) -> list[PhaseHistoryRead]:
-    asset = _asset_by_ticker(session, ticker)
-
-    stmt = (
-        select(PhaseHistory)
-        .where(PhaseHistory.asset_id == asset.id)
-        .order_by(desc(PhaseHistory.changed_at))
-        .limit(limit)
-    )
+) -> Response:
+    """Newest-first phase transitions.
+
+    Pages are keyset-paginated on ``(changed_at, id)`` within the asset, so
+    each one is a single range scan of ``ix_phase_history_asset_changed``.
+    When more rows exist the ``X-Next-Cursor`` header carries the token for
+    the next page.
+    """
+    asset = await asset_by_ticker(session, ticker)
+
+    stmt = _PHASE_HISTORY_STMT.where(PhaseHistory.asset_id == asset.id).limit(limit + 1)
 
     if since_minutes is not None:
         window_start = datetime.now(timezone.utc) - timedelta(minutes=since_minutes)
         stmt = stmt.where(PhaseHistory.changed_at >= window_start)
+    if cursor is not None:
+        changed_at, entry_id = decode_cursor(cursor)
+        if entry_id is None:
+            stmt = stmt.where(PhaseHistory.changed_at < changed_at)
+        else:
+            stmt = stmt.where(tuple_(PhaseHistory.changed_at, PhaseHistory.id) < (changed_at, entry_id))
 
-    history_rows = session.scalars(stmt).all()
-    return [
-        PhaseHistoryRead(
-            id=entry.id,
-            asset_id=entry.asset_id,
-            ticker=asset.ticker,
-            from_phase=entry.from_phase,
-            to_phase=entry.to_phase,
-            confidence=entry.confidence,
-            rationale=entry.rationale,
-            changed_at=entry.changed_at,
-        )
-        for entry in history_rows
-    ]
+    rows = (await session.execute(stmt, {"ticker": asset.ticker})).all()
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(rows[-1].changed_at, rows[-1].id)
+    body = render_rows(JSON_MEDIA_TYPE, [spec for _, spec in _PHASE_HISTORY_COLUMNS], rows, _PHASE_HISTORY)
+    return Response(content=body, media_type=JSON_MEDIA_TYPE, headers=headers)
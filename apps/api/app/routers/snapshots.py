@@ -1,112 +1,268 @@
-from typing import Iterable
+from __future__ import annotations
 
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import Select, func, select
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Literal, Optional, Sequence
 
-from app.db.models import Asset, IndicatorSnapshot, MarketSnapshot
-from app.db.session import get_session
-from app.schemas import IndicatorSnapshotRead, MarketSnapshotRead
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import Select, SQLColumnExpression, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Asset, AssetLatest, raw_guid
+from app.db.session import get_async_session
+from app.schemas import IndicatorSnapshotRead, MarketSnapshotRead, SnapshotSeriesPage
 from app.dependencies.rate_limit import enforce_rate_limit
+from app.dependencies.response_cache import ResponseCache, get_response_cache, max_timestamp
+from app.services.series import (
+    LTTB_OVERSAMPLE,
+    SERIES_COLUMNS,
+    bucket_width,
+    bucketed_rows,
+    lttb_rows,
+    series_bounds,
+    series_points,
+)
+from app.services.universe import demand_buffer
+from app.utils.assets import asset_by_ticker
+from app.utils.cursor import decode_cursor, encode_cursor
+from app.utils.encoding import (
+    BINARY_RESPONSES,
+    FLOAT_COLUMN,
+    JSON_MEDIA_TYPE,
+    STRING_COLUMN,
+    TIMESTAMP_COLUMN,
+    UUID_COLUMN,
+    ColumnSpec,
+    encode_rows,
+    fast_json,
+    negotiate_media_type,
+    render_rows,
+    row_dicts,
+)
 
 router = APIRouter()
 
+_MARKET_SNAPSHOTS = TypeAdapter(list[MarketSnapshotRead])
+_INDICATOR_SNAPSHOTS = TypeAdapter(list[IndicatorSnapshotRead])
 
-def _ticker_filter_clause(stmt: Select, tickers: Iterable[str]) -> Select:
-    normalized = [ticker.strip().upper() for ticker in tickers if ticker.strip()]
-    if not normalized:
-        return stmt
-    return stmt.where(Asset.ticker.in_(normalized))
+_ASSET_COLUMNS: tuple[tuple[SQLColumnExpression[Any], ColumnSpec], ...] = (
+    (raw_guid(AssetLatest.asset_id), ColumnSpec("asset_id", UUID_COLUMN)),
+    (Asset.ticker, ColumnSpec("ticker", STRING_COLUMN)),
+    (Asset.name, ColumnSpec("asset_name", STRING_COLUMN)),
+    (Asset.type, ColumnSpec("asset_type", STRING_COLUMN)),
+)
+_MARKET_COLUMNS: tuple[tuple[SQLColumnExpression[Any], ColumnSpec], ...] = _ASSET_COLUMNS + (
+    (AssetLatest.market_as_of, ColumnSpec("as_of", TIMESTAMP_COLUMN)),
+    (AssetLatest.price, ColumnSpec("price", FLOAT_COLUMN)),
+    (AssetLatest.price_change_pct, ColumnSpec("price_change_pct", FLOAT_COLUMN)),
+    (AssetLatest.volume, ColumnSpec("volume", FLOAT_COLUMN)),
+    (AssetLatest.vwap, ColumnSpec("vwap", FLOAT_COLUMN)),
+    (AssetLatest.volatility_1d, ColumnSpec("volatility_1d", FLOAT_COLUMN)),
+)
+_INDICATOR_COLUMNS: tuple[tuple[SQLColumnExpression[Any], ColumnSpec], ...] = _ASSET_COLUMNS + (
+    (AssetLatest.indicator_as_of, ColumnSpec("as_of", TIMESTAMP_COLUMN)),
+    (AssetLatest.rsi_14, ColumnSpec("rsi_14", FLOAT_COLUMN)),
+    (AssetLatest.macd, ColumnSpec("macd", FLOAT_COLUMN)),
+    (AssetLatest.macd_signal, ColumnSpec("macd_signal", FLOAT_COLUMN)),
+    (AssetLatest.atr_14, ColumnSpec("atr_14", FLOAT_COLUMN)),
+)
 
 
-@router.get("/snapshots/latest", response_model=list[MarketSnapshotRead])
-def latest_market_snapshots(
-    tickers: list[str] | None = Query(default=None, description="Optional list of tickers to filter"),
-    session: Session = Depends(get_session),
-    _: None = Depends(enforce_rate_limit),
-) -> list[MarketSnapshotRead]:
-    latest_subquery = (
-        select(
-            MarketSnapshot.asset_id.label("asset_id"),
-            func.max(MarketSnapshot.as_of).label("max_as_of"),
-        )
-        .group_by(MarketSnapshot.asset_id)
-        .subquery()
-    )
+def _normalize_tickers(tickers: Iterable[str]) -> list[str]:
+    return [ticker.strip().upper() for ticker in tickers if ticker.strip()]
 
-    stmt = (
-        select(MarketSnapshot, Asset)
-        .join(Asset, MarketSnapshot.asset_id == Asset.id)
-        .join(
-            latest_subquery,
-            (MarketSnapshot.asset_id == latest_subquery.c.asset_id)
-            & (MarketSnapshot.as_of == latest_subquery.c.max_as_of),
-        )
+
+# Row shapes: asset_id, ticker, asset_name, asset_type, as_of, then the five
+# market or four indicator values.
+_AssetRow = tuple[str, str, str | None, str]
+_MarketRow = tuple[
+    *_AssetRow, datetime, float | None, float | None, float | None, float | None, float | None
+]
+_IndicatorRow = tuple[*_AssetRow, datetime, float | None, float | None, float | None, float | None]
+
+
+def _latest_stmt(
+    columns: Sequence[tuple[SQLColumnExpression[Any], ColumnSpec]], present: SQLColumnExpression[Any]
+) -> Select[*tuple[Any, ...]]:
+    return (
+        select(*(column.label(spec.name) for column, spec in columns))
+        .select_from(AssetLatest)
+        .join(Asset, AssetLatest.asset_id == Asset.id)
+        .where(present.is_not(None))
         .order_by(Asset.ticker.asc())
     )
 
-    if tickers:
-        stmt = _ticker_filter_clause(stmt, tickers)
-
-    rows = session.execute(stmt).all()
-    return [
-        MarketSnapshotRead(
-            asset_id=market.asset_id,
-            ticker=asset.ticker,
-            asset_name=asset.name,
-            asset_type=asset.type,
-            as_of=market.as_of,
-            price=market.price,
-            price_change_pct=market.price_change_pct,
-            volume=market.volume,
-            vwap=market.vwap,
-            volatility_1d=market.volatility_1d,
-        )
-        for market, asset in rows
-    ]
 
+# Built once so every request reuses the same statement and its compiled form;
+# the ticker filter is an expanding bind parameter rather than a new IN clause.
+_MARKET_LATEST: Select[*_MarketRow] = _latest_stmt(_MARKET_COLUMNS, AssetLatest.market_as_of)
+_MARKET_LATEST_FOR: Select[*_MarketRow] = _MARKET_LATEST.where(
+    Asset.ticker.in_(bindparam("tickers", expanding=True))
+)
+_INDICATOR_LATEST: Select[*_IndicatorRow] = _latest_stmt(
+    _INDICATOR_COLUMNS, AssetLatest.indicator_as_of
+)
+_INDICATOR_LATEST_FOR: Select[*_IndicatorRow] = _INDICATOR_LATEST.where(
+    Asset.ticker.in_(bindparam("tickers", expanding=True))
+)
+
+
+async def _latest_rows(
+    session: AsyncSession,
+    stmt: Select[*tuple[Any, ...]],
+    filtered_stmt: Select[*tuple[Any, ...]],
+    tickers: list[str] | None,
+) -> Sequence[Any]:
+    normalized = _normalize_tickers(tickers or [])
+    if normalized:
+        demand_buffer.note(normalized)
+        return (await session.execute(filtered_stmt, {"tickers": normalized})).all()
+    return (await session.execute(stmt)).all()
 
-@router.get("/indicators/latest", response_model=list[IndicatorSnapshotRead])
-def latest_indicator_snapshots(
+
+@router.get("/snapshots/latest", response_model=list[MarketSnapshotRead], responses=BINARY_RESPONSES)
+async def latest_market_snapshots(
+    request: Request,
     tickers: list[str] | None = Query(default=None, description="Optional list of tickers to filter"),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
+    cache: ResponseCache = Depends(get_response_cache),
     _: None = Depends(enforce_rate_limit),
-) -> list[IndicatorSnapshotRead]:
-    latest_subquery = (
-        select(
-            IndicatorSnapshot.asset_id.label("asset_id"),
-            func.max(IndicatorSnapshot.as_of).label("max_as_of"),
-        )
-        .group_by(IndicatorSnapshot.asset_id)
-        .subquery()
-    )
+) -> Response:
+    media_type = negotiate_media_type(request)
 
-    stmt = (
-        select(IndicatorSnapshot, Asset)
-        .join(Asset, IndicatorSnapshot.asset_id == Asset.id)
-        .join(
-            latest_subquery,
-            (IndicatorSnapshot.asset_id == latest_subquery.c.asset_id)
-            & (IndicatorSnapshot.as_of == latest_subquery.c.max_as_of),
-        )
-        .order_by(Asset.ticker.asc())
-    )
+    async def build() -> tuple[bytes, Optional[datetime]]:
+        rows = await _latest_rows(session, _MARKET_LATEST, _MARKET_LATEST_FOR, tickers)
+        specs = [spec for _, spec in _MARKET_COLUMNS]
+        body = render_rows(media_type, specs, rows, _MARKET_SNAPSHOTS)
+        return body, max_timestamp(row.as_of for row in rows)
 
-    if tickers:
-        stmt = _ticker_filter_clause(stmt, tickers)
-
-    rows = session.execute(stmt).all()
-    return [
-        IndicatorSnapshotRead(
-            asset_id=indicator.asset_id,
-            ticker=asset.ticker,
-            asset_name=asset.name,
-            asset_type=asset.type,
-            as_of=indicator.as_of,
-            rsi_14=indicator.rsi_14,
-            macd=indicator.macd,
-            macd_signal=indicator.macd_signal,
-            atr_14=indicator.atr_14,
+    return await cache.respond(request, tickers, build, media_type)
+
+
+@router.get("/indicators/latest", response_model=list[IndicatorSnapshotRead], responses=BINARY_RESPONSES)
+async def latest_indicator_snapshots(
+    request: Request,
+    tickers: list[str] | None = Query(default=None, description="Optional list of tickers to filter"),
+    session: AsyncSession = Depends(get_async_session),
+    cache: ResponseCache = Depends(get_response_cache),
+    _: None = Depends(enforce_rate_limit),
+) -> Response:
+    media_type = negotiate_media_type(request)
+
+    async def build() -> tuple[bytes, Optional[datetime]]:
+        rows = await _latest_rows(session, _INDICATOR_LATEST, _INDICATOR_LATEST_FOR, tickers)
+        specs = [spec for _, spec in _INDICATOR_COLUMNS]
+        body = render_rows(media_type, specs, rows, _INDICATOR_SNAPSHOTS)
+        return body, max_timestamp(row.as_of for row in rows)
+
+    return await cache.respond(request, tickers, build, media_type)
+
+
+def _series_response(
+    media_type: str,
+    ticker: str,
+    rows: Sequence[Sequence[Any]],
+    next_cursor: Optional[str] = None,
+    bucket_seconds: Optional[int] = None,
+) -> Response:
+    if media_type == JSON_MEDIA_TYPE:
+        page = {
+            "ticker": ticker,
+            "points": row_dicts(SERIES_COLUMNS, rows),
+            "next_cursor": next_cursor,
+            "bucket_seconds": bucket_seconds,
+        }
+        body = fast_json(page)
+        if body is None:
+            body = SnapshotSeriesPage.model_validate(page).model_dump_json().encode()
+        return Response(content=body, media_type=media_type)
+    headers = {}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+    if bucket_seconds is not None:
+        headers["X-Bucket-Seconds"] = str(bucket_seconds)
+    return Response(content=encode_rows(media_type, SERIES_COLUMNS, rows), media_type=media_type, headers=headers)
+
+
+@router.get("/snapshots/{ticker}/series", response_model=SnapshotSeriesPage, responses=BINARY_RESPONSES)
+async def snapshot_series(
+    request: Request,
+    ticker: str,
+    start: Optional[datetime] = Query(default=None, description="Inclusive lower bound on as_of"),
+    end: Optional[datetime] = Query(default=None, description="Exclusive upper bound on as_of"),
+    limit: int = Query(default=500, ge=1, le=5000),
+    cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+    points: Optional[int] = Query(default=None, ge=3, le=5000, description="Downsample to about this many points"),
+    bucket_seconds: Optional[int] = Query(default=None, ge=60, description="Downsample to buckets of this width"),
+    method: Literal["ohlc", "lttb"] = Query(default="ohlc", description="Downsampling method"),
+    session: AsyncSession = Depends(get_async_session),
+    _: None = Depends(enforce_rate_limit),
+) -> Response:
+    """Oldest-first market snapshots with their indicators, one page at a time.
+
+    Pages are keyset-paginated on ``(asset_key, as_of)``: every page merges a
+    primary key range scan of the daily rollups with one of ``market_snapshot``
+    starting after the cursor, so deep pages cost the same as the first one.
+    Days past the retention horizon come back as single rollup points carrying
+    open/high/low/close and ``samples``.
+
+    With ``points`` or ``bucket_seconds`` the range is downsampled and returned
+    as one page. ``ohlc`` aggregates each bucket in SQL: ``price`` is the
+    bucket mean alongside open/high/low/close, and indicators are averaged
+    over the same bucket. ``lttb`` keeps the ``points`` bucket means that best
+    preserve the price curve.
+
+    Arrow and MessagePack responses carry the points as columns and move
+    ``next_cursor`` and ``bucket_seconds`` into the ``X-Next-Cursor`` and
+    ``X-Bucket-Seconds`` headers.
+    """
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must be before end")
+    media_type = negotiate_media_type(request)
+    asset = await asset_by_ticker(session, ticker)
+    demand_buffer.note([asset.ticker])
+
+    if points is not None or bucket_seconds is not None:
+        if cursor is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Downsampled series are not paginated"
+            )
+        return await _downsampled_series(
+            session, media_type, asset, start, end, points, bucket_seconds, method
         )
-        for indicator, asset in rows
-    ]
+
+    after = decode_cursor(cursor)[0] if cursor is not None else None
+    series = series_points(asset.key, start, end, after)
+    stmt = select(series).order_by(series.c.as_of.asc()).limit(limit + 1)
+    rows = (await session.execute(stmt)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].as_of)
+    return _series_response(media_type, asset.ticker, rows, next_cursor=next_cursor)
+
+
+async def _downsampled_series(
+    session: AsyncSession,
+    media_type: str,
+    asset: Asset,
+    start: Optional[datetime],
+    end: Optional[datetime],
+    points: Optional[int],
+    bucket_seconds: Optional[int],
+    method: str,
+) -> Response:
+    if start is None or end is None:
+        first, last = await series_bounds(session, asset.key)
+        if first is None or last is None:
+            return _series_response(media_type, asset.ticker, [])
+        start = start or first
+        end = end or last + timedelta(microseconds=1)
+    if method == "lttb":
+        target = points or 500
+        width = bucket_width(start, end, target * LTTB_OVERSAMPLE, bucket_seconds)
+        rows = lttb_rows(await bucketed_rows(session, asset.key, start, end, width), target)
+    else:
+        width = bucket_width(start, end, points, bucket_seconds)
+        rows = await bucketed_rows(session, asset.key, start, end, width)
+    return _series_response(media_type, asset.ticker, rows, bucket_seconds=width)
@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+from uuid import UUID
+
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, func
+from sqlalchemy import Select, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.db.models import Asset, UserAsset
-from app.db.session import get_session
-from app.dependencies.auth import get_current_user
-from app.schemas import WatchlistAdd, WatchlistItem, WatchlistOrder
-from app.utils.assets import get_or_create_asset
+from app.db.session import get_async_session, get_session
+from app.dependencies.auth import get_current_user_id, get_current_user_id_async
+from app.jobs.ingest_jobs import IngestJobManager, get_ingest_jobs
+from app.schemas import WatchlistAdd, WatchlistBulk, WatchlistItem, WatchlistOrder
+from app.services.universe import record_demand
+from app.utils.assets import get_or_create_asset, get_or_create_assets
 from app.utils.tickers import resolve_ticker
 
 router = APIRouter()
@@ -24,57 +29,115 @@ def _to_watchlist_item(user_asset: UserAsset, asset: Asset) -> WatchlistItem:
     )
 
 
+def _watchlist_query(user_id: UUID) -> Select:
+    return (
+        select(UserAsset, Asset)
+        .join(Asset, UserAsset.asset_id == Asset.id)
+        .where(UserAsset.user_id == user_id)
+        .order_by(UserAsset.display_order.asc().nullslast(), UserAsset.created_at.asc())
+    )
+
+
 @router.get("/watchlist", response_model=list[WatchlistItem])
-def list_watchlist(
-    user=Depends(get_current_user),
-    session: Session = Depends(get_session),
+async def list_watchlist(
+    user_id: UUID = Depends(get_current_user_id_async),
+    session: AsyncSession = Depends(get_async_session),
 ) -> list[WatchlistItem]:
-    rows = (
-        session.execute(
-            select(UserAsset, Asset)
-            .join(Asset, UserAsset.asset_id == Asset.id)
-            .where(UserAsset.user_id == user.id)
-            .order_by(UserAsset.display_order.asc().nullslast(), UserAsset.created_at.asc())
-        )
-        .all()
-    )
+    rows = (await session.execute(_watchlist_query(user_id))).all()
+    return [_to_watchlist_item(user_asset, asset) for user_asset, asset in rows]
+
+
+def _list_watchlist_sync(session: Session, user_id: UUID) -> list[WatchlistItem]:
+    rows = session.execute(_watchlist_query(user_id)).all()
     return [_to_watchlist_item(user_asset, asset) for user_asset, asset in rows]
 
 
 @router.post("/watchlist", response_model=WatchlistItem, status_code=status.HTTP_201_CREATED)
 def add_watchlist_item(
     payload: WatchlistAdd,
-    user=Depends(get_current_user),
+    user_id: UUID = Depends(get_current_user_id),
     session: Session = Depends(get_session),
 ) -> WatchlistItem:
     asset = get_or_create_asset(session, payload.ticker)
+    record_demand(session, [asset.ticker])
     existing = session.scalars(
-        select(UserAsset).where(UserAsset.user_id == user.id, UserAsset.asset_id == asset.id)
+        select(UserAsset).where(UserAsset.user_id == user_id, UserAsset.asset_id == asset.id)
     ).first()
     if existing:
         return _to_watchlist_item(existing, asset)
 
     max_order = session.scalar(
-        select(func.max(UserAsset.display_order)).where(UserAsset.user_id == user.id)
+        select(func.max(UserAsset.display_order)).where(UserAsset.user_id == user_id)
     ) or 0
-    user_asset = UserAsset(user_id=user.id, asset_id=asset.id, display_order=max_order + 1)
+    user_asset = UserAsset(user_id=user_id, asset_id=asset.id, display_order=max_order + 1)
     session.add(user_asset)
     session.flush()
     session.refresh(user_asset)
     return _to_watchlist_item(user_asset, asset)
 
 
+@router.post("/watchlist/bulk", response_model=list[WatchlistItem])
+def add_watchlist_items(
+    payload: WatchlistBulk,
+    user_id: UUID = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+    jobs: IngestJobManager = Depends(get_ingest_jobs),
+) -> list[WatchlistItem]:
+    """Add many tickers at once and return the full watchlist.
+
+    New entries are appended after the current last position in request order.
+    Assets created here are committed before they are queued for ingest, so
+    the ingest worker's own session can see them.
+    """
+    assets, created = get_or_create_assets(session, payload.tickers)
+    record_demand(session, [asset.ticker for asset in assets])
+    watched = session.execute(
+        select(UserAsset.asset_id, UserAsset.display_order).where(UserAsset.user_id == user_id)
+    ).all()
+    watched_ids = {asset_id for asset_id, _ in watched}
+    next_order = max((order or 0 for _, order in watched), default=0) + 1
+    rows = [
+        {"user_id": user_id, "asset_id": asset.id, "display_order": next_order + index}
+        for index, asset in enumerate(asset for asset in assets if asset.id not in watched_ids)
+    ]
+    if rows:
+        session.execute(insert(UserAsset), rows)
+    watchlist = _list_watchlist_sync(session, user_id)
+    if created:
+        session.commit()
+        jobs.submit([asset.ticker for asset in created])
+    return watchlist
+
+
+@router.delete("/watchlist/bulk", response_model=list[WatchlistItem])
+def remove_watchlist_items(
+    payload: WatchlistBulk,
+    user_id: UUID = Depends(get_current_user_id),
+    session: Session = Depends(get_session),
+) -> list[WatchlistItem]:
+    canonical = list(dict.fromkeys(resolve_ticker(t.strip())[0] for t in payload.tickers if t.strip()))
+    session.execute(
+        delete(UserAsset)
+        .where(
+            UserAsset.user_id == user_id,
+            UserAsset.asset_id.in_(select(Asset.id).where(Asset.ticker.in_(canonical))),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return _list_watchlist_sync(session, user_id)
+
+
 @router.delete("/watchlist/{ticker}", status_code=status.HTTP_204_NO_CONTENT)
 def remove_watchlist_item(
     ticker: str,
-    user=Depends(get_current_user),
+    user_id: UUID = Depends(get_current_user_id),
     session: Session = Depends(get_session),
 ) -> None:
     canonical, _ = resolve_ticker(ticker)
     stmt = (
         select(UserAsset)
         .join(Asset, UserAsset.asset_id == Asset.id)
-        .where(UserAsset.user_id == user.id, Asset.ticker == canonical)
+        .where(UserAsset.user_id == user_id, Asset.ticker == canonical)
     )
     item = session.scalars(stmt).first()
     if not item:
@@ -85,7 +148,7 @@ def remove_watchlist_item(
 @router.put("/watchlist/order", response_model=list[WatchlistItem])
 def reorder_watchlist(
     payload: WatchlistOrder,
-    user=Depends(get_current_user),
+    user_id: UUID = Depends(get_current_user_id),
     session: Session = Depends(get_session),
 ) -> list[WatchlistItem]:
     canonical_order: list[str] = []
@@ -95,12 +158,12 @@ def reorder_watchlist(
             canonical_order.append(canonical)
 
     if not canonical_order:
-        return list_watchlist(user=user, session=session)
+        return _list_watchlist_sync(session, user_id)
 
     rows = session.execute(
         select(UserAsset, Asset)
         .join(Asset, UserAsset.asset_id == Asset.id)
-        .where(UserAsset.user_id == user.id)
+        .where(UserAsset.user_id == user_id)
     ).all()
     items_by_ticker = {asset.ticker: (user_asset, asset) for user_asset, asset in rows}
 
@@ -112,4 +175,4 @@ def reorder_watchlist(
             session.add(user_asset)
 
     session.flush()
-    return list_watchlist(user=user, session=session)
+    return _list_watchlist_sync(session, user_id)
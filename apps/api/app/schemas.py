@@ -35,6 +35,18 @@ class IngestResult(BaseModel):
     sentiment_score: float | None = Field(default=None, description="Average sentiment score for the ingest window")
 
 
+class IngestJobRead(BaseModel):
+    id: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    tickers: list[str]
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    results: list[IngestResult] = Field(default_factory=list)
+    failed_tickers: list[str] = Field(default_factory=list)
+    error: str | None = None
+
+
 class MarketSnapshotRead(BaseModel):
     asset_id: UUID
     ticker: str
@@ -60,6 +72,31 @@ class IndicatorSnapshotRead(BaseModel):
     atr_14: float | None = None
 
 
+class SeriesPoint(BaseModel):
+    as_of: datetime
+    price: float | None = None
+    price_change_pct: float | None = None
+    volume: float | None = None
+    vwap: float | None = None
+    volatility_1d: float | None = None
+    rsi_14: float | None = None
+    macd: float | None = None
+    macd_signal: float | None = None
+    atr_14: float | None = None
+    open: float | None = Field(default=None, description="First price in the bucket (downsampled series only)")
+    high: float | None = None
+    low: float | None = None
+    close: float | None = Field(default=None, description="Last price in the bucket (downsampled series only)")
+    samples: int | None = Field(default=None, description="Snapshots aggregated into this point")
+
+
+class SnapshotSeriesPage(BaseModel):
+    ticker: str
+    points: list[SeriesPoint] = Field(default_factory=list)
+    next_cursor: str | None = Field(default=None, description="Pass as `cursor` to fetch the next page")
+    bucket_seconds: int | None = Field(default=None, description="Bucket width when the series is downsampled")
+
+
 class PhaseStateRead(BaseModel):
     asset_id: UUID
     ticker: str
@@ -85,6 +122,37 @@ class PhaseHistoryRead(BaseModel):
     changed_at: datetime
 
 
+class PipelineStageStats(BaseModel):
+    name: str
+    workers: int
+    processed: int
+    failed: int
+    busy_seconds: float
+    throughput_per_second: float = Field(..., description="Items completed per busy worker second")
+    queue_depth: int = Field(..., description="Items waiting in the stage inbox")
+    max_queue_depth: int
+
+
+class LatencyBucket(BaseModel):
+    le: float | None = Field(..., description="Upper bound in seconds; null means +Inf")
+    count: int = Field(..., description="Cumulative observations at or below the bound")
+
+
+class SchedulerStats(BaseModel):
+    interval_seconds: float
+    cycles: int
+    overruns: int = Field(..., description="Cycles that ran past their next deadline")
+    skipped_cycles: int = Field(..., description="Deadlines dropped because of overruns")
+    last_cycle_seconds: float | None = None
+    cycle_seconds_sum: float
+    cycle_latency: list[LatencyBucket] = Field(default_factory=list)
+
+
+class IngestStats(BaseModel):
+    scheduler: SchedulerStats
+    stages: list[PipelineStageStats] = Field(default_factory=list)
+
+
 class IngestRequest(BaseModel):
     tickers: list[str] | None = Field(default=None, description="Optional list of tickers to ingest")
 
@@ -101,9 +169,19 @@ class WatchlistItem(BaseModel):
     order: int | None = None
 
 
+class DashboardItem(WatchlistItem):
+    phase: PhaseStateRead | None = None
+    market: MarketSnapshotRead | None = None
+    indicators: IndicatorSnapshotRead | None = None
+
+
 class WatchlistAdd(BaseModel):
     ticker: str = Field(..., description="Ticker or alias to add")
 
 
+class WatchlistBulk(BaseModel):
+    tickers: list[str] = Field(..., min_length=1, max_length=200, description="Tickers or aliases")
+
+
 class WatchlistOrder(BaseModel):
     tickers: list[str] = Field(..., description="Canonical tickers in desired order")
@@ -1 +1 @@
-__all__ = ["ingest_market", "indicators", "classify_phase", "sentiment"]
+__all__ = ["ingest_market", "indicators", "classify_phase", "sentiment", "universe", "latest_state", "phase_events"]
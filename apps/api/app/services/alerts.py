@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterable, Optional, Protocol, Sequence
+from uuid import UUID
+
+import httpx
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import Settings, get_settings
+from app.db.models import Asset, PhaseAlertOutbox, UserAsset
+from app.db.session import SessionLocal
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class PhaseAlert:
+    ticker: str
+    from_phase: Optional[str]
+    to_phase: str
+    confidence: Optional[float]
+    changed_at: datetime
+    transitions: int = 1
+
+    def to_dict(self) -> dict[str, object]:
+        data = asdict(self)
+        data["changed_at"] = self.changed_at.isoformat()
+        return data
+
+
+class AlertSink(Protocol):
+    def deliver(self, user_id: UUID, alerts: Sequence[PhaseAlert]) -> None: ...
+
+
+class LogAlertSink:
+    def deliver(self, user_id: UUID, alerts: Sequence[PhaseAlert]) -> None:
+        log.info("Phase alerts for %s: %s", user_id, [alert.to_dict() for alert in alerts])
+
+
+class FileAlertSink:
+    """Appends one JSON line per user batch; a local stand-in for a delivery service."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def deliver(self, user_id: UUID, alerts: Sequence[PhaseAlert]) -> None:
+        line = json.dumps({"user_id": str(user_id), "alerts": [alert.to_dict() for alert in alerts]})
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(line + "\n")
+
+
+class WebhookAlertSink:
+    def __init__(self, url: str, timeout: float = 5.0) -> None:
+        self.url = url
+        self.client = httpx.Client(timeout=timeout)
+
+    def deliver(self, user_id: UUID, alerts: Sequence[PhaseAlert]) -> None:
+        response = self.client.post(
+            self.url,
+            json={"user_id": str(user_id), "alerts": [alert.to_dict() for alert in alerts]},
+        )
+        response.raise_for_status()
+
+
+def build_alert_sink(settings: Settings | None = None) -> AlertSink:
+    settings = settings or get_settings()
+    if settings.phase_alert_webhook_url:
+        return WebhookAlertSink(settings.phase_alert_webhook_url)
+    if settings.phase_alert_file:
+        return FileAlertSink(settings.phase_alert_file)
+    return LogAlertSink()
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def watchers_by_asset(session: Session, asset_ids: Iterable[UUID]) -> dict[UUID, list[UUID]]:
+    """Map each asset to the users watching it, via ``ix_user_asset_asset_id``."""
+    watchers: dict[UUID, list[UUID]] = defaultdict(list)
+    ids = list(asset_ids)
+    if not ids:
+        return watchers
+    rows = session.execute(
+        select(UserAsset.asset_id, UserAsset.user_id).where(UserAsset.asset_id.in_(ids))
+    ).all()
+    for asset_id, user_id in rows:
+        watchers[asset_id].append(user_id)
+    return watchers
+
+
+class PhaseAlertDispatcher:
+    """Delivers outbox transitions to the users watching each asset.
+
+    An asset's pending transitions are held until none has been enqueued for
+    ``dedupe_window`` and then collapsed into one net change, so a flap such as
+    COOP → DEFECT → COOP inside the window produces no alert at all. The window
+    runs on ``enqueued_at`` (wall clock), not on the bar time in ``changed_at``.
+    Each run takes up to ``batch_size`` settled assets with all of their
+    pending rows, so one asset's transitions are never split across runs. Each
+    user receives a single sink call per run with all of their alerts.
+
+    An asset's rows are marked dispatched once every delivery carrying it
+    succeeded. If one failed, the asset backs off for ``retry_backoff``,
+    doubling per attempt, and is retried with all of its rows (at-least-once
+    delivery: users whose call succeeded see the alert again). After
+    ``max_attempts`` the rows are dead-lettered, so one undeliverable batch
+    cannot hold up the rest of the outbox.
+    """
+
+    def __init__(
+        self,
+        sink: AlertSink,
+        session_factory: sessionmaker[Session] = SessionLocal,
+        dedupe_window: timedelta = timedelta(minutes=2),
+        batch_size: int = 500,
+        max_attempts: int = 5,
+        retry_backoff: timedelta = timedelta(minutes=1),
+    ) -> None:
+        self.sink = sink
+        self.session_factory = session_factory
+        self.dedupe_window = dedupe_window
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+
+    def dispatch_pending(self, now: datetime | None = None) -> int:
+        """Deliver settled alerts and return the number of outbox rows dispatched or dead-lettered."""
+        now = now or datetime.now(timezone.utc)
+        pending_rows = PhaseAlertOutbox.dispatched_at.is_(None) & PhaseAlertOutbox.dead_lettered_at.is_(None)
+        retry_at = func.max(PhaseAlertOutbox.next_attempt_at)
+        with self.session_factory() as session:
+            settled_assets = (
+                select(PhaseAlertOutbox.asset_id)
+                .where(pending_rows)
+                .group_by(PhaseAlertOutbox.asset_id)
+                .having(
+                    func.max(PhaseAlertOutbox.enqueued_at) <= now - self.dedupe_window,
+                    or_(retry_at.is_(None), retry_at <= now),
+                )
+                .order_by(func.min(PhaseAlertOutbox.enqueued_at))
+                .limit(self.batch_size)
+            )
+            asset_ids = session.scalars(settled_assets).all()
+            if not asset_ids:
+                return 0
+            stmt = (
+                select(PhaseAlertOutbox)
+                .where(pending_rows, PhaseAlertOutbox.asset_id.in_(asset_ids))
+                .order_by(PhaseAlertOutbox.changed_at.asc(), PhaseAlertOutbox.enqueued_at.asc())
+            )
+            if session.get_bind().dialect.name == "postgresql":
+                stmt = stmt.with_for_update(skip_locked=True)
+            rows = session.scalars(stmt).all()
+
+            pending: dict[UUID, list[PhaseAlertOutbox]] = defaultdict(list)
+            for row in rows:
+                pending[row.asset_id].append(row)
+            # Re-checked on the locked rows: a transition may have landed since the asset was picked.
+            settled = {
+                asset_id: entries
+                for asset_id, entries in pending.items()
+                if now - max(_utc(entry.enqueued_at) for entry in entries) >= self.dedupe_window
+                and all(entry.next_attempt_at is None or _utc(entry.next_attempt_at) <= now for entry in entries)
+            }
+            if not settled:
+                return 0
+
+            tickers = dict(
+                session.execute(select(Asset.id, Asset.ticker).where(Asset.id.in_(list(settled)))).all()
+            )
+            watchers = watchers_by_asset(session, settled)
+            batches: dict[UUID, list[tuple[UUID, PhaseAlert]]] = defaultdict(list)
+            for asset_id, entries in settled.items():
+                first, last = entries[0], entries[-1]
+                if first.from_phase == last.to_phase or not watchers.get(asset_id):
+                    continue
+                alert = PhaseAlert(
+                    ticker=tickers.get(asset_id, ""),
+                    from_phase=first.from_phase,
+                    to_phase=last.to_phase,
+                    confidence=last.confidence,
+                    changed_at=_utc(last.changed_at),
+                    transitions=len(entries),
+                )
+                for user_id in watchers[asset_id]:
+                    batches[user_id].append((asset_id, alert))
+
+            failed: set[UUID] = set()
+            for user_id, alerts in batches.items():
+                try:
+                    self.sink.deliver(user_id, [alert for _, alert in alerts])
+                except Exception:
+                    log.warning("Phase alert delivery to %s failed", user_id, exc_info=True)
+                    failed.update(asset_id for asset_id, _ in alerts)
+
+            delivered = [row.id for asset_id, entries in settled.items() if asset_id not in failed for row in entries]
+            if delivered:
+                session.execute(
+                    update(PhaseAlertOutbox)
+                    .where(PhaseAlertOutbox.id.in_(delivered))
+                    .values(dispatched_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+            dead_lettered = 0
+            for asset_id in failed:
+                entries = settled[asset_id]
+                attempts = max(entry.attempts for entry in entries) + 1
+                for entry in entries:
+                    entry.attempts = attempts
+                    if attempts >= self.max_attempts:
+                        entry.dead_lettered_at = now
+                    else:
+                        entry.next_attempt_at = now + self.retry_backoff * 2 ** (attempts - 1)
+                if attempts >= self.max_attempts:
+                    dead_lettered += len(entries)
+                    log.error(
+                        "Dead-lettered %d phase alert(s) for %s after %d attempts",
+                        len(entries),
+                        tickers.get(asset_id, asset_id),
+                        attempts,
+                    )
+            session.commit()
+            return len(delivered) + dead_lettered
+
+
+async def run_alert_dispatcher(dispatcher: PhaseAlertDispatcher | None = None) -> None:
+    settings = get_settings()
+    dispatcher = dispatcher or PhaseAlertDispatcher(
+        sink=build_alert_sink(settings),
+        dedupe_window=timedelta(seconds=settings.phase_alert_dedupe_seconds),
+        max_attempts=settings.phase_alert_max_attempts,
+        retry_backoff=timedelta(seconds=settings.phase_alert_retry_seconds),
+    )
+    while True:
+        await asyncio.sleep(settings.phase_alert_interval_seconds)
+        try:
+            await asyncio.to_thread(dispatcher.dispatch_pending)
+        except Exception as exc:  # pragma: no cover - background logging
+            log.exception("Phase alert dispatch failed: %s", exc)
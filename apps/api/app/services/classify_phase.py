@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from typing import Optional
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from sqlalchemy import select
 from sqlalchemy.orm import Session
@@ -12,11 +12,13 @@ from app.db.models import (
     Asset,
     IndicatorSnapshot,
     MarketSnapshot,
+    PhaseAlertOutbox,
     PhaseHistory,
     PhaseState,
-    SentimentObservation,
 )
 from app.config import get_settings
+from app.services.latest_state import get_latest_row, latest_sentiment_readings, record_phase
+from app.services.phase_events import latest_event, phase_events, queue_event, transition_event
 from app.utils.tickers import resolve_ticker
 
 PHASE_COOP = "COOP"
@@ -50,7 +52,7 @@ class PhaseClassifier:
         market_snapshots = list(
             self.session.scalars(
                 select(MarketSnapshot)
-                .where(MarketSnapshot.asset_id == asset.id)
+                .where(MarketSnapshot.asset_key == asset.key)
                 .order_by(MarketSnapshot.as_of.desc())
                 .limit(2)
             )
@@ -61,7 +63,7 @@ class PhaseClassifier:
         indicator_snapshots = list(
             self.session.scalars(
                 select(IndicatorSnapshot)
-                .where(IndicatorSnapshot.asset_id == asset.id)
+                .where(IndicatorSnapshot.asset_key == asset.key)
                 .order_by(IndicatorSnapshot.as_of.desc())
                 .limit(2)
             )
@@ -74,8 +76,8 @@ class PhaseClassifier:
 
         price_change_pct = self._resolve_price_change(current_market, previous_market)
         volatility_delta = self._resolve_volatility_change(current_market, previous_market)
-        rsi_current = self._to_float(current_indicator.rsi_14) if current_indicator else None
-        rsi_previous = self._to_float(previous_indicator.rsi_14) if previous_indicator else None
+        rsi_current = current_indicator.rsi_14 if current_indicator else None
+        rsi_previous = previous_indicator.rsi_14 if previous_indicator else None
 
         sentiment_current = None
         sentiment_previous = None
@@ -195,7 +197,7 @@ class PhaseClassifier:
         previous: Optional[MarketSnapshot],
     ) -> Optional[float]:
         if current.price_change_pct is not None:
-            return float(current.price_change_pct)
+            return current.price_change_pct
         if previous and previous.price and current.price:
             if previous.price == 0:
                 return None
@@ -209,36 +211,26 @@ class PhaseClassifier:
     ) -> Optional[float]:
         if previous is None or current.volatility_1d is None or previous.volatility_1d is None:
             return None
-        return float(current.volatility_1d) - float(previous.volatility_1d)
-
-    def _to_float(self, value: Optional[float]) -> Optional[float]:
-        if value is None:
-            return None
-        return float(value)
+        return current.volatility_1d - previous.volatility_1d
 
     def _resolve_sentiment(self, asset_id: UUID) -> tuple[Optional[float], Optional[float], bool]:
-        observations = list(
-            self.session.scalars(
-                select(SentimentObservation)
-                .where(SentimentObservation.asset_id == asset_id)
-                .order_by(SentimentObservation.observed_at.desc())
-                .limit(2)
-            )
-        )
-        if not observations:
+        reading = latest_sentiment_readings(self.session, [asset_id]).get(asset_id)
+        if reading is None:
             return None, None, False
 
-        current = observations[0]
-        previous = observations[1] if len(observations) > 1 else None
         now = datetime.now(timezone.utc)
-        stale = (now - current.observed_at) > timedelta(minutes=self.settings.sentiment_window_minutes * 2)
-        return current.score, previous.score if previous else None, stale
+        observed_at = reading.observed_at
+        if observed_at.tzinfo is None:
+            observed_at = observed_at.replace(tzinfo=timezone.utc)
+        stale = (now - observed_at) > timedelta(minutes=self.settings.sentiment_window_minutes * 2)
+        return reading.score, reading.previous_score, stale
 
 
 class PhaseUpdateService:
     def __init__(self, session: Session) -> None:
         self.session = session
         self.classifier = PhaseClassifier(session)
+        self.settings = get_settings()
 
     def update_all(self) -> list[PhaseState]:
         assets = self.session.scalars(select(Asset)).all()
@@ -283,9 +275,13 @@ class PhaseUpdateService:
 
         if previous_state is None:
             self.session.add(state)
+        record_phase(self.session, state)
+        # Stream events are only built while someone is listening; they go out after commit.
+        streaming = phase_events.active
 
         if phase_changed:
             history_entry = PhaseHistory(
+                id=uuid4(),
                 asset_id=asset.id,
                 from_phase=from_phase,
                 to_phase=result.phase,
@@ -294,5 +290,22 @@ class PhaseUpdateService:
                 changed_at=result.computed_at,
             )
             self.session.add(history_entry)
+            if self.settings.enable_phase_alerts and from_phase is not None:
+                # Outbox row commits with the transition; delivery happens off the classify path.
+                self.session.add(
+                    PhaseAlertOutbox(
+                        asset_id=asset.id,
+                        history_id=history_entry.id,
+                        from_phase=from_phase,
+                        to_phase=result.phase,
+                        confidence=state.confidence,
+                        changed_at=result.computed_at,
+                    )
+                )
+            if streaming:
+                queue_event(self.session, transition_event(asset, history_entry))
+
+        if streaming:
+            queue_event(self.session, latest_event(asset, get_latest_row(self.session, asset.id)))
 
         return state
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 
 from app.db.models import Asset, IndicatorSnapshot, MarketSnapshot
 from app.services.indicators import compute_atr, compute_macd, compute_rsi
+from app.services.latest_state import record_indicators, record_market
 from app.utils.assets import get_or_create_asset
 from app.utils.tickers import resolve_ticker
 
@@ -39,16 +40,24 @@ class MarketIngestor:
 
     def ingest_single(self, ticker: str) -> IngestSummary | None:
         canonical, _ = resolve_ticker(ticker)
-        asset = get_or_create_asset(self.session, canonical)
         frame = self._fetch_price_history(canonical)
         if frame.empty:
+            get_or_create_asset(self.session, canonical)
             return None
+        return self.persist_frame(canonical, self._prepare_indicators(frame))
 
-        frame = self._prepare_indicators(frame)
+    def persist_frame(self, ticker: str, frame: pd.DataFrame) -> IngestSummary | None:
+        """Store a price frame that already carries indicator columns."""
+        canonical, _ = resolve_ticker(ticker)
+        asset = get_or_create_asset(self.session, canonical)
+        if frame.empty:
+            return None
 
         market_inserted = 0
         indicator_inserted = 0
         last_timestamp = None
+        newest_market: MarketSnapshot | None = None
+        newest_indicator: IndicatorSnapshot | None = None
 
         for row in frame.itertuples():
             as_of = pd.Timestamp(row.Index).to_pydatetime()
@@ -56,14 +65,14 @@ class MarketIngestor:
 
             # Skip if snapshot already stored
             exists_stmt = select(MarketSnapshot).where(
-                MarketSnapshot.asset_id == asset.id,
+                MarketSnapshot.asset_key == asset.key,
                 MarketSnapshot.as_of == as_of,
             )
             if self.session.scalars(exists_stmt).first():
                 continue
 
             market_snapshot = MarketSnapshot(
-                asset_id=asset.id,
+                asset_key=asset.key,
                 price=float(row.Close),
                 price_change_pct=self._safe_float(row.price_change_pct),
                 volume=self._safe_float(row.Volume),
@@ -76,8 +85,7 @@ class MarketIngestor:
             market_inserted += 1
 
             indicator_snapshot = IndicatorSnapshot(
-                asset_id=asset.id,
-                market_snapshot_id=market_snapshot.id,
+                asset_key=asset.key,
                 rsi_14=self._safe_float(row.rsi_14),
                 macd=self._safe_float(row.macd),
                 macd_signal=self._safe_float(row.macd_signal),
@@ -86,6 +94,11 @@ class MarketIngestor:
             )
             self.session.add(indicator_snapshot)
             indicator_inserted += 1
+            newest_market, newest_indicator = market_snapshot, indicator_snapshot
+
+        if newest_market is not None and newest_indicator is not None:
+            record_market(self.session, asset.id, newest_market)
+            record_indicators(self.session, asset.id, newest_indicator)
 
         if last_timestamp is None:
             return None
@@ -108,50 +121,58 @@ class MarketIngestor:
         return float(value)
 
     def _fetch_price_history(self, ticker: str) -> pd.DataFrame:
-        data = yf.download(
-            tickers=ticker,
-            period=f"{self.window_days}d",
-            interval="1h",
-            progress=False,
-            auto_adjust=True,
-        )
-        if data.empty:
-            return data
-        if isinstance(data.columns, pd.MultiIndex):
-            data = data.droplevel(-1, axis=1)
-
-        lower_map = {str(col).lower(): col for col in data.columns}
-        canonical_order = ["open", "high", "low", "close", "volume"]
-        missing_keys = [key for key in canonical_order if key not in lower_map]
-        if missing_keys:
-            raise KeyError(f"Missing columns from price frame: {missing_keys}")
-
-        ordered_columns = [lower_map[key] for key in canonical_order]
-        data = data[ordered_columns]
-        data.columns = ["Open", "High", "Low", "Close", "Volume"]
-        if data.index.tzinfo is None:
-            data.index = data.index.tz_localize("UTC")
-        else:
-            data.index = data.index.tz_convert("UTC")
-        return data
+        return fetch_price_history(ticker, self.window_days)
 
     def _prepare_indicators(self, frame: pd.DataFrame) -> pd.DataFrame:
-        frame = frame.copy()
-        if "Close" not in frame.columns:
-            raise KeyError(
-                f"Close column missing; columns available: {[str(col) for col in frame.columns]}"
-            )
-        frame["price_change_pct"] = frame["Close"].pct_change() * 100
-        price_returns = frame["Close"].pct_change()
-        frame["volatility_1d"] = price_returns.rolling(window=24).std().mul((24) ** 0.5)
-        volume = frame["Volume"].replace(0, pd.NA)
-        cumulative_vp = (frame["Close"] * volume).cumsum()
-        cumulative_volume = volume.cumsum()
-        frame["vwap"] = cumulative_vp / cumulative_volume
-
-        frame["rsi_14"] = compute_rsi(frame["Close"])
-        macd, macd_signal = compute_macd(frame["Close"])
-        frame["macd"] = macd
-        frame["macd_signal"] = macd_signal
-        frame["atr_14"] = compute_atr(frame["High"], frame["Low"], frame["Close"])
-        return frame.loc[frame["Close"].notna()]
+        return prepare_indicators(frame)
+
+
+def fetch_price_history(ticker: str, window_days: int) -> pd.DataFrame:
+    data = yf.download(
+        tickers=ticker,
+        period=f"{window_days}d",
+        interval="1h",
+        progress=False,
+        auto_adjust=True,
+    )
+    if data.empty:
+        return data
+    if isinstance(data.columns, pd.MultiIndex):
+        data = data.droplevel(-1, axis=1)
+
+    lower_map = {str(col).lower(): col for col in data.columns}
+    canonical_order = ["open", "high", "low", "close", "volume"]
+    missing_keys = [key for key in canonical_order if key not in lower_map]
+    if missing_keys:
+        raise KeyError(f"Missing columns from price frame: {missing_keys}")
+
+    ordered_columns = [lower_map[key] for key in canonical_order]
+    data = data[ordered_columns]
+    data.columns = ["Open", "High", "Low", "Close", "Volume"]
+    if data.index.tzinfo is None:
+        data.index = data.index.tz_localize("UTC")
+    else:
+        data.index = data.index.tz_convert("UTC")
+    return data
+
+
+def prepare_indicators(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.copy()
+    if "Close" not in frame.columns:
+        raise KeyError(
+            f"Close column missing; columns available: {[str(col) for col in frame.columns]}"
+        )
+    frame["price_change_pct"] = frame["Close"].pct_change() * 100
+    price_returns = frame["Close"].pct_change()
+    frame["volatility_1d"] = price_returns.rolling(window=24).std().mul((24) ** 0.5)
+    volume = frame["Volume"].replace(0, pd.NA)
+    cumulative_vp = (frame["Close"] * volume).cumsum()
+    cumulative_volume = volume.cumsum()
+    frame["vwap"] = cumulative_vp / cumulative_volume
+
+    frame["rsi_14"] = compute_rsi(frame["Close"])
+    macd, macd_signal = compute_macd(frame["Close"])
+    frame["macd"] = macd
+    frame["macd_signal"] = macd_signal
+    frame["atr_14"] = compute_atr(frame["High"], frame["Low"], frame["Close"])
+    return frame.loc[frame["Close"].notna()]
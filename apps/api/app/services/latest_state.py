@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import func, select, true
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    Asset,
+    AssetLatest,
+    IndicatorSnapshot,
+    MarketSnapshot,
+    PhaseState,
+    SentimentObservation,
+)
+from app.schemas import IndicatorSnapshotRead, MarketSnapshotRead
+
+
+@dataclass
+class SentimentReading:
+    score: Optional[float]
+    previous_score: Optional[float]
+    observed_at: datetime
+
+    @property
+    def delta(self) -> Optional[float]:
+        if self.score is None or self.previous_score is None:
+            return None
+        return float(self.score - self.previous_score)
+
+
+def latest_sentiment_readings(session: Session, asset_ids: Iterable[UUID]) -> dict[UUID, SentimentReading]:
+    """Return the newest and previous sentiment score for each asset.
+
+    Only two observations per asset are read: PostgreSQL uses a ``LATERAL``
+    ``LIMIT 2`` probe of ``ix_sentiment_observation_asset_observed`` per asset,
+    other dialects a ``row_number()`` window over the requested assets.
+    """
+    ids = list(dict.fromkeys(asset_ids))
+    if not ids:
+        return {}
+
+    if session.get_bind().dialect.name == "postgresql":
+        assets = select(Asset.id).where(Asset.id.in_(ids)).subquery()
+        top_two = (
+            select(SentimentObservation.score, SentimentObservation.observed_at)
+            .where(SentimentObservation.asset_id == assets.c.id)
+            .order_by(SentimentObservation.observed_at.desc())
+            .limit(2)
+            .lateral()
+        )
+        stmt = select(assets.c.id, top_two.c.score, top_two.c.observed_at).select_from(
+            assets.join(top_two, true())
+        )
+    else:
+        ranked = (
+            select(
+                SentimentObservation.asset_id,
+                SentimentObservation.score,
+                SentimentObservation.observed_at,
+                func.row_number()
+                .over(
+                    partition_by=SentimentObservation.asset_id,
+                    order_by=SentimentObservation.observed_at.desc(),
+                )
+                .label("rank"),
+            )
+            .where(SentimentObservation.asset_id.in_(ids))
+            .subquery()
+        )
+        stmt = select(ranked.c.asset_id, ranked.c.score, ranked.c.observed_at).where(ranked.c.rank <= 2)
+
+    readings: dict[UUID, SentimentReading] = {}
+    for asset_id, score, observed_at in session.execute(stmt.order_by(None)).all():
+        reading = readings.get(asset_id)
+        if reading is None:
+            readings[asset_id] = SentimentReading(score=score, previous_score=None, observed_at=observed_at)
+        elif _utc(observed_at) > _utc(reading.observed_at):  # type: ignore[operator]
+            reading.previous_score, reading.score, reading.observed_at = reading.score, score, observed_at
+        else:
+            reading.previous_score = score
+    return readings
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _is_newer(candidate: datetime, current: Optional[datetime]) -> bool:
+    return current is None or _utc(candidate) >= _utc(current)  # type: ignore[operator]
+
+
+def _optional_float(value: object) -> Optional[float]:
+    return float(value) if value is not None else None  # type: ignore[arg-type]
+
+
+def market_snapshot_read(latest: AssetLatest, asset: Asset) -> MarketSnapshotRead:
+    if latest.market_as_of is None:
+        raise ValueError(f"{asset.ticker} has no market snapshot yet")
+    return MarketSnapshotRead(
+        asset_id=latest.asset_id,
+        ticker=asset.ticker,
+        asset_name=asset.name,
+        asset_type=asset.type,
+        as_of=latest.market_as_of,
+        price=latest.price,
+        price_change_pct=latest.price_change_pct,
+        volume=latest.volume,
+        vwap=latest.vwap,
+        volatility_1d=latest.volatility_1d,
+    )
+
+
+def indicator_snapshot_read(latest: AssetLatest, asset: Asset) -> IndicatorSnapshotRead:
+    if latest.indicator_as_of is None:
+        raise ValueError(f"{asset.ticker} has no indicator snapshot yet")
+    return IndicatorSnapshotRead(
+        asset_id=latest.asset_id,
+        ticker=asset.ticker,
+        asset_name=asset.name,
+        asset_type=asset.type,
+        as_of=latest.indicator_as_of,
+        rsi_14=latest.rsi_14,
+        macd=latest.macd,
+        macd_signal=latest.macd_signal,
+        atr_14=latest.atr_14,
+    )
+
+
+def get_latest_row(session: Session, asset_id: UUID) -> AssetLatest:
+    row = session.get(AssetLatest, asset_id)
+    if row is None:
+        row = AssetLatest(asset_id=asset_id)
+        session.add(row)
+        session.flush()
+    return row
+
+
+def record_market(session: Session, asset_id: UUID, market: MarketSnapshot) -> None:
+    row = get_latest_row(session, asset_id)
+    if not _is_newer(market.as_of, row.market_as_of):
+        return
+    row.market_as_of = market.as_of
+    row.price = market.price
+    row.price_change_pct = market.price_change_pct
+    row.volume = market.volume
+    row.vwap = market.vwap
+    row.volatility_1d = market.volatility_1d
+
+
+def record_indicators(session: Session, asset_id: UUID, indicator: IndicatorSnapshot) -> None:
+    row = get_latest_row(session, asset_id)
+    if not _is_newer(indicator.as_of, row.indicator_as_of):
+        return
+    row.indicator_as_of = indicator.as_of
+    row.rsi_14 = indicator.rsi_14
+    row.macd = indicator.macd
+    row.macd_signal = indicator.macd_signal
+    row.atr_14 = indicator.atr_14
+
+
+def record_phase(session: Session, state: PhaseState) -> None:
+    row = get_latest_row(session, state.asset_id)
+    row.phase = state.phase
+    row.confidence = state.confidence
+    row.rationale = state.rationale
+    row.computed_at = state.computed_at
+
+
+def record_sentiment(session: Session, asset_id: UUID) -> None:
+    """Refresh the sentiment score and delta from the two newest observations."""
+    reading = latest_sentiment_readings(session, [asset_id]).get(asset_id)
+    row = get_latest_row(session, asset_id)
+    if reading is None:
+        row.sentiment_score = row.sentiment_delta = row.sentiment_observed_at = None
+        return
+    row.sentiment_score = _optional_float(reading.score)
+    row.sentiment_delta = reading.delta
+    row.sentiment_observed_at = reading.observed_at
+
+
+def rebuild_latest_state(session: Session, asset_ids: Optional[Iterable[UUID]] = None) -> int:
+    """Recompute ``asset_latest`` rows from the history tables.
+
+    Used for backfills and repairs; the ingest and classify paths keep the rows
+    current incrementally. Returns the number of assets rebuilt.
+    """
+    stmt = select(Asset.id, Asset.key)
+    if asset_ids is not None:
+        stmt = stmt.where(Asset.id.in_(list(asset_ids)))
+    session.flush()
+    rebuilt = 0
+    for asset_id, asset_key in session.execute(stmt).all():
+        market = session.scalars(
+            select(MarketSnapshot)
+            .where(MarketSnapshot.asset_key == asset_key)
+            .order_by(MarketSnapshot.as_of.desc())
+            .limit(1)
+        ).first()
+        indicator = session.scalars(
+            select(IndicatorSnapshot)
+            .where(IndicatorSnapshot.asset_key == asset_key)
+            .order_by(IndicatorSnapshot.as_of.desc())
+            .limit(1)
+        ).first()
+        state = session.get(PhaseState, asset_id)
+        if market is not None:
+            record_market(session, asset_id, market)
+        if indicator is not None:
+            record_indicators(session, asset_id, indicator)
+        if state is not None:
+            record_phase(session, state)
+        record_sentiment(session, asset_id)
+        rebuilt += 1
+    session.flush()
+    return rebuilt
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db.models import Asset, AssetLatest, PhaseHistory
+from app.schemas import PhaseHistoryRead, PhaseStateRead
+
+log = logging.getLogger(__name__)
+
+EVENT_TRANSITION = "transition"
+EVENT_LATEST = "latest"
+
+# Key in ``Session.info`` holding events that are published once the session commits.
+PENDING_EVENTS = "pending_phase_events"
+
+KEEPALIVE = b": keep-alive\n\n"
+
+
+@dataclass(frozen=True)
+class PhaseEvent:
+    kind: str
+    ticker: str
+    payload: bytes
+
+    def encode(self) -> bytes:
+        return b"event: " + self.kind.encode() + b"\ndata: " + self.payload + b"\n\n"
+
+
+@dataclass(eq=False)
+class Subscription:
+    tickers: Optional[frozenset[str]]
+    queue: asyncio.Queue[PhaseEvent | None]
+    dropped: bool = False
+
+    async def get(self) -> PhaseEvent | None:
+        return await self.queue.get()
+
+
+@dataclass
+class PhaseEventBroker:
+    """Fans committed phase events out to stream subscribers.
+
+    Subscribers are indexed by ticker so an event only visits the subscribers
+    that asked for it. Each subscriber has a bounded buffer; one that falls a
+    full buffer behind is dropped and receives ``None`` so its stream can close.
+    ``publish`` may be called from any thread.
+
+    The broker is per process: subscribers only see events committed by the
+    process they are connected to.
+    """
+
+    buffer_size: int = 64
+    dropped_subscribers: int = 0
+    _by_ticker: dict[str, set[Subscription]] = field(default_factory=dict)
+    _firehose: set[Subscription] = field(default_factory=set)
+    _loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def subscriber_count(self) -> int:
+        unique = set(self._firehose)
+        for subscribers in self._by_ticker.values():
+            unique.update(subscribers)
+        return len(unique)
+
+    @property
+    def active(self) -> bool:
+        return bool(self._firehose or self._by_ticker)
+
+    def subscribe(self, tickers: Iterable[str] | None = None) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        wanted = frozenset(t.strip().upper() for t in tickers if t.strip()) if tickers is not None else None
+        subscription = Subscription(tickers=wanted, queue=asyncio.Queue(self.buffer_size))
+        if wanted is None:
+            self._firehose.add(subscription)
+        else:
+            for ticker in wanted:
+                self._by_ticker.setdefault(ticker, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription.tickers is None:
+            self._firehose.discard(subscription)
+            return
+        for ticker in subscription.tickers:
+            subscribers = self._by_ticker.get(ticker)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._by_ticker[ticker]
+
+    def publish(self, events: Iterable[PhaseEvent]) -> None:
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self.active:
+            return
+        batch = list(events)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._fan_out(batch)
+        else:
+            loop.call_soon_threadsafe(self._fan_out, batch)
+
+    def _fan_out(self, events: list[PhaseEvent]) -> None:
+        for item in events:
+            targets = self._by_ticker.get(item.ticker, set()) | self._firehose
+            for subscription in targets:
+                try:
+                    subscription.queue.put_nowait(item)
+                except asyncio.QueueFull:
+                    self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        self.unsubscribe(subscription)
+        subscription.dropped = True
+        self.dropped_subscribers += 1
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+        log.info("Dropped slow phase stream subscriber for %s", sorted(subscription.tickers or ["*"]))
+
+
+def phase_state_read(latest: AssetLatest, asset: Asset) -> PhaseStateRead:
+    if latest.phase is None or latest.computed_at is None:
+        raise ValueError(f"{asset.ticker} has not been classified yet")
+    return PhaseStateRead(
+        asset_id=asset.id,
+        ticker=asset.ticker,
+        display_ticker=asset.display_ticker or asset.ticker,
+        asset_name=asset.name,
+        asset_type=asset.type,
+        phase=latest.phase,
+        confidence=latest.confidence,
+        rationale=latest.rationale,
+        computed_at=latest.computed_at,
+        sentiment_score=latest.sentiment_score,
+        sentiment_delta=latest.sentiment_delta,
+    )
+
+
+def latest_event(asset: Asset, latest: AssetLatest) -> PhaseEvent:
+    payload = phase_state_read(latest, asset).model_dump_json().encode()
+    return PhaseEvent(kind=EVENT_LATEST, ticker=asset.ticker, payload=payload)
+
+
+def transition_event(asset: Asset, entry: PhaseHistory) -> PhaseEvent:
+    payload = PhaseHistoryRead(
+        id=entry.id,
+        asset_id=asset.id,
+        ticker=asset.ticker,
+        from_phase=entry.from_phase,
+        to_phase=entry.to_phase,
+        confidence=entry.confidence,
+        rationale=entry.rationale,
+        changed_at=entry.changed_at,
+    ).model_dump_json()
+    return PhaseEvent(kind=EVENT_TRANSITION, ticker=asset.ticker, payload=payload.encode())
+
+
+def queue_event(session: Session, item: PhaseEvent) -> None:
+    session.info.setdefault(PENDING_EVENTS, []).append(item)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    events = session.info.pop(PENDING_EVENTS, None)
+    if events:
+        phase_events.publish(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(PENDING_EVENTS, None)
+
+
+phase_events = PhaseEventBroker(buffer_size=get_settings().phase_stream_buffer_size)
+
+
+def get_phase_events() -> PhaseEventBroker:
+    return phase_events
@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator, Optional, Sequence, cast
+
+from sqlalchemy import CursorResult, case, delete, func, insert, literal, or_, select, union_all
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import get_settings
+from app.db.models import (
+    DailySnapshot,
+    IndicatorSnapshot,
+    MarketSnapshot,
+    PhaseAlertOutbox,
+    SentimentObservation,
+)
+from app.db.partitions import (
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    retire_partitions,
+)
+from app.db.session import SessionLocal
+
+log = logging.getLogger(__name__)
+
+DAY = timedelta(days=1)
+ROLLUP_FIELDS = tuple(column.key for column in DailySnapshot.__table__.columns)
+
+
+@dataclass
+class RetentionReport:
+    days: int = 0
+    rollups: int = 0
+    market_rows: int = 0
+    indicator_rows: int = 0
+    sentiment_rows: int = 0
+    outbox_rows: int = 0
+    partitions: int = 0
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _day_start(value: datetime) -> datetime:
+    return _utc(value).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _chunks(counts: Sequence[tuple[int, int]], batch_size: int) -> Iterator[list[int]]:
+    """Group assets so each chunk holds about ``batch_size`` raw rows (at least one asset)."""
+    chunk: list[int] = []
+    rows = 0
+    for asset_key, count in counts:
+        if chunk and rows + count > batch_size:
+            yield chunk
+            chunk, rows = [], 0
+        chunk.append(asset_key)
+        rows += count
+    if chunk:
+        yield chunk
+
+
+def _row_totals(counts: Sequence[tuple[int, int, int]]) -> list[tuple[int, int]]:
+    return [(asset_key, markets + indicators) for asset_key, markets, indicators in counts]
+
+
+def _market_rollups(session: Session, asset_keys: list[int], day: datetime) -> dict[int, dict[str, Any]]:
+    in_day = (
+        MarketSnapshot.asset_key.in_(asset_keys),
+        MarketSnapshot.as_of >= day,
+        MarketSnapshot.as_of < day + DAY,
+    )
+    rows = (
+        select(
+            MarketSnapshot.asset_key,
+            MarketSnapshot.price,
+            MarketSnapshot.price_change_pct,
+            MarketSnapshot.volume,
+            MarketSnapshot.vwap,
+            MarketSnapshot.volatility_1d,
+            func.row_number()
+            .over(partition_by=MarketSnapshot.asset_key, order_by=MarketSnapshot.as_of.asc())
+            .label("first_rank"),
+            func.row_number()
+            .over(partition_by=MarketSnapshot.asset_key, order_by=MarketSnapshot.as_of.desc())
+            .label("last_rank"),
+        )
+        .where(*in_day)
+        .subquery()
+    )
+    last = rows.c.last_rank == 1
+    stmt = select(
+        rows.c.asset_key,
+        func.max(case((rows.c.first_rank == 1, rows.c.price))).label("open"),
+        func.max(rows.c.price).label("high"),
+        func.min(rows.c.price).label("low"),
+        func.max(case((last, rows.c.price))).label("close"),
+        func.avg(rows.c.price).label("price"),
+        func.max(case((last, rows.c.price_change_pct))).label("price_change_pct"),
+        func.sum(rows.c.volume).label("volume"),
+        func.avg(rows.c.vwap).label("vwap"),
+        func.max(case((last, rows.c.volatility_1d))).label("volatility_1d"),
+        func.count().label("samples"),
+    ).group_by(rows.c.asset_key)
+    return {row.asset_key: dict(row._mapping) for row in session.execute(stmt)}
+
+
+def _last_indicators(session: Session, asset_keys: list[int], day: datetime) -> dict[int, dict[str, Any]]:
+    ranked = (
+        select(
+            IndicatorSnapshot.asset_key,
+            IndicatorSnapshot.rsi_14,
+            IndicatorSnapshot.macd,
+            IndicatorSnapshot.macd_signal,
+            IndicatorSnapshot.atr_14,
+            func.row_number()
+            .over(partition_by=IndicatorSnapshot.asset_key, order_by=IndicatorSnapshot.as_of.desc())
+            .label("last_rank"),
+        )
+        .where(
+            IndicatorSnapshot.asset_key.in_(asset_keys),
+            IndicatorSnapshot.as_of >= day,
+            IndicatorSnapshot.as_of < day + DAY,
+        )
+        .subquery()
+    )
+    stmt = select(ranked.c.asset_key, ranked.c.rsi_14, ranked.c.macd, ranked.c.macd_signal, ranked.c.atr_14).where(
+        ranked.c.last_rank == 1
+    )
+    return {row.asset_key: dict(row._mapping) for row in session.execute(stmt)}
+
+
+def _present(*values: Optional[float]) -> list[float]:
+    return [value for value in values if value is not None]
+
+
+def _fold(existing: DailySnapshot, rollup: dict[str, Any]) -> None:
+    """Fold rows that arrived for an already rolled-up day into its rollup.
+
+    The late rows are treated as the day's newest: they supply ``close`` and
+    the indicators, and extend high, low, volume and the mean price.
+    """
+    samples = existing.samples + rollup["samples"]
+    if existing.price is not None and rollup["price"] is not None:
+        existing.price = (existing.price * existing.samples + rollup["price"] * rollup["samples"]) / samples
+    else:
+        existing.price = existing.price if rollup["price"] is None else rollup["price"]
+    existing.high = max(_present(existing.high, rollup["high"]), default=None)
+    existing.low = min(_present(existing.low, rollup["low"]), default=None)
+    if existing.volume is not None or rollup["volume"] is not None:
+        existing.volume = (existing.volume or 0.0) + (rollup["volume"] or 0.0)
+    for name in ("close", "price_change_pct", "volatility_1d", "rsi_14", "macd", "macd_signal", "atr_14"):
+        if rollup.get(name) is not None:
+            setattr(existing, name, rollup[name])
+    existing.samples = samples
+
+
+class SnapshotRetention:
+    """Rolls hourly snapshots past ``rollup_after`` into ``snapshot_daily`` and deletes them.
+
+    Work runs oldest day first in chunks of about ``batch_size`` raw rows. Each
+    chunk writes its rollups and deletes the rows it aggregated in one
+    transaction, so an interrupted run loses at most the current chunk and the
+    next run resumes with whatever raw rows remain. Sentiment observations past
+    ``sentiment_after`` are deleted in batches of the same size; they are only
+    read for the recent sentiment window, so they are not rolled up.
+
+    When the snapshot tables are partitioned (PostgreSQL), whole months past the
+    horizon are rolled up and their partitions dropped (or only detached, with
+    ``detach_only``) in the same transaction instead of deleting rows, and
+    upcoming partitions are created ``months_ahead`` in advance. Days of a month
+    that is only partly past the horizon stay raw until the month is retired.
+    Sentiment partitions are retired the same way. Rows that landed in a default
+    partition because their month had none are handled row by row as above.
+
+    Phase alert outbox rows dispatched or dead-lettered more than
+    ``outbox_after`` ago are deleted in batches as well.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session] = SessionLocal,
+        rollup_after: timedelta = timedelta(days=90),
+        sentiment_after: timedelta = timedelta(days=30),
+        batch_size: int = 5000,
+        months_ahead: int = 3,
+        detach_only: bool = False,
+        outbox_after: timedelta = timedelta(days=7),
+    ) -> None:
+        self.session_factory = session_factory
+        self.rollup_after = rollup_after
+        self.sentiment_after = sentiment_after
+        self.batch_size = batch_size
+        self.months_ahead = months_ahead
+        self.detach_only = detach_only
+        self.outbox_after = outbox_after
+
+    def run(self, now: Optional[datetime] = None) -> RetentionReport:
+        now = now or datetime.now(timezone.utc)
+        report = RetentionReport()
+        # Only whole days are rolled up, so the horizon is aligned to midnight UTC.
+        cutoff = _day_start(now - self.rollup_after)
+        with self.session_factory() as session:
+            ensure_partitions(session.connection(), now, self.months_ahead)
+            session.commit()
+            if is_partitioned(session.connection(), MarketSnapshot.__tablename__):
+                cutoff = self._retire_months(session, cutoff, report)
+            while (day := self._oldest_day(session, cutoff)) is not None:
+                for asset_keys in _chunks(_row_totals(self._day_counts(session, day)), self.batch_size):
+                    self._roll_up(session, asset_keys, day, report)
+                report.days += 1
+            self._expire_sentiment(session, now - self.sentiment_after, report)
+            self._purge_outbox(session, now - self.outbox_after, report)
+        return report
+
+    def _oldest_day(self, session: Session, cutoff: datetime) -> Optional[datetime]:
+        # Indicator rows can exist without a market row for the same hour, so both tables count.
+        oldest = [
+            session.scalar(select(func.min(model.as_of)).where(model.as_of < cutoff))
+            for model in (MarketSnapshot, IndicatorSnapshot)
+        ]
+        present = [_utc(value) for value in oldest if value is not None]
+        return _day_start(min(present)) if present else None
+
+    def _day_counts(self, session: Session, day: datetime) -> Sequence[tuple[int, int, int]]:
+        """Market and indicator row counts per asset on ``day``, for assets with either."""
+        rows = union_all(
+            *(
+                select(model.asset_key, literal(markets).label("markets"), literal(indicators).label("indicators"))
+                .where(model.as_of >= day, model.as_of < day + DAY)
+                for model, markets, indicators in ((MarketSnapshot, 1, 0), (IndicatorSnapshot, 0, 1))
+            )
+        ).subquery()
+        return session.execute(
+            select(rows.c.asset_key, func.sum(rows.c.markets), func.sum(rows.c.indicators))
+            .group_by(rows.c.asset_key)
+            .order_by(rows.c.asset_key)
+        ).all()
+
+    def _retire_months(self, session: Session, cutoff: datetime, report: RetentionReport) -> datetime:
+        """Roll up and retire the months past ``cutoff``.
+
+        Returns the cutoff for rows left in the default partition: rows older
+        than the oldest remaining partition, so rolling them up row by row never
+        touches a month that is only partly past the horizon.
+        """
+        for partition in list_partitions(session.connection(), MarketSnapshot.__tablename__):
+            if partition.end > cutoff:
+                return min(cutoff, partition.start)
+            day = partition.start
+            while day < partition.end:
+                counts = self._day_counts(session, day)
+                for asset_keys in _chunks(_row_totals(counts), self.batch_size):
+                    report.rollups += self._write_rollups(session, asset_keys, day)
+                report.market_rows += sum(markets for _, markets, _ in counts)
+                report.indicator_rows += sum(indicators for _, _, indicators in counts)
+                report.days += 1 if counts else 0
+                day += DAY
+            connection = session.connection()
+            for table in (IndicatorSnapshot.__tablename__, MarketSnapshot.__tablename__):
+                report.partitions += len(retire_partitions(connection, table, partition.end, self.detach_only))
+            session.commit()
+        return cutoff
+
+    def _roll_up(self, session: Session, asset_keys: list[int], day: datetime, report: RetentionReport) -> None:
+        report.rollups += self._write_rollups(session, asset_keys, day)
+        in_day = (
+            MarketSnapshot.asset_key.in_(asset_keys),
+            MarketSnapshot.as_of >= day,
+            MarketSnapshot.as_of < day + DAY,
+        )
+        deleted_indicators = cast(
+            CursorResult[Any],
+            session.execute(
+                delete(IndicatorSnapshot)
+                .where(
+                    IndicatorSnapshot.asset_key.in_(asset_keys),
+                    IndicatorSnapshot.as_of >= day,
+                    IndicatorSnapshot.as_of < day + DAY,
+                )
+                .execution_options(synchronize_session=False)
+            ),
+        )
+        deleted_markets = cast(
+            CursorResult[Any],
+            session.execute(delete(MarketSnapshot).where(*in_day).execution_options(synchronize_session=False)),
+        )
+        session.commit()
+        report.indicator_rows += deleted_indicators.rowcount or 0
+        report.market_rows += deleted_markets.rowcount or 0
+
+    def _write_rollups(self, session: Session, asset_keys: list[int], day: datetime) -> int:
+        markets = _market_rollups(session, asset_keys, day)
+        indicators = _last_indicators(session, asset_keys, day)
+        rollups = {
+            asset_key: {
+                **dict.fromkeys(ROLLUP_FIELDS),
+                "asset_key": asset_key,
+                "as_of": day,
+                "samples": 0,
+                **markets.get(asset_key, {}),
+                **indicators.get(asset_key, {}),
+            }
+            for asset_key in markets.keys() | indicators.keys()
+        }
+
+        existing = {
+            row.asset_key: row
+            for row in session.scalars(
+                select(DailySnapshot).where(DailySnapshot.asset_key.in_(asset_keys), DailySnapshot.as_of == day)
+            )
+        }
+        fresh = []
+        for asset_key, rollup in rollups.items():
+            if asset_key in existing:
+                _fold(existing[asset_key], rollup)
+            else:
+                fresh.append(rollup)
+        if fresh:
+            session.execute(insert(DailySnapshot), fresh)
+        return len(rollups)
+
+    def _expire_sentiment(self, session: Session, cutoff: datetime, report: RetentionReport) -> None:
+        connection = session.connection()
+        if is_partitioned(connection, SentimentObservation.__tablename__):
+            # Like the snapshot tables, a month is dropped whole once all of it is past the horizon.
+            # Older rows left in the default partition are deleted below.
+            retired = retire_partitions(connection, SentimentObservation.__tablename__, cutoff, self.detach_only)
+            session.commit()
+            report.partitions += len(retired)
+            remaining = list_partitions(session.connection(), SentimentObservation.__tablename__)
+            cutoff = min(cutoff, remaining[0].start) if remaining else cutoff
+        while True:
+            expired = (
+                select(SentimentObservation.id)
+                .where(SentimentObservation.observed_at < cutoff)
+                .limit(self.batch_size)
+            )
+            result = cast(
+                CursorResult[Any],
+                session.execute(
+                    delete(SentimentObservation)
+                    .where(SentimentObservation.id.in_(expired))
+                    .execution_options(synchronize_session=False)
+                ),
+            )
+            session.commit()
+            deleted = result.rowcount or 0
+            report.sentiment_rows += deleted
+            if deleted < self.batch_size:
+                return
+
+    def _purge_outbox(self, session: Session, cutoff: datetime, report: RetentionReport) -> None:
+        while True:
+            finished = (
+                select(PhaseAlertOutbox.id)
+                .where(or_(PhaseAlertOutbox.dispatched_at < cutoff, PhaseAlertOutbox.dead_lettered_at < cutoff))
+                .limit(self.batch_size)
+            )
+            result = cast(
+                CursorResult[Any],
+                session.execute(
+                    delete(PhaseAlertOutbox)
+                    .where(PhaseAlertOutbox.id.in_(finished))
+                    .execution_options(synchronize_session=False)
+                ),
+            )
+            session.commit()
+            deleted = result.rowcount or 0
+            report.outbox_rows += deleted
+            if deleted < self.batch_size:
+                return
+
+
+def build_retention() -> SnapshotRetention:
+    settings = get_settings()
+    return SnapshotRetention(
+        rollup_after=timedelta(days=settings.retention_rollup_after_days),
+        sentiment_after=timedelta(days=settings.retention_sentiment_days),
+        batch_size=settings.retention_batch_size,
+        months_ahead=settings.partition_months_ahead,
+        detach_only=settings.partition_detach_only,
+        outbox_after=timedelta(days=settings.retention_alert_outbox_days),
+    )
+
+
+async def run_retention(retention: SnapshotRetention | None = None) -> None:
+    settings = get_settings()
+    retention = retention or build_retention()
+    while True:
+        await asyncio.sleep(settings.retention_interval_minutes * 60)
+        try:
+            report = await asyncio.to_thread(retention.run)
+            if report.market_rows or report.sentiment_rows or report.outbox_rows or report.partitions:
+                log.info("Retention: %s", report)
+        except Exception as exc:  # pragma: no cover - background logging
+            log.exception("Snapshot retention failed: %s", exc)
@@ -10,6 +10,10 @@ from sqlalchemy.orm import Session
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 from app.db.models import Asset, SentimentObservation, SentimentSource
+from app.services.latest_state import record_sentiment
+
+
+SentimentEntry = tuple[datetime, float, float]
 
 
 @dataclass
@@ -23,10 +27,15 @@ class SentimentSummary:
 class SentimentIngestor:
     """Pulls lightweight sentiment using Yahoo Finance news + VADER."""
 
-    def __init__(self, session: Session, window_minutes: int = 60) -> None:
+    def __init__(
+        self,
+        session: Session,
+        window_minutes: int = 60,
+        analyzer: SentimentIntensityAnalyzer | None = None,
+    ) -> None:
         self.session = session
         self.window = timedelta(minutes=window_minutes)
-        self.analyzer = SentimentIntensityAnalyzer()
+        self.analyzer = analyzer or SentimentIntensityAnalyzer()
         self.source = self._ensure_source("Yahoo Finance", channel="news", reliability="B")
 
     def ingest_many(self, tickers: Iterable[str]) -> list[SentimentSummary]:
@@ -38,22 +47,15 @@ class SentimentIngestor:
         return summaries
 
     def ingest_single(self, ticker: str) -> Optional[SentimentSummary]:
-        asset = self._ensure_asset(ticker)
         news_items = self._fetch_recent_news(ticker)
         if not news_items:
+            self._ensure_asset(ticker)
             return None
+        return self.persist_scores(ticker, score_news(self.analyzer, news_items))
 
-        entries = []
-        for item in news_items:
-            title = item.get("title") or ""
-            summary = item.get("summary") or item.get("publisher") or ""
-            text = f"{title}. {summary}".strip()
-            if not text:
-                continue
-            score_data = self.analyzer.polarity_scores(text)
-            observed_at = datetime.fromtimestamp(item["providerPublishTime"], tz=timezone.utc)
-            entries.append((observed_at, score_data["compound"], score_data["pos"] - score_data["neg"]))
-
+    def persist_scores(self, ticker: str, entries: list[SentimentEntry]) -> Optional[SentimentSummary]:
+        """Store the aggregate of already scored news entries for ``ticker``."""
+        asset = self._ensure_asset(ticker)
         if not entries:
             return None
 
@@ -84,6 +86,8 @@ class SentimentIngestor:
                 observed_at=latest_time,
             )
             self.session.add(observation)
+        self.session.flush()
+        record_sentiment(self.session, asset.id)
         return SentimentSummary(
             ticker=ticker,
             observations=len(entries),
@@ -92,23 +96,7 @@ class SentimentIngestor:
         )
 
     def _fetch_recent_news(self, ticker: str) -> list[dict[str, object]]:
-        try:
-            news = yf.Ticker(ticker).news or []
-        except Exception:
-            return []
-        if not news:
-            return []
-        cutoff = datetime.now(timezone.utc) - self.window
-        filtered: list[dict[str, object]] = []
-        for item in news:
-            timestamp = item.get("providerPublishTime")
-            if not isinstance(timestamp, (int, float)):
-                continue
-            observed_at = datetime.fromtimestamp(timestamp, tz=timezone.utc)
-            if observed_at < cutoff:
-                continue
-            filtered.append(item)
-        return filtered
+        return fetch_recent_news(ticker, self.window)
 
     def _ensure_source(self, name: str, channel: str, reliability: str) -> SentimentSource:
         stmt = select(SentimentSource).where(SentimentSource.name == name)
@@ -133,3 +121,40 @@ class SentimentIngestor:
         self.session.flush()
         self.session.refresh(asset)
         return asset
+
+
+def fetch_recent_news(ticker: str, window: timedelta) -> list[dict[str, object]]:
+    try:
+        news = yf.Ticker(ticker).news or []
+    except Exception:
+        return []
+    if not news:
+        return []
+    cutoff = datetime.now(timezone.utc) - window
+    filtered: list[dict[str, object]] = []
+    for item in news:
+        timestamp = item.get("providerPublishTime")
+        if not isinstance(timestamp, (int, float)):
+            continue
+        observed_at = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+        if observed_at < cutoff:
+            continue
+        filtered.append(item)
+    return filtered
+
+
+def score_news(
+    analyzer: SentimentIntensityAnalyzer, news_items: Iterable[dict[str, object]]
+) -> list[SentimentEntry]:
+    """Score news items with VADER as ``(observed_at, compound, pos - neg)`` entries."""
+    entries: list[SentimentEntry] = []
+    for item in news_items:
+        title = item.get("title") or ""
+        summary = item.get("summary") or item.get("publisher") or ""
+        text = f"{title}. {summary}".strip()
+        if not text:
+            continue
+        score_data = analyzer.polarity_scores(text)
+        observed_at = datetime.fromtimestamp(item["providerPublishTime"], tz=timezone.utc)
+        entries.append((observed_at, score_data["compound"], score_data["pos"] - score_data["neg"]))
+    return entries
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import math
+from datetime import datetime, timezone
+from typing import Any, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Integer,
+    Select,
+    SQLColumnExpression,
+    Subquery,
+    and_,
+    case,
+    cast,
+    extract,
+    func,
+    null,
+    select,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import DailySnapshot, IndicatorSnapshot, MarketSnapshot
+from app.utils.encoding import FLOAT_COLUMN, INT_COLUMN, TIMESTAMP_COLUMN, ColumnSpec
+
+# Upper bound on points returned by a downsampled series, whatever the range.
+MAX_SERIES_POINTS = 5000
+# LTTB picks from SQL bucket means at this multiple of the target, so its input
+# (and the rows shipped from the database) stays bounded on long ranges.
+LTTB_OVERSAMPLE = 8
+
+# Row layout shared by raw pages and bucketed series.
+SERIES_COLUMNS = (
+    ColumnSpec("as_of", TIMESTAMP_COLUMN),
+    ColumnSpec("price", FLOAT_COLUMN),
+    ColumnSpec("price_change_pct", FLOAT_COLUMN),
+    ColumnSpec("volume", FLOAT_COLUMN),
+    ColumnSpec("vwap", FLOAT_COLUMN),
+    ColumnSpec("volatility_1d", FLOAT_COLUMN),
+    ColumnSpec("rsi_14", FLOAT_COLUMN),
+    ColumnSpec("macd", FLOAT_COLUMN),
+    ColumnSpec("macd_signal", FLOAT_COLUMN),
+    ColumnSpec("atr_14", FLOAT_COLUMN),
+    ColumnSpec("open", FLOAT_COLUMN),
+    ColumnSpec("high", FLOAT_COLUMN),
+    ColumnSpec("low", FLOAT_COLUMN),
+    ColumnSpec("close", FLOAT_COLUMN),
+    ColumnSpec("samples", INT_COLUMN),
+)
+PRICE_INDEX = 1
+
+
+def _epoch_bucket(column: SQLColumnExpression[datetime], width: int, dialect_name: str) -> ColumnElement[Any]:
+    if dialect_name == "postgresql":
+        return func.floor(extract("epoch", column) / width)
+    return cast(func.strftime("%s", column), Integer) // width
+
+
+def _to_epoch(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _optional_float(value: object) -> Optional[float]:
+    return float(value) if value is not None else None  # type: ignore[arg-type]
+
+
+def _bounded(
+    stmt: Select[*tuple[Any, ...]],
+    column: SQLColumnExpression[datetime],
+    start: Optional[datetime],
+    end: Optional[datetime],
+    after: Optional[datetime],
+) -> Select[*tuple[Any, ...]]:
+    if start is not None:
+        stmt = stmt.where(column >= start)
+    if end is not None:
+        stmt = stmt.where(column < end)
+    if after is not None:
+        stmt = stmt.where(column > after)
+    return stmt
+
+
+def series_points(
+    asset_key: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after: Optional[datetime] = None,
+) -> Subquery:
+    """Daily rollups for retired days and raw snapshots after them, in ``SERIES_COLUMNS`` order.
+
+    Retention deletes raw rows as it rolls them up, so the two sources do not
+    overlap and ordering the union by ``as_of`` is a merge of two primary key
+    scans. Raw rows leave open/high/low/close/samples null.
+    """
+    daily = select(*(getattr(DailySnapshot, spec.name).label(spec.name) for spec in SERIES_COLUMNS)).where(
+        DailySnapshot.asset_key == asset_key
+    )
+    raw = (
+        select(
+            MarketSnapshot.as_of,
+            MarketSnapshot.price,
+            MarketSnapshot.price_change_pct,
+            MarketSnapshot.volume,
+            MarketSnapshot.vwap,
+            MarketSnapshot.volatility_1d,
+            IndicatorSnapshot.rsi_14,
+            IndicatorSnapshot.macd,
+            IndicatorSnapshot.macd_signal,
+            IndicatorSnapshot.atr_14,
+            *(cast(null(), Float).label(name) for name in ("open", "high", "low", "close")),
+            cast(null(), Integer).label("samples"),
+        )
+        .outerjoin(
+            IndicatorSnapshot,
+            and_(
+                IndicatorSnapshot.asset_key == MarketSnapshot.asset_key,
+                IndicatorSnapshot.as_of == MarketSnapshot.as_of,
+            ),
+        )
+        .where(MarketSnapshot.asset_key == asset_key)
+    )
+    return union_all(
+        _bounded(daily, DailySnapshot.as_of, start, end, after),
+        _bounded(raw, MarketSnapshot.as_of, start, end, after),
+    ).subquery("points")
+
+
+async def series_bounds(session: AsyncSession, asset_key: int) -> tuple[Optional[datetime], Optional[datetime]]:
+    points = series_points(asset_key)
+    first, last = (await session.execute(select(func.min(points.c.as_of), func.max(points.c.as_of)))).one()
+    return first, last
+
+
+def bucket_width(start: datetime, end: datetime, points: Optional[int], seconds: Optional[int]) -> int:
+    """Bucket width in seconds, widened so the range never exceeds ``MAX_SERIES_POINTS`` buckets."""
+    span = max(_to_epoch(end) - _to_epoch(start), 1.0)
+    width = seconds or math.ceil(span / min(points or MAX_SERIES_POINTS, MAX_SERIES_POINTS))
+    return max(width, math.ceil(span / MAX_SERIES_POINTS), 1)
+
+
+def bucketed_series_stmt(
+    asset_key: int, start: datetime, end: datetime, width: int, dialect_name: str
+) -> Select[*tuple[Any, ...]]:
+    """OHLC and mean aggregates per ``width``-second bucket, aligned to the epoch.
+
+    Indicators are averaged over the same buckets so both series line up.
+    Daily rollups count as ``samples`` snapshots towards the mean price and
+    contribute their own open/high/low/close.
+    """
+    points = series_points(asset_key, start, end)
+    bucket = _epoch_bucket(points.c.as_of, width, dialect_name).label("bucket")
+    rows = select(
+        bucket,
+        points,
+        func.coalesce(points.c.samples, 1).label("weight"),
+        func.row_number().over(partition_by=bucket, order_by=points.c.as_of.asc()).label("first_rank"),
+        func.row_number().over(partition_by=bucket, order_by=points.c.as_of.desc()).label("last_rank"),
+    ).subquery()
+    priced_weight = case((rows.c.price.is_not(None), rows.c.weight), else_=0)
+    return (
+        select(
+            rows.c.bucket,
+            func.max(case((rows.c.first_rank == 1, func.coalesce(rows.c.open, rows.c.price)))).label("open"),
+            func.max(func.coalesce(rows.c.high, rows.c.price)).label("high"),
+            func.min(func.coalesce(rows.c.low, rows.c.price)).label("low"),
+            func.max(case((rows.c.last_rank == 1, func.coalesce(rows.c.close, rows.c.price)))).label("close"),
+            (func.sum(rows.c.price * rows.c.weight) / func.nullif(func.sum(priced_weight), 0)).label("mean"),
+            func.max(case((rows.c.last_rank == 1, rows.c.price_change_pct))).label("price_change_pct"),
+            func.sum(rows.c.volume).label("volume"),
+            func.avg(rows.c.vwap).label("vwap"),
+            func.avg(rows.c.volatility_1d).label("volatility_1d"),
+            func.avg(rows.c.rsi_14).label("rsi_14"),
+            func.avg(rows.c.macd).label("macd"),
+            func.avg(rows.c.macd_signal).label("macd_signal"),
+            func.avg(rows.c.atr_14).label("atr_14"),
+            func.sum(rows.c.weight).label("samples"),
+        )
+        .group_by(rows.c.bucket)
+        .order_by(rows.c.bucket.asc())
+    )
+
+
+def _bucket_row(row: Any, width: int) -> tuple[Any, ...]:
+    return (
+        datetime.fromtimestamp(int(row.bucket) * width, tz=timezone.utc),
+        _optional_float(row.mean),
+        _optional_float(row.price_change_pct),
+        _optional_float(row.volume),
+        _optional_float(row.vwap),
+        _optional_float(row.volatility_1d),
+        _optional_float(row.rsi_14),
+        _optional_float(row.macd),
+        _optional_float(row.macd_signal),
+        _optional_float(row.atr_14),
+        _optional_float(row.open),
+        _optional_float(row.high),
+        _optional_float(row.low),
+        _optional_float(row.close),
+        row.samples,
+    )
+
+
+async def bucketed_rows(
+    session: AsyncSession, asset_key: int, start: datetime, end: datetime, width: int
+) -> list[tuple[Any, ...]]:
+    """Bucket aggregates as tuples in ``SERIES_COLUMNS`` order; ``price`` is the bucket mean."""
+    dialect_name = session.get_bind().dialect.name
+    result = await session.execute(bucketed_series_stmt(asset_key, start, end, width, dialect_name))
+    return [_bucket_row(row, width) for row in result]
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of ``threshold`` points that keep the shape of ``y``.
+
+    The first and last points are always kept; every bucket in between keeps
+    the point forming the largest triangle with the previous pick and the
+    mean of the next bucket.
+    """
+    size = len(x)
+    if threshold >= size or threshold < 3:
+        return np.arange(size)
+    every = (size - 2) / (threshold - 2)
+    picked = np.empty(threshold, dtype=int)
+    picked[0], picked[-1] = 0, size - 1
+    previous = 0
+    for index in range(threshold - 2):
+        lo, hi = int(index * every) + 1, int((index + 1) * every) + 1
+        next_lo, next_hi = hi, min(int((index + 2) * every) + 1, size)
+        mean_x, mean_y = x[next_lo:next_hi].mean(), y[next_lo:next_hi].mean()
+        area = np.abs(
+            (x[previous] - mean_x) * (y[lo:hi] - y[previous])
+            - (x[previous] - x[lo:hi]) * (mean_y - y[previous])
+        )
+        previous = lo + int(area.argmax())
+        picked[index + 1] = previous
+    return picked
+
+
+def lttb_rows(rows: Sequence[tuple[Any, ...]], threshold: int) -> list[tuple[Any, ...]]:
+    """Downsample ``SERIES_COLUMNS`` tuples on price, dropping buckets without one."""
+    priced = [row for row in rows if row[PRICE_INDEX] is not None]
+    if len(priced) <= threshold:
+        return priced
+    x = np.fromiter((_to_epoch(row[0]) for row in priced), dtype=float, count=len(priced))
+    y = np.fromiter((row[PRICE_INDEX] for row in priced), dtype=float, count=len(priced))
+    return [priced[index] for index in lttb_indices(x, y, threshold)]
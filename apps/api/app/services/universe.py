@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional, cast
+
+from sqlalchemy import ColumnElement, CursorResult, or_, select, update
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import get_settings
+from app.db.models import Asset, UserAsset
+from app.db.session import SessionLocal
+from app.utils.tickers import resolve_ticker
+
+log = logging.getLogger(__name__)
+
+# Demand is written at most once per interval so hot reads do not update on every request.
+DEMAND_TOUCH_INTERVAL = timedelta(minutes=5)
+
+
+def _canonical(tickers: Iterable[str]) -> list[str]:
+    normalized = [resolve_ticker(ticker.strip())[0] for ticker in tickers if ticker and ticker.strip()]
+    return list(dict.fromkeys(normalized))
+
+
+def _needs_touch(now: datetime) -> ColumnElement[bool]:
+    return or_(
+        Asset.is_active.is_(False),
+        Asset.last_demanded_at.is_(None),
+        Asset.last_demanded_at < now - DEMAND_TOUCH_INTERVAL,
+    )
+
+
+def record_demand(session: Session, tickers: Iterable[str], now: Optional[datetime] = None) -> int:
+    """Mark assets as demanded, re-activating dormant ones.
+
+    Assets already touched within ``DEMAND_TOUCH_INTERVAL`` are left alone.
+    Returns the number of rows updated.
+    """
+    canonical = _canonical(tickers)
+    if not canonical:
+        return 0
+    now = now or datetime.now(timezone.utc)
+    result = cast(
+        CursorResult[Any],
+        session.execute(
+            update(Asset)
+            .where(Asset.ticker.in_(canonical), _needs_touch(now))
+            .values(is_active=True, last_demanded_at=now)
+            .execution_options(synchronize_session=False)
+        ),
+    )
+    return result.rowcount or 0
+
+
+class DemandBuffer:
+    """Tickers read since the last flush.
+
+    Read endpoints note demand here instead of updating ``assets`` on every
+    cache miss; ``flush`` writes the accumulated set with one ``record_demand``.
+    """
+
+    def __init__(self) -> None:
+        self._tickers: set[str] = set()
+        self._lock = threading.Lock()
+
+    def note(self, tickers: Iterable[str]) -> None:
+        with self._lock:
+            self._tickers.update(ticker.strip().upper() for ticker in tickers if ticker and ticker.strip())
+
+    def drain(self) -> list[str]:
+        with self._lock:
+            tickers, self._tickers = sorted(self._tickers), set()
+        return tickers
+
+    def flush(self, session: Session, now: Optional[datetime] = None) -> int:
+        tickers = self.drain()
+        try:
+            return record_demand(session, tickers, now)
+        except Exception:
+            self.note(tickers)
+            raise
+
+
+demand_buffer = DemandBuffer()
+
+
+def flush_demand(session_factory: sessionmaker[Session] = SessionLocal) -> int:
+    with session_factory() as session:
+        updated = demand_buffer.flush(session)
+        session.commit()
+    return updated
+
+
+async def run_demand_flusher() -> None:
+    settings = get_settings()
+    while True:
+        await asyncio.sleep(settings.demand_flush_seconds)
+        try:
+            await asyncio.to_thread(flush_demand)
+        except Exception as exc:  # pragma: no cover - background logging
+            log.exception("Demand flush failed: %s", exc)
+
+
+def refresh_active_universe(session: Session, now: Optional[datetime] = None) -> list[str]:
+    """Recompute which assets are ingested and return the active tickers.
+
+    Watched assets and the configured ``ingest_tickers`` always count as demand.
+    Any other asset without demand inside ``asset_demand_ttl_hours`` is demoted
+    to dormant until it is requested again.
+    """
+    settings = get_settings()
+    now = now or datetime.now(timezone.utc)
+    # Reads noted in this process count before anything is demoted.
+    demand_buffer.flush(session, now)
+    pinned = _canonical(settings.ingest_tickers)
+    watched = select(UserAsset.asset_id).distinct().scalar_subquery()
+    demanded = or_(Asset.id.in_(watched), Asset.ticker.in_(pinned)) if pinned else Asset.id.in_(watched)
+
+    session.execute(
+        update(Asset)
+        .where(demanded, _needs_touch(now))
+        .values(is_active=True, last_demanded_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    session.execute(
+        update(Asset)
+        .where(
+            Asset.is_active.is_(True),
+            ~demanded,
+            or_(
+                Asset.last_demanded_at.is_(None),
+                Asset.last_demanded_at < now - timedelta(hours=settings.asset_demand_ttl_hours),
+            ),
+        )
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    active = set(session.scalars(select(Asset.ticker).where(Asset.is_active.is_(True))))
+    # Pinned tickers are ingested even before their asset row exists.
+    active.update(pinned)
+    return sorted(ticker for ticker in active if ticker)
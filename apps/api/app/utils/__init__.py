@@ -1 +1 @@
-__all__ = ["tickers", "assets"]
+__all__ = ["tickers", "assets", "cursor"]
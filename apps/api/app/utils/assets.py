@@ -1,14 +1,27 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Iterable, Optional
 
+from fastapi import HTTPException, status
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.db.models import Asset
 from app.utils.tickers import resolve_ticker
 
 
+async def asset_by_ticker(session: AsyncSession, ticker: str) -> Asset:
+    normalized = ticker.upper()
+    asset = (await session.scalars(select(Asset).where(Asset.ticker == normalized))).first()
+    if not asset:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Asset with ticker {normalized} not found",
+        )
+    return asset
+
+
 def get_or_create_asset(
     session: Session,
     raw_ticker: str,
@@ -40,9 +53,46 @@ def get_or_create_asset(
         display_ticker=display,
         name=name,
         exchange=exchange,
-        type=asset_type_hint or ("crypto" if canonical.endswith("-USD") else "stock"),
+        type=_asset_type(canonical, asset_type_hint),
     )
     session.add(asset)
     session.flush()
     session.refresh(asset)
     return asset
+
+
+def _asset_type(canonical: str, asset_type_hint: Optional[str] = None) -> str:
+    return asset_type_hint or ("crypto" if canonical.endswith("-USD") else "stock")
+
+
+def get_or_create_assets(session: Session, raw_tickers: Iterable[str]) -> tuple[list[Asset], list[Asset]]:
+    """Resolve many tickers with one lookup and one batched insert.
+
+    Returns ``(assets, created)``: every resolved asset in request order with
+    duplicates removed, and the subset that did not exist before.
+    """
+    resolved: dict[str, Optional[str]] = {}
+    for raw in raw_tickers:
+        if raw and raw.strip():
+            canonical, display = resolve_ticker(raw.strip())
+            resolved.setdefault(canonical, display)
+    if not resolved:
+        return [], []
+
+    existing = {
+        asset.ticker: asset
+        for asset in session.scalars(select(Asset).where(Asset.ticker.in_(list(resolved)))).all()
+    }
+    created: list[Asset] = []
+    for canonical, display in resolved.items():
+        asset = existing.get(canonical)
+        if asset is None:
+            asset = Asset(ticker=canonical, display_ticker=display, type=_asset_type(canonical))
+            existing[canonical] = asset
+            created.append(asset)
+        elif display and asset.display_ticker != display:
+            asset.display_ticker = display
+    if created:
+        session.add_all(created)
+        session.flush()
+    return [existing[canonical] for canonical in resolved], created
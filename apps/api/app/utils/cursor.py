@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+
+
+def _utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def encode_cursor(position: datetime, row_id: Optional[UUID] = None) -> str:
+    """Opaque token for a keyset position: the last row's timestamp and, if needed, its id."""
+    data: dict[str, str] = {"t": _utc(position).isoformat()}
+    if row_id is not None:
+        data["id"] = str(row_id)
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str) -> tuple[datetime, Optional[UUID]]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        position = _utc(datetime.fromisoformat(data["t"]))
+        row_id = UUID(data["id"]) if "id" in data else None
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from None
+    return position, row_id
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import io
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Optional, Sequence
+
+from fastapi import Request
+from pydantic import TypeAdapter
+
+try:  # pragma: no cover - optional fast JSON encoder
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+try:  # pragma: no cover - optional binary formats
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+except ImportError:  # pragma: no cover
+    pa = None
+
+try:  # pragma: no cover - optional binary formats
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_ALIASES = {MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack"}
+
+UUID_COLUMN = "uuid"
+STRING_COLUMN = "string"
+FLOAT_COLUMN = "float"
+INT_COLUMN = "int"
+TIMESTAMP_COLUMN = "timestamp"
+
+# pydantic writes large floats as ``1e+16`` where orjson writes ``1e16``.
+# Anchored on the preceding ":" or "," so UUID hex like "3e4" does not match.
+_POSITIVE_EXPONENT = re.compile(rb"[:,\[]-?[0-9]+(?:\.[0-9]+)?e[0-9]")
+
+# OpenAPI ``responses`` entry for routes that negotiate a binary format.
+BINARY_RESPONSES: dict[int | str, dict[str, Any]] = {
+    200: {
+        "content": {ARROW_MEDIA_TYPE: {}, MSGPACK_MEDIA_TYPE: {}},
+        "description": "Columnar Arrow IPC stream or MessagePack map when requested via Accept",
+    }
+}
+
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    name: str
+    kind: str
+
+
+def binary_media_types() -> list[str]:
+    available = []
+    if pa is not None:
+        available.append(ARROW_MEDIA_TYPE)
+    if msgpack is not None:
+        available.append(MSGPACK_MEDIA_TYPE)
+    return available
+
+
+def negotiate_media_type(request: Request) -> str:
+    """Pick the response format from ``Accept``; JSON unless a binary format is preferred."""
+    header = request.headers.get("accept")
+    if not header:
+        return JSON_MEDIA_TYPE
+    available = set(binary_media_types())
+    ranked: list[tuple[float, int, str]] = []
+    for position, part in enumerate(header.split(",")):
+        media_type, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = media_type.strip().lower()
+        if media_type in _MSGPACK_ALIASES:
+            media_type = MSGPACK_MEDIA_TYPE
+        if quality > 0 and (media_type == JSON_MEDIA_TYPE or media_type in available):
+            ranked.append((-quality, position, media_type))
+    return min(ranked)[2] if ranked else JSON_MEDIA_TYPE
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def fast_json(payload: Any) -> Optional[bytes]:
+    """Encode plain rows with orjson, byte-for-byte as pydantic would.
+
+    Returns ``None`` when orjson is missing or the payload holds a float that
+    the two encoders format differently; callers then fall back to pydantic.
+    """
+    if orjson is None:
+        return None
+    body = orjson.dumps(payload, default=_json_default, option=orjson.OPT_UTC_Z)
+    if _POSITIVE_EXPONENT.search(body):
+        return None
+    return body
+
+
+def row_dicts(specs: Sequence[ColumnSpec], rows: Sequence[Sequence[Any]]) -> list[dict[str, Any]]:
+    names = [spec.name for spec in specs]
+    return [dict(zip(names, row)) for row in rows]
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _column_values(kind: str, values: Sequence[Any]) -> list[Any]:
+    if kind == UUID_COLUMN:
+        return [str(value) if value is not None else None for value in values]
+    if kind == FLOAT_COLUMN and any(isinstance(value, Decimal) for value in values):
+        return [float(value) if value is not None else None for value in values]
+    return list(values)
+
+
+def _columns(specs: Sequence[ColumnSpec], rows: Sequence[Sequence[Any]]) -> list[list[Any]]:
+    if not rows:
+        return [[] for _ in specs]
+    return [_column_values(spec.kind, values) for spec, values in zip(specs, zip(*rows))]
+
+
+def _arrow_type(kind: str) -> Any:
+    return {
+        UUID_COLUMN: pa.string(),
+        STRING_COLUMN: pa.string(),
+        FLOAT_COLUMN: pa.float64(),
+        INT_COLUMN: pa.int64(),
+        TIMESTAMP_COLUMN: pa.timestamp("us", tz="UTC"),
+    }[kind]
+
+
+def encode_arrow(specs: Sequence[ColumnSpec], rows: Sequence[Sequence[Any]]) -> bytes:
+    """One Arrow IPC stream with a single record batch, built column by column."""
+    schema = pa.schema([pa.field(spec.name, _arrow_type(spec.kind)) for spec in specs])
+    arrays = [
+        pa.array(values, type=schema.field(index).type)
+        for index, values in enumerate(_columns(specs, rows))
+    ]
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(pa.record_batch(arrays, schema=schema))
+    return sink.getvalue()
+
+
+def encode_msgpack(specs: Sequence[ColumnSpec], rows: Sequence[Sequence[Any]]) -> bytes:
+    """A map of column name to value array; timestamps use the MessagePack timestamp extension."""
+    columns = _columns(specs, rows)
+    for spec, values in zip(specs, columns):
+        if spec.kind == TIMESTAMP_COLUMN:
+            values[:] = [_utc(value) for value in values]
+    packed: bytes = msgpack.packb(
+        {spec.name: values for spec, values in zip(specs, columns)},
+        datetime=True,
+        use_bin_type=True,
+    )
+    return packed
+
+
+def encode_rows(media_type: str, specs: Sequence[ColumnSpec], rows: Sequence[Sequence[Any]]) -> bytes:
+    if media_type == ARROW_MEDIA_TYPE:
+        return encode_arrow(specs, rows)
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return encode_msgpack(specs, rows)
+    raise ValueError(f"Unsupported row encoding {media_type}")
+
+
+def render_rows(
+    media_type: str,
+    specs: Sequence[ColumnSpec],
+    rows: Sequence[Any],
+    adapter: TypeAdapter[Any],
+) -> bytes:
+    """Encode result rows straight from the tuples in the negotiated format.
+
+    The ``specs`` names must match the response model's fields, in order, so
+    the JSON fast path produces the same bytes as ``adapter``; ``adapter`` is
+    only used when that path is unavailable.
+    """
+    if media_type != JSON_MEDIA_TYPE:
+        return encode_rows(media_type, specs, rows)
+    body = fast_json(row_dicts(specs, rows))
+    if body is None:
+        names = [spec.name for spec in specs]
+        body = adapter.dump_json(adapter.validate_python([dict(zip(names, row)) for row in rows]))
+    return body
@@ -0,0 +1,97 @@
+"""Compare payload size and encode time of JSON, Arrow and MessagePack bodies.
+
+Builds ``--rows`` market snapshot result tuples in memory and encodes them the
+way ``/snapshots/latest`` does for each negotiated format, plus the pydantic
+JSON encoding the orjson fast path replaces. Reports the median encode time
+and body size per format.
+
+    python benchmarks/bench_binary_encoding.py --rows 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.routers.snapshots import _MARKET_COLUMNS, _MARKET_SNAPSHOTS  # noqa: E402
+from app.utils.encoding import (  # noqa: E402
+    ARROW_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    binary_media_types,
+    render_rows,
+    row_dicts,
+)
+
+SPECS = [spec for _, spec in _MARKET_COLUMNS]
+
+
+class _Row(namedtuple("_Row", [spec.name for spec in SPECS])):
+    @property
+    def _mapping(self) -> dict:
+        return self._asdict()
+
+
+def build_rows(count: int) -> list[_Row]:
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return [
+        _Row(
+            uuid.uuid4(),
+            f"T{index:06d}",
+            f"Asset {index}",
+            "stock",
+            start + timedelta(minutes=index),
+            100.0 + index * 0.01,
+            0.5,
+            1_000_000.0 + index,
+            100.0 + index * 0.01,
+            1.2,
+        )
+        for index in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    formats = [JSON_MEDIA_TYPE] + [
+        media_type for media_type in (ARROW_MEDIA_TYPE, MSGPACK_MEDIA_TYPE) if media_type in binary_media_types()
+    ]
+    encoders: list[tuple[str, Callable[[], bytes]]] = [
+        (
+            "application/json (pydantic)",
+            lambda: _MARKET_SNAPSHOTS.dump_json(_MARKET_SNAPSHOTS.validate_python(row_dicts(SPECS, rows))),
+        )
+    ]
+    encoders += [
+        (media_type, lambda media_type=media_type: render_rows(media_type, SPECS, rows, _MARKET_SNAPSHOTS))
+        for media_type in formats
+    ]
+    print(f"{args.rows} rows")
+    for label, encode in encoders:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            body = encode()
+            timings.append(time.perf_counter() - started)
+        print(
+            f"{label:38s} median {statistics.median(timings) * 1000:8.1f} ms"
+            f"  {len(body) / 1024:10.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
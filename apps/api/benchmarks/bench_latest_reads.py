@@ -0,0 +1,117 @@
+"""Compare /snapshots/latest read paths as snapshot history grows.
+
+Seeds a temporary SQLite database with ``--assets`` assets and an increasing
+number of hourly snapshots per asset, then times the previous
+``GROUP BY asset_key, max(as_of)`` query against the ``asset_latest`` read.
+
+    python benchmarks/bench_latest_reads.py --assets 100 --history 24 240 2400
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, insert, select
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.db.models import Asset, AssetLatest, Base, MarketSnapshot  # noqa: E402
+
+
+def seed(session: Session, assets: int, history: int) -> None:
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    asset_rows = [{"key": i + 1, "id": uuid.uuid4(), "ticker": f"T{i:05d}", "type": "stock"} for i in range(assets)]
+    session.execute(insert(Asset), asset_rows)
+    snapshots = []
+    latest = []
+    for asset in asset_rows:
+        for hour in range(history):
+            snapshots.append(
+                {
+                    "asset_key": asset["key"],
+                    "price": 100.0 + hour,
+                    "price_change_pct": 0.1,
+                    "volume": 1000.0,
+                    "vwap": 100.0,
+                    "volatility_1d": 1.0,
+                    "as_of": now - timedelta(hours=hour),
+                }
+            )
+        latest.append({"asset_id": asset["id"], "market_as_of": now, "price": 100.0})
+    session.execute(insert(MarketSnapshot), snapshots)
+    session.execute(insert(AssetLatest), latest)
+    session.commit()
+
+
+def group_by_latest(session: Session) -> int:
+    latest_subquery = (
+        select(
+            MarketSnapshot.asset_key.label("asset_key"),
+            func.max(MarketSnapshot.as_of).label("max_as_of"),
+        )
+        .group_by(MarketSnapshot.asset_key)
+        .subquery()
+    )
+    stmt = (
+        select(MarketSnapshot, Asset)
+        .join(Asset, MarketSnapshot.asset_key == Asset.key)
+        .join(
+            latest_subquery,
+            (MarketSnapshot.asset_key == latest_subquery.c.asset_key)
+            & (MarketSnapshot.as_of == latest_subquery.c.max_as_of),
+        )
+        .order_by(Asset.ticker.asc())
+    )
+    return len(session.execute(stmt).all())
+
+
+def asset_latest(session: Session) -> int:
+    stmt = (
+        select(AssetLatest, Asset)
+        .join(Asset, AssetLatest.asset_id == Asset.id)
+        .where(AssetLatest.market_as_of.is_not(None))
+        .order_by(Asset.ticker.asc())
+    )
+    return len(session.execute(stmt).all())
+
+
+def timed(fn, session: Session, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        session.expunge_all()
+        started = time.perf_counter()
+        fn(session)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=100)
+    parser.add_argument("--history", type=int, nargs="+", default=[24, 240, 2400])
+    parser.add_argument("--repeats", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"{'rows/asset':>10} {'total rows':>11} {'group by (ms)':>14} {'asset_latest (ms)':>18}")
+    for history in args.history:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite+pysqlite:///{tmp}/bench.db")
+            Base.metadata.create_all(engine)
+            with Session(engine) as session:
+                seed(session, args.assets, history)
+                old = timed(group_by_latest, session, args.repeats)
+                new = timed(asset_latest, session, args.repeats)
+            engine.dispose()
+        print(f"{history:>10} {history * args.assets:>11} {old:>14.2f} {new:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
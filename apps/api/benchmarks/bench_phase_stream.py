@@ -0,0 +1,102 @@
+"""Measure phase stream fan-out on one event loop.
+
+Opens ``--subscribers`` subscriptions, each following ``--per-subscriber``
+random tickers out of ``--tickers`` (plus ``--firehose`` subscribers that
+follow everything), and drains them concurrently. Every cycle publishes one
+``latest`` event per ticker in small batches, the way classify commits arrive,
+and ends when every reading consumer has caught up. ``--stalled`` subscribers
+never read, so they show how many get dropped once their buffers fill.
+
+    python benchmarks/bench_phase_stream.py --subscribers 5000 --tickers 500
+    python benchmarks/bench_phase_stream.py --stalled 0.01
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.phase_events import EVENT_LATEST, PhaseEvent, PhaseEventBroker, Subscription  # noqa: E402
+
+
+async def consume(subscription: Subscription, counter: list[int]) -> None:
+    while True:
+        item = await subscription.get()
+        if item is None:
+            return
+        item.encode()
+        counter[0] += 1
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(7)
+    tickers = [f"T{i:04d}" for i in range(args.tickers)]
+    broker = PhaseEventBroker(buffer_size=args.buffer)
+    delivered = [0]
+    readers: list[Subscription] = []
+    consumers = []
+    for index in range(args.subscribers):
+        wanted = None if index < args.firehose else rng.sample(tickers, args.per_subscriber)
+        subscription = broker.subscribe(wanted)
+        # Stalled subscribers never read and should be dropped once their buffer fills.
+        if rng.random() < args.stalled:
+            continue
+        readers.append(subscription)
+        consumers.append(asyncio.create_task(consume(subscription, delivered)))
+
+    events = [
+        PhaseEvent(kind=EVENT_LATEST, ticker=ticker, payload=b'{"ticker":"%s"}' % ticker.encode())
+        for ticker in tickers
+    ]
+    batches = [events[i : i + args.batch] for i in range(0, len(events), args.batch)]
+    print(f"{'cycle':>5} {'fan-out (ms)':>13} {'drained (ms)':>13} {'deliveries':>11} {'dropped':>8}")
+    drain_times = []
+    for cycle in range(args.cycles):
+        before = delivered[0]
+        fan_out = 0.0
+        started = time.perf_counter()
+        for batch in batches:
+            # One batch per committed ticker group, as the classify stage publishes.
+            publish_started = time.perf_counter()
+            broker.publish(batch)
+            fan_out += time.perf_counter() - publish_started
+            await asyncio.sleep(0)
+        while any(not subscription.queue.empty() for subscription in readers):
+            await asyncio.sleep(0)
+        drained = time.perf_counter() - started
+        drain_times.append(drained)
+        print(
+            f"{cycle:>5} {fan_out * 1000:>13.2f} {drained * 1000:>13.2f}"
+            f" {delivered[0] - before:>11} {broker.dropped_subscribers:>8}"
+        )
+
+    median = statistics.median(drain_times)
+    per_cycle = delivered[0] / args.cycles
+    print(f"median {median * 1000:.2f} ms per cycle, {per_cycle / median:,.0f} deliveries/s")
+    for task in consumers:
+        task.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subscribers", type=int, default=5000)
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--per-subscriber", type=int, default=10)
+    parser.add_argument("--firehose", type=int, default=50)
+    parser.add_argument("--buffer", type=int, default=64)
+    parser.add_argument("--batch", type=int, default=2, help="Events per publish call")
+    parser.add_argument("--cycles", type=int, default=8)
+    parser.add_argument("--stalled", type=float, default=0.0, help="Fraction of subscribers that never read")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
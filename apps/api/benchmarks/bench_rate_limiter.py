@@ -0,0 +1,89 @@
+"""Measure in-process rate limiter throughput across threads.
+
+Each thread performs ``--checks`` limiter checks against keys drawn from a
+pool of ``--keys`` clients, the way threadpool workers serve concurrent
+requests. Reports checks/sec for every thread count, whether the admitted
+total matched the limit exactly, and how many keys the limiter kept.
+
+    python benchmarks/bench_rate_limiter.py --threads 1 2 4 8 --keys 1000
+    python benchmarks/bench_rate_limiter.py --shards 1
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import HTTPException  # noqa: E402
+
+from app.dependencies.rate_limit import InMemoryRateLimiter  # noqa: E402
+
+
+def run(threads: int, args: argparse.Namespace) -> None:
+    limiter = InMemoryRateLimiter(
+        max_requests=args.limit, window_seconds=3600, max_keys=args.max_keys, shards=args.shards
+    )
+    rng = random.Random(threads)
+    keys = [f"10.0.{i // 256}.{i % 256}" for i in range(args.keys)]
+    plans = [[rng.choice(keys) for _ in range(args.checks)] for _ in range(threads)]
+    admitted = [0] * threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int) -> None:
+        barrier.wait()
+        count = 0
+        for key in plans[index]:
+            try:
+                limiter.check(key)
+                count += 1
+            except HTTPException:
+                pass
+        admitted[index] = count
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    expected = sum(min(count, args.limit) for count in _per_key_counts(plans).values())
+    total = threads * args.checks
+    print(
+        f"{threads:>7} {total / elapsed:>14,.0f} {sum(admitted):>9} {expected:>9}"
+        f" {limiter.tracked_keys:>8}"
+    )
+
+
+def _per_key_counts(plans: list[list[str]]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for plan in plans:
+        for key in plan:
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--checks", type=int, default=100_000, help="Checks per thread")
+    parser.add_argument("--keys", type=int, default=1_000)
+    parser.add_argument("--limit", type=int, default=120)
+    parser.add_argument("--max-keys", type=int, default=100_000)
+    parser.add_argument("--shards", type=int, default=16)
+    args = parser.parse_args()
+    print(f"{'threads':>7} {'checks/s':>14} {'admitted':>9} {'expected':>9} {'tracked':>8}")
+    for threads in args.threads:
+        run(threads, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Compare the Lua token-bucket limiter with the old WATCH/MULTI loop.
+
+Runs ``--threads`` workers, each issuing ``--checks`` limiter checks against
+``--keys`` hot client keys, and reports per-check latency percentiles,
+throughput and server round trips per check. Uses an in-process fakeredis
+server unless ``--url`` points at a real Redis, where round trips dominate.
+
+    python benchmarks/bench_redis_rate_limiter.py --threads 8 --keys 4
+    python benchmarks/bench_redis_rate_limiter.py --url redis://localhost:6379/15
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import redis  # noqa: E402
+from fastapi import HTTPException  # noqa: E402
+
+from app.dependencies.rate_limit import RedisRateLimiter  # noqa: E402
+
+
+class WatchMultiLimiter:
+    """The previous optimistic-locking implementation, kept for comparison."""
+
+    def __init__(self, client: Any, max_requests: int, window_seconds: int = 60) -> None:
+        self.client = client
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+
+    def check(self, key: str) -> None:
+        redis_key = f"rate-watch:{key}"
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(redis_key)
+                    current = pipe.get(redis_key)
+                    if current is None:
+                        pipe.multi()
+                        pipe.set(redis_key, 1, ex=self.window_seconds)
+                        pipe.execute()
+                        return
+                    if int(current) >= self.max_requests:
+                        self.client.ttl(redis_key)
+                        raise HTTPException(status_code=429)
+                    pipe.multi()
+                    pipe.incr(redis_key)
+                    pipe.execute()
+                    return
+                except redis.WatchError:
+                    continue
+
+
+def counting_client(args: argparse.Namespace) -> tuple[Any, list[int]]:
+    if args.url:
+        client = redis.Redis.from_url(args.url)
+        client.flushdb()
+    else:
+        import fakeredis
+
+        client = fakeredis.FakeRedis()
+    calls = [0]
+    execute_command = client.execute_command
+
+    def counted(*command: Any, **options: Any) -> Any:
+        calls[0] += 1
+        return execute_command(*command, **options)
+
+    client.execute_command = counted
+    # Pipelines send their buffered commands directly on the connection.
+    pipeline = client.pipeline
+
+    def counted_pipeline(*pargs: Any, **kwargs: Any) -> Any:
+        pipe = pipeline(*pargs, **kwargs)
+        original = pipe.immediate_execute_command
+        original_execute = pipe.execute
+
+        def immediate(*command: Any, **options: Any) -> Any:
+            calls[0] += 1
+            return original(*command, **options)
+
+        def execute(*eargs: Any, **ekwargs: Any) -> Any:
+            calls[0] += 1
+            return original_execute(*eargs, **ekwargs)
+
+        pipe.immediate_execute_command = immediate
+        pipe.execute = execute
+        return pipe
+
+    client.pipeline = counted_pipeline
+    return client, calls
+
+
+def run(name: str, build: Callable[[Any], Any], args: argparse.Namespace) -> None:
+    client, calls = counting_client(args)
+    limiter = build(client)
+    keys = [f"10.0.0.{i}" for i in range(args.keys)]
+    limiter.check(keys[0])
+    calls[0] = 0
+    latencies: list[list[float]] = [[] for _ in range(args.threads)]
+    barrier = threading.Barrier(args.threads + 1)
+
+    def worker(index: int) -> None:
+        rng = random.Random(index)
+        samples = latencies[index]
+        barrier.wait()
+        for _ in range(args.checks):
+            key = rng.choice(keys)
+            started = time.perf_counter()
+            try:
+                limiter.check(key)
+            except HTTPException:
+                pass
+            samples.append(time.perf_counter() - started)
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(args.threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    flat = sorted(sample for samples in latencies for sample in samples)
+    total = len(flat)
+    p99 = flat[int(total * 0.99) - 1]
+    print(
+        f"{name:<12} {statistics.median(flat) * 1e6:>9.0f} {p99 * 1e6:>9.0f}"
+        f" {total / elapsed:>12,.0f} {calls[0] / total:>12.2f}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--checks", type=int, default=2_000, help="Checks per thread")
+    parser.add_argument("--keys", type=int, default=4, help="Hot client keys shared by all threads")
+    parser.add_argument("--limit", type=int, default=1_000_000)
+    parser.add_argument("--url", default=None, help="Benchmark a real Redis instead of fakeredis")
+    args = parser.parse_args()
+
+    print(f"{'limiter':<12} {'p50 (us)':>9} {'p99 (us)':>9} {'checks/s':>12} {'trips/check':>12}")
+    run("watch-multi", lambda client: WatchMultiLimiter(client, args.limit), args)
+    run("lua-bucket", lambda client: RedisRateLimiter(client, args.limit), args)
+
+
+if __name__ == "__main__":
+    main()
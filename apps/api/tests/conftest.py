@@ -1,6 +1,92 @@
 import sys
+from collections.abc import AsyncIterator, Iterator
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.db.models import Base
+from app.db.session import async_database_url, get_async_session, get_session
+from app.dependencies.rate_limit import enforce_rate_limit
+from app.main import create_app
+
+
+@pytest.fixture()
+def database_url(request: pytest.FixtureRequest, tmp_path: Path) -> str:
+    """A SQLite file shared by the sync and aiosqlite engines.
+
+    The file is named after the test module; parametrize ``database_url``
+    indirectly to pick another name.
+    """
+    default = request.module.__name__.rpartition(".")[2].removeprefix("test_") + ".db"
+    return f"sqlite+pysqlite:///{tmp_path / getattr(request, 'param', default)}"
+
+
+@pytest.fixture()
+def engine(database_url: str) -> Iterator[Engine]:
+    engine = create_engine(database_url, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture()
+def session_factory(engine: Engine) -> sessionmaker[Session]:
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture()
+def session(session_factory: sessionmaker[Session]) -> Iterator[Session]:
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture()
+def async_engine(database_url: str) -> AsyncEngine:
+    return create_async_engine(async_database_url(database_url), poolclass=NullPool)
+
+
+@pytest.fixture()
+def app(session_factory: sessionmaker[Session], async_engine: AsyncEngine) -> FastAPI:
+    """The API wired to the test database, with rate limiting switched off."""
+    AsyncTestingSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_session() -> Iterator[Session]:
+        with session_factory() as db:
+            try:
+                yield db
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+    async def override_async_session() -> AsyncIterator[AsyncSession]:
+        async with AsyncTestingSession() as db:
+            yield db
+            await db.commit()
+
+    app = create_app(init_db=False)
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[get_async_session] = override_async_session
+    app.dependency_overrides[enforce_rate_limit] = lambda: None
+    return app
+
+
+@pytest.fixture()
+def client(app: FastAPI) -> Iterator[TestClient]:
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterator
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.models import Asset, Base, User, UserAsset
+from app.services.universe import DemandBuffer, record_demand, refresh_active_universe
+
+
+@pytest.fixture()
+def session() -> Iterator[Session]:
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    TestingSession = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    session = TestingSession()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def test_refresh_demotes_assets_without_demand(session: Session) -> None:
+    now = datetime.now(timezone.utc)
+    stale = now - timedelta(days=30)
+    watched = Asset(ticker="TSLA", type="stock", last_demanded_at=stale)
+    forgotten = Asset(ticker="GME", type="stock", last_demanded_at=stale)
+    recent = Asset(ticker="AMD", type="stock", last_demanded_at=now - timedelta(hours=1))
+    pinned = Asset(ticker="NVDA", type="stock", last_demanded_at=stale)
+    user = User(session_token="token")
+    session.add_all([watched, forgotten, recent, pinned, user])
+    session.flush()
+    session.add(UserAsset(user_id=user.id, asset_id=watched.id, display_order=1))
+    session.commit()
+
+    tickers = refresh_active_universe(session, now=now)
+    session.commit()
+
+    assert tickers == ["AMD", "BTC-USD", "NVDA", "TSLA"]
+    session.refresh(forgotten)
+    session.refresh(watched)
+    assert forgotten.is_active is False
+    assert watched.is_active is True
+    assert watched.last_demanded_at is not None
+    assert watched.last_demanded_at.replace(tzinfo=timezone.utc) == now
+
+
+def test_record_demand_reactivates_dormant_asset(session: Session) -> None:
+    now = datetime.now(timezone.utc)
+    asset = Asset(ticker="GME", type="stock", is_active=False, last_demanded_at=now - timedelta(days=30))
+    session.add(asset)
+    session.commit()
+
+    assert record_demand(session, ["gme"], now=now) == 1
+    session.commit()
+    session.refresh(asset)
+    assert asset.is_active is True
+
+    # A second read inside the touch interval does not write again.
+    assert record_demand(session, ["GME"], now=now + timedelta(minutes=1)) == 0
+
+
+def test_buffered_reads_are_written_in_one_flush(session: Session) -> None:
+    now = datetime.now(timezone.utc)
+    dormant = [
+        Asset(ticker=ticker, type="stock", is_active=False, last_demanded_at=now - timedelta(days=30))
+        for ticker in ("GME", "AMC")
+    ]
+    session.add_all(dormant)
+    session.commit()
+
+    buffer = DemandBuffer()
+    for _ in range(3):
+        buffer.note(["gme ", "AMC"])
+    assert all(asset.is_active is False for asset in dormant)
+
+    assert buffer.flush(session, now=now) == 2
+    session.commit()
+    for asset in dormant:
+        session.refresh(asset)
+        assert asset.is_active is True
+    assert buffer.drain() == []
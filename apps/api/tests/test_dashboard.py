@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import Asset, AssetLatest, User, UserAsset
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+def _seed_watchlist(session_factory: sessionmaker[Session], token: str, tickers: list[str]) -> None:
+    with session_factory() as session:
+        user = User(session_token=token)
+        session.add(user)
+        session.flush()
+        for order, ticker in enumerate(tickers, start=1):
+            asset = session.query(Asset).filter_by(ticker=ticker).one_or_none()
+            if asset is None:
+                asset = Asset(ticker=ticker, name=f"{ticker} Inc", type="stock")
+                session.add(asset)
+                session.flush()
+                session.add(
+                    AssetLatest(
+                        asset_id=asset.id,
+                        market_as_of=NOW,
+                        price=100.0 + order,
+                        price_change_pct=1.5,
+                        volatility_1d=2.0,
+                        indicator_as_of=NOW,
+                        rsi_14=55.0,
+                        phase="COOP",
+                        confidence=0.7,
+                        computed_at=NOW,
+                        sentiment_score=0.4,
+                        sentiment_delta=0.1,
+                    )
+                )
+            session.add(UserAsset(user_id=user.id, asset_id=asset.id, display_order=order))
+        session.commit()
+
+
+def _count_queries(async_engine: AsyncEngine, client: TestClient, token: str) -> tuple[int, list[dict]]:
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        response = client.get("/dashboard", headers={"X-Session-Token": token})
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    assert response.status_code == 200
+    return len(statements), response.json()
+
+
+def test_dashboard_returns_watchlist_state_in_order(
+    client: TestClient, session_factory: sessionmaker[Session]
+) -> None:
+    _seed_watchlist(session_factory, "dash-order", ["NVDA", "AMD"])
+    with session_factory() as session:
+        session.add(Asset(ticker="BTC-USD", type="crypto"))
+        session.flush()
+        user = session.query(User).filter_by(session_token="dash-order").one()
+        btc = session.query(Asset).filter_by(ticker="BTC-USD").one()
+        session.add(UserAsset(user_id=user.id, asset_id=btc.id, display_order=0))
+        session.commit()
+
+    response = client.get("/dashboard", headers={"X-Session-Token": "dash-order"})
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["ticker"] for item in items] == ["BTC-USD", "NVDA", "AMD"]
+
+    assert items[0]["phase"] is None and items[0]["market"] is None
+    nvda = items[1]
+    assert nvda["phase"]["phase"] == "COOP"
+    assert nvda["phase"]["sentiment_delta"] == pytest.approx(0.1)
+    assert nvda["market"]["price"] == pytest.approx(101.0)
+    assert nvda["indicators"]["rsi_14"] == pytest.approx(55.0)
+
+
+def test_dashboard_query_count_is_independent_of_watchlist_size(
+    client: TestClient, session_factory: sessionmaker[Session], async_engine: AsyncEngine
+) -> None:
+    _seed_watchlist(session_factory, "dash-small", ["NVDA", "AMD"])
+    _seed_watchlist(session_factory, "dash-large", [f"T{i:03d}" for i in range(40)])
+
+    # Prime the session-token cache so only the dashboard's own queries are counted.
+    for token in ("dash-small", "dash-large"):
+        _count_queries(async_engine, client, token)
+
+    small_count, small = _count_queries(async_engine, client, "dash-small")
+    large_count, large = _count_queries(async_engine, client, "dash-large")
+    assert (len(small), len(large)) == (2, 40)
+    assert small_count == large_count == 1
+
+
+def test_dashboard_requires_session(client: TestClient) -> None:
+    assert client.get("/dashboard").status_code == 401
@@ -0,0 +1,113 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.models import Base
+from app.db.session import get_session
+from app.dependencies.rate_limit import enforce_rate_limit
+from app.jobs.ingest_jobs import JOB_RUNNING, JOB_SUCCEEDED, IngestJobManager, get_ingest_jobs
+from app.jobs.pipeline import TickerWork
+from app.main import create_app
+from app.services.ingest_market import IngestSummary
+
+
+class GatedPipeline:
+    """Stand-in pipeline that blocks until released and records each run."""
+
+    def __init__(self, gate: threading.Event, runs: list[list[str]]) -> None:
+        self.gate = gate
+        self.runs = runs
+
+    async def run(self, tickers: list[str]) -> list[TickerWork]:
+        self.runs.append(list(tickers))
+        self.gate.wait(timeout=5)
+        now = datetime.now(timezone.utc)
+        return [
+            TickerWork(
+                ticker=ticker,
+                market=IngestSummary(ticker=ticker, ingested_at=now, market_records=3, indicator_records=3),
+                phase="COOP",
+                phase_confidence=0.7,
+            )
+            for ticker in tickers
+        ]
+
+
+@pytest.fixture()
+def gate() -> Iterator[threading.Event]:
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def _wait_until_running(manager: IngestJobManager, job_id: str) -> None:
+    for _ in range(200):
+        job = manager.get(job_id)
+        if job and job.status == JOB_RUNNING:
+            return
+        time.sleep(0.01)
+    raise AssertionError("job never started")
+
+
+def test_jobs_coalesce_onto_running_and_queued_jobs(gate: threading.Event) -> None:
+    runs: list[list[str]] = []
+    manager = IngestJobManager(pipeline_factory=lambda: GatedPipeline(gate, runs))
+
+    first = manager.submit(["NVDA", "BTC-USD"])
+    _wait_until_running(manager, first.id)
+
+    assert manager.submit(["NVDA"]).id == first.id
+    queued = manager.submit(["NVDA", "TSLA"])
+    assert queued.id != first.id
+    assert manager.submit(["AMD"]).id == queued.id
+    assert queued.tickers == ["NVDA", "TSLA", "AMD"]
+
+    gate.set()
+    assert first.wait(timeout=5)
+    assert queued.wait(timeout=5)
+    assert first.status == JOB_SUCCEEDED
+    assert [result.ticker for result in queued.results] == ["NVDA", "TSLA", "AMD"]
+    assert runs == [["NVDA", "BTC-USD"], ["NVDA", "TSLA", "AMD"]]
+
+
+def test_ingest_run_returns_job_id_immediately(gate: threading.Event) -> None:
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    TestingSession = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+    def override_session() -> Iterator[Session]:
+        with TestingSession() as db:
+            yield db
+            db.commit()
+
+    manager = IngestJobManager(pipeline_factory=lambda: GatedPipeline(gate, []))
+    app = create_app(init_db=False)
+    app.dependency_overrides[get_session] = override_session
+    app.dependency_overrides[enforce_rate_limit] = lambda: None
+    app.dependency_overrides[get_ingest_jobs] = lambda: manager
+    client = TestClient(app)
+
+    response = client.post("/ingest/run", json={"tickers": ["smci"]})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] in {"queued", "running"}
+    assert "SMCI" in job["tickers"]
+
+    gate.set()
+    manager.get(job["id"]).wait(timeout=5)
+    status = client.get(f"/ingest/jobs/{job['id']}").json()
+    assert status["status"] == JOB_SUCCEEDED
+    assert {result["ticker"] for result in status["results"]} >= {"SMCI"}
+
+    assert client.get("/ingest/jobs/unknown").status_code == 404
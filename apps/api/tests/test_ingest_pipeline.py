@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.config import get_settings
+from app.db.models import Asset, AssetLatest, Base, MarketSnapshot, PhaseState, SentimentObservation
+from app.jobs.metrics import PipelineStats
+from app.jobs.pipeline import IngestPipeline
+
+
+def _price_frame(rows: int = 30, start_price: float = 100.0) -> pd.DataFrame:
+    end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    index = pd.date_range(end=end, periods=rows, freq="h", tz="UTC")
+    closes = [start_price + i * 0.5 for i in range(rows)]
+    return pd.DataFrame(
+        {
+            "Open": closes,
+            "High": [c + 1 for c in closes],
+            "Low": [c - 1 for c in closes],
+            "Close": closes,
+            "Volume": [1_000 + i for i in range(rows)],
+        },
+        index=index,
+    )
+
+
+class DummyPipeline(IngestPipeline):
+    def _fetch_prices(self, ticker: str) -> pd.DataFrame:  # type: ignore[override]
+        if ticker == "BROKEN":
+            raise RuntimeError("provider unavailable")
+        return _price_frame()
+
+    def _fetch_news(self, ticker: str):  # type: ignore[override]
+        now = datetime.now(timezone.utc) - timedelta(minutes=5)
+        return [
+            {
+                "title": f"{ticker} rallies on strong demand",
+                "summary": "great results",
+                "providerPublishTime": int(now.timestamp()),
+            }
+        ]
+
+
+@pytest.fixture()
+def session_factory():
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+
+async def test_pipeline_commits_each_ticker_independently(session_factory) -> None:
+    stats = PipelineStats()
+    pipeline = DummyPipeline(session_factory=session_factory, settings=get_settings(), stats=stats)
+
+    results = await pipeline.run(["NVDA", "BROKEN", "BTC-USD"])
+
+    by_ticker = {work.ticker: work for work in results}
+    assert by_ticker["BROKEN"].error is not None
+    assert by_ticker["NVDA"].market is not None
+    assert by_ticker["NVDA"].market.market_records == 30
+    assert by_ticker["NVDA"].phase is not None
+    assert by_ticker["BTC-USD"].sentiment is not None
+
+    with session_factory() as session:
+        tickers = set(session.scalars(select(Asset.ticker)))
+        assert tickers == {"NVDA", "BTC-USD"}
+        assert session.scalar(select(func.count()).select_from(MarketSnapshot)) == 60
+        assert session.scalar(select(func.count()).select_from(PhaseState)) == 2
+        assert session.scalar(select(func.count()).select_from(SentimentObservation)) == 2
+        latest = session.scalars(
+            select(AssetLatest).join(Asset).where(Asset.ticker == "NVDA")
+        ).one()
+        assert latest.price == 114.5
+        assert latest.rsi_14 is not None
+        assert latest.phase == by_ticker["NVDA"].phase
+        assert latest.sentiment_score is not None
+
+    assert stats.stages["fetch"].processed == 2
+    assert stats.stages["fetch"].failed == 1
+    assert stats.stages["classify"].processed == 2
+    assert all(stage.queue_depth == 0 for stage in stats.stages.values())
+
+
+async def test_pipeline_rerun_skips_existing_snapshots(session_factory) -> None:
+    pipeline = DummyPipeline(session_factory=session_factory, stats=PipelineStats())
+    await pipeline.run(["NVDA"])
+    rerun = await pipeline.run(["nvda"])
+
+    assert rerun[0].market is not None
+    assert rerun[0].market.market_records == 0
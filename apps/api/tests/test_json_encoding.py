@@ -0,0 +1,115 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any
+
+import pytest
+from pydantic import TypeAdapter
+
+from app.main import create_app
+from app.routers.phase import _PHASE_COLUMNS, _PHASE_STATES
+from app.routers.snapshots import _INDICATOR_COLUMNS, _INDICATOR_SNAPSHOTS, _MARKET_COLUMNS, _MARKET_SNAPSHOTS
+from app.schemas import SnapshotSeriesPage
+from app.services.series import SERIES_COLUMNS
+from app.utils.encoding import (
+    FLOAT_COLUMN,
+    JSON_MEDIA_TYPE,
+    STRING_COLUMN,
+    TIMESTAMP_COLUMN,
+    UUID_COLUMN,
+    fast_json,
+    render_rows,
+    row_dicts,
+)
+
+pytest.importorskip("orjson")
+
+UTC_NOON = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+FLOATS = [0.1 + 0.2, 425.12, -0.0, 5.0, 1e-7, 2.0**53, float("nan"), float("inf"), None]
+STRINGS = ["NVDA", 'quote " and \\ slash', "line\nbreak\x01", "é 😀   </script>", None]
+TIMESTAMPS = [
+    UTC_NOON,
+    UTC_NOON.replace(microsecond=120000),
+    datetime(2026, 1, 1, 1, 2, 3, 1),
+    UTC_NOON.astimezone(timezone(timedelta(hours=-5))),
+]
+
+
+def sample_value(kind: str, index: int) -> Any:
+    if kind == UUID_COLUMN:
+        return uuid.UUID(int=index)
+    if kind == STRING_COLUMN:
+        return STRINGS[index % len(STRINGS)] or "stock"
+    if kind == FLOAT_COLUMN:
+        return FLOATS[index % len(FLOATS)]
+    if kind == TIMESTAMP_COLUMN:
+        return TIMESTAMPS[index % len(TIMESTAMPS)]
+    return index
+
+
+def sample_rows(columns, count: int = 40) -> list[tuple]:
+    return [
+        tuple(sample_value(spec.kind, index + offset) for offset, (_, spec) in enumerate(columns))
+        for index in range(count)
+    ]
+
+
+def pydantic_json(adapter: TypeAdapter, specs, rows) -> bytes:
+    return adapter.dump_json(adapter.validate_python(row_dicts(specs, rows)))
+
+
+@pytest.mark.parametrize(
+    ("columns", "adapter"),
+    [
+        (_MARKET_COLUMNS, _MARKET_SNAPSHOTS),
+        (_INDICATOR_COLUMNS, _INDICATOR_SNAPSHOTS),
+        (_PHASE_COLUMNS, _PHASE_STATES),
+    ],
+)
+def test_fast_json_matches_response_model_bytes(columns, adapter: TypeAdapter) -> None:
+    specs = [spec for _, spec in columns]
+    rows = sample_rows(columns)
+    assert fast_json(row_dicts(specs, rows)) is not None
+    assert render_rows(JSON_MEDIA_TYPE, specs, rows, adapter) == pydantic_json(adapter, specs, rows)
+
+
+def test_decimal_and_large_floats_match_pydantic() -> None:
+    specs = [spec for _, spec in _INDICATOR_COLUMNS]
+    asset_id = uuid.UUID("1e3e4e5e-0000-4000-8000-9e9e9e9e9e9e")
+    rows = [(asset_id, "NVDA", "1e5 shares", "stock", UTC_NOON, Decimal("55.1250"), Decimal("-0.8000"), None, 1.0)]
+    assert fast_json(row_dicts(specs, rows)) is not None
+    assert render_rows(JSON_MEDIA_TYPE, specs, rows, _INDICATOR_SNAPSHOTS) == pydantic_json(
+        _INDICATOR_SNAPSHOTS, specs, rows
+    )
+
+    # orjson drops the "+" from positive exponents, so these take the pydantic path.
+    huge = [rows[0][:5] + (1e16, 1.5e300, 1e22, 1.2345678901234568e20)]
+    assert fast_json(row_dicts(specs, huge)) is None
+    assert render_rows(JSON_MEDIA_TYPE, specs, huge, _INDICATOR_SNAPSHOTS) == pydantic_json(
+        _INDICATOR_SNAPSHOTS, specs, huge
+    )
+
+
+def test_series_page_matches_model_bytes() -> None:
+    rows = [row[:10] + (None,) * 5 for row in sample_rows(tuple((None, spec) for spec in SERIES_COLUMNS))]
+    page = {
+        "ticker": "NVDA",
+        "points": row_dicts(SERIES_COLUMNS, rows),
+        "next_cursor": "abc",
+        "bucket_seconds": None,
+    }
+    assert fast_json(page) == SnapshotSeriesPage.model_validate(page).model_dump_json().encode()
+
+
+def test_openapi_keeps_response_models() -> None:
+    paths = create_app(init_db=False).openapi()["paths"]
+    for path, model in (
+        ("/phase", "PhaseStateRead"),
+        ("/snapshots/latest", "MarketSnapshotRead"),
+        ("/indicators/latest", "IndicatorSnapshotRead"),
+    ):
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert schema["type"] == "array"
+        assert schema["items"] == {"$ref": f"#/components/schemas/{model}"}
+    series = paths["/snapshots/{ticker}/series"]["get"]["responses"]["200"]["content"]["application/json"]
+    assert series["schema"] == {"$ref": "#/components/schemas/SnapshotSeriesPage"}
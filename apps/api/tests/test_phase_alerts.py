@@ -0,0 +1,261 @@
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.models import (
+    Asset,
+    Base,
+    IndicatorSnapshot,
+    MarketSnapshot,
+    PhaseAlertOutbox,
+    PhaseState,
+    User,
+    UserAsset,
+)
+from app.services.alerts import FileAlertSink, PhaseAlertDispatcher
+from app.services.classify_phase import PHASE_COOP, PHASE_DEFECT, PHASE_FORGIVE, PhaseUpdateService
+
+NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def session_factory() -> sessionmaker[Session]:
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture()
+def session(session_factory: sessionmaker[Session]) -> Iterator[Session]:
+    with session_factory() as session:
+        yield session
+
+
+class FailingSink:
+    def deliver(self, user_id, alerts) -> None:
+        raise RuntimeError("sink unavailable")
+
+
+def _outbox(
+    asset: Asset, from_phase: str, to_phase: str, minutes_ago: float, bar_hours_ago: float = 0
+) -> PhaseAlertOutbox:
+    """Outbox row enqueued ``minutes_ago`` for a bar ``bar_hours_ago`` older than that."""
+    enqueued_at = NOW - timedelta(minutes=minutes_ago)
+    return PhaseAlertOutbox(
+        asset_id=asset.id,
+        from_phase=from_phase,
+        to_phase=to_phase,
+        confidence=0.7,
+        changed_at=enqueued_at - timedelta(hours=bar_hours_ago),
+        enqueued_at=enqueued_at,
+    )
+
+
+def _watch(session: Session, user: User, *assets: Asset) -> None:
+    for order, asset in enumerate(assets, start=1):
+        session.add(UserAsset(user_id=user.id, asset_id=asset.id, display_order=order))
+
+
+def test_transition_writes_outbox_row_in_classify_transaction(session: Session) -> None:
+    now = datetime.now(timezone.utc)
+    asset = Asset(ticker="NVDA", type="stock")
+    session.add(asset)
+    session.flush()
+    session.add(
+        PhaseState(asset_id=asset.id, phase=PHASE_COOP, confidence=0.6, computed_at=now - timedelta(hours=1))
+    )
+    market = MarketSnapshot(
+        asset_key=asset.key,
+        price=410.0,
+        price_change_pct=-4.65,
+        volume=1_000_000,
+        vwap=410.0,
+        volatility_1d=2.1,
+        as_of=now,
+    )
+    session.add(market)
+    session.flush()
+    session.add(
+        IndicatorSnapshot(
+            asset_key=asset.key,
+            rsi_14=28,
+            macd=-1.1,
+            macd_signal=-0.8,
+            atr_14=2.5,
+            as_of=now,
+        )
+    )
+    session.commit()
+
+    PhaseUpdateService(session).update_asset(asset)
+    session.commit()
+
+    row = session.scalars(select(PhaseAlertOutbox)).one()
+    assert (row.from_phase, row.to_phase) == (PHASE_COOP, PHASE_DEFECT)
+    assert row.history_id is not None
+    assert row.dispatched_at is None
+
+
+def test_dispatcher_batches_per_user_and_suppresses_flaps(
+    session: Session, session_factory: sessionmaker[Session], tmp_path: Path
+) -> None:
+    nvda, btc, amd = (Asset(ticker=t, type="stock") for t in ("NVDA", "BTC-USD", "AMD"))
+    alice, bob = User(session_token="alice"), User(session_token="bob")
+    session.add_all([nvda, btc, amd, alice, bob])
+    session.flush()
+    _watch(session, alice, nvda, btc, amd)
+    _watch(session, bob, nvda)
+    session.add_all(
+        [
+            _outbox(nvda, PHASE_COOP, PHASE_DEFECT, minutes_ago=10),
+            _outbox(btc, PHASE_DEFECT, PHASE_FORGIVE, minutes_ago=9),
+            # AMD flapped back to where it started: no alert.
+            _outbox(amd, PHASE_COOP, PHASE_DEFECT, minutes_ago=8),
+            _outbox(amd, PHASE_DEFECT, PHASE_COOP, minutes_ago=7),
+        ]
+    )
+    session.commit()
+
+    alerts_file = tmp_path / "alerts.jsonl"
+    dispatcher = PhaseAlertDispatcher(FileAlertSink(alerts_file), session_factory=session_factory)
+
+    assert dispatcher.dispatch_pending(now=NOW) == 4
+    deliveries = {
+        entry["user_id"]: entry["alerts"]
+        for entry in map(json.loads, alerts_file.read_text().splitlines())
+    }
+    assert len(deliveries) == 2
+    assert sorted(alert["ticker"] for alert in deliveries[str(alice.id)]) == ["BTC-USD", "NVDA"]
+    assert [alert["to_phase"] for alert in deliveries[str(bob.id)]] == [PHASE_DEFECT]
+
+    assert dispatcher.dispatch_pending(now=NOW) == 0
+    assert session.scalars(select(PhaseAlertOutbox).where(PhaseAlertOutbox.dispatched_at.is_(None))).all() == []
+
+
+def test_dispatcher_waits_for_window_and_retries_failed_delivery(
+    session: Session, session_factory: sessionmaker[Session], tmp_path: Path
+) -> None:
+    asset = Asset(ticker="NVDA", type="stock")
+    user = User(session_token="token")
+    session.add_all([asset, user])
+    session.flush()
+    _watch(session, user, asset)
+    session.add(_outbox(asset, PHASE_COOP, PHASE_DEFECT, minutes_ago=0.5))
+    session.commit()
+
+    dispatcher = PhaseAlertDispatcher(
+        FailingSink(), session_factory=session_factory, dedupe_window=timedelta(minutes=2)
+    )
+    assert dispatcher.dispatch_pending(now=NOW) == 0
+
+    assert dispatcher.dispatch_pending(now=NOW + timedelta(minutes=5)) == 0
+    row = session.scalars(select(PhaseAlertOutbox)).one()
+    session.refresh(row)
+    assert (row.attempts, row.dispatched_at) == (1, None)
+
+    dispatcher.sink = FileAlertSink(tmp_path / "alerts.jsonl")
+    # Backing off for a minute after the first failure.
+    assert dispatcher.dispatch_pending(now=NOW + timedelta(minutes=5, seconds=30)) == 0
+    assert dispatcher.dispatch_pending(now=NOW + timedelta(minutes=6)) == 1
+
+
+def test_undeliverable_asset_is_dead_lettered_without_blocking_others(
+    session: Session, session_factory: sessionmaker[Session], tmp_path: Path
+) -> None:
+    nvda, btc = Asset(ticker="NVDA", type="stock"), Asset(ticker="BTC-USD", type="crypto")
+    poison, user = User(session_token="poison"), User(session_token="token")
+    session.add_all([nvda, btc, poison, user])
+    session.flush()
+    _watch(session, poison, nvda)
+    _watch(session, user, btc)
+    session.add_all(
+        [
+            _outbox(nvda, PHASE_COOP, PHASE_DEFECT, minutes_ago=10),
+            _outbox(btc, PHASE_COOP, PHASE_DEFECT, minutes_ago=10),
+        ]
+    )
+    session.commit()
+
+    alerts_file = tmp_path / "alerts.jsonl"
+
+    class PoisonSink(FileAlertSink):
+        def deliver(self, user_id, alerts) -> None:
+            if user_id == poison.id:
+                raise RuntimeError("rejected")
+            super().deliver(user_id, alerts)
+
+    dispatcher = PhaseAlertDispatcher(
+        PoisonSink(alerts_file), session_factory=session_factory, max_attempts=2, retry_backoff=timedelta(minutes=1)
+    )
+    assert dispatcher.dispatch_pending(now=NOW) == 1
+    assert [entry["user_id"] for entry in map(json.loads, alerts_file.read_text().splitlines())] == [str(user.id)]
+
+    assert dispatcher.dispatch_pending(now=NOW + timedelta(minutes=1)) == 1
+    row = session.scalars(select(PhaseAlertOutbox).where(PhaseAlertOutbox.asset_id == nvda.id)).one()
+    session.refresh(row)
+    assert (row.attempts, row.dispatched_at, row.dead_lettered_at is not None) == (2, None, True)
+    assert dispatcher.dispatch_pending(now=NOW + timedelta(hours=1)) == 0
+
+
+def test_dedupe_window_runs_on_enqueue_time_not_bar_time(
+    session: Session, session_factory: sessionmaker[Session], tmp_path: Path
+) -> None:
+    asset = Asset(ticker="NVDA", type="stock")
+    user = User(session_token="token")
+    session.add_all([asset, user])
+    session.flush()
+    _watch(session, user, asset)
+    # Hourly bars classified on successive ingest cycles a minute apart: a flap back to COOP.
+    session.add_all(
+        [
+            _outbox(asset, PHASE_COOP, PHASE_DEFECT, minutes_ago=1.5, bar_hours_ago=2),
+            _outbox(asset, PHASE_DEFECT, PHASE_COOP, minutes_ago=0.5, bar_hours_ago=1),
+        ]
+    )
+    session.commit()
+
+    alerts_file = tmp_path / "alerts.jsonl"
+    dispatcher = PhaseAlertDispatcher(FileAlertSink(alerts_file), session_factory=session_factory)
+    assert dispatcher.dispatch_pending(now=NOW) == 0
+
+    assert dispatcher.dispatch_pending(now=NOW + timedelta(minutes=2)) == 2
+    assert not alerts_file.exists()
+
+
+def test_dispatcher_batches_whole_assets(
+    session: Session, session_factory: sessionmaker[Session], tmp_path: Path
+) -> None:
+    nvda, btc = Asset(ticker="NVDA", type="stock"), Asset(ticker="BTC-USD", type="crypto")
+    user = User(session_token="token")
+    session.add_all([nvda, btc, user])
+    session.flush()
+    _watch(session, user, nvda, btc)
+    session.add_all(
+        [
+            _outbox(nvda, PHASE_COOP, PHASE_DEFECT, minutes_ago=10),
+            _outbox(btc, PHASE_COOP, PHASE_DEFECT, minutes_ago=9),
+            _outbox(nvda, PHASE_DEFECT, PHASE_FORGIVE, minutes_ago=8),
+        ]
+    )
+    session.commit()
+
+    alerts_file = tmp_path / "alerts.jsonl"
+    dispatcher = PhaseAlertDispatcher(FileAlertSink(alerts_file), session_factory=session_factory, batch_size=1)
+
+    assert dispatcher.dispatch_pending(now=NOW) == 2
+    assert dispatcher.dispatch_pending(now=NOW) == 1
+    alerts = [entry["alerts"][0] for entry in map(json.loads, alerts_file.read_text().splitlines())]
+    assert [(alert["ticker"], alert["to_phase"], alert["transitions"]) for alert in alerts] == [
+        ("NVDA", PHASE_FORGIVE, 2),
+        ("BTC-USD", PHASE_DEFECT, 1),
+    ]
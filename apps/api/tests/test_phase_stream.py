@@ -0,0 +1,131 @@
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Iterator
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.models import Asset, Base, IndicatorSnapshot, MarketSnapshot
+from app.services.classify_phase import PHASE_DEFECT, PhaseUpdateService
+from app.services.phase_events import (
+    EVENT_LATEST,
+    EVENT_TRANSITION,
+    PhaseEvent,
+    PhaseEventBroker,
+    phase_events,
+)
+
+
+def _event(ticker: str, kind: str = EVENT_LATEST) -> PhaseEvent:
+    return PhaseEvent(kind=kind, ticker=ticker, payload=json.dumps({"ticker": ticker}).encode())
+
+
+@pytest.fixture()
+def session() -> Iterator[Session]:
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine, autocommit=False, autoflush=False)() as session:
+        yield session
+
+
+def _defecting_asset(session: Session) -> Asset:
+    now = datetime.now(timezone.utc)
+    asset = Asset(ticker="NVDA", name="NVIDIA", type="stock")
+    session.add(asset)
+    session.flush()
+    market = MarketSnapshot(
+        asset_key=asset.key,
+        price=410.0,
+        price_change_pct=-4.65,
+        volume=1_000_000,
+        vwap=410.0,
+        volatility_1d=2.1,
+        as_of=now,
+    )
+    session.add(market)
+    session.flush()
+    session.add(
+        IndicatorSnapshot(
+            asset_key=asset.key,
+            rsi_14=28,
+            macd=-1.1,
+            macd_signal=-0.8,
+            atr_14=2.5,
+            as_of=now,
+        )
+    )
+    session.commit()
+    return asset
+
+
+async def test_broker_routes_events_by_ticker_from_other_threads() -> None:
+    broker = PhaseEventBroker(buffer_size=8)
+    nvda = broker.subscribe(["nvda"])
+    everything = broker.subscribe()
+
+    await asyncio.to_thread(broker.publish, [_event("NVDA"), _event("BTC-USD")])
+    await asyncio.sleep(0)
+
+    assert (await nvda.get()).ticker == "NVDA"  # type: ignore[union-attr]
+    assert nvda.queue.empty()
+    assert [(await everything.get()).ticker for _ in range(2)] == ["NVDA", "BTC-USD"]  # type: ignore[union-attr]
+
+    broker.unsubscribe(nvda)
+    broker.unsubscribe(everything)
+    assert not broker.active
+
+
+async def test_broker_drops_subscribers_that_fall_behind() -> None:
+    broker = PhaseEventBroker(buffer_size=2)
+    slow = broker.subscribe(["NVDA"])
+    fast = broker.subscribe(["NVDA"])
+
+    for _ in range(2):
+        broker.publish([_event("NVDA")])
+        await fast.get()
+    broker.publish([_event("NVDA")])
+
+    assert slow.dropped is True
+    assert await slow.get() is None
+    assert broker.dropped_subscribers == 1
+    assert broker.subscriber_count == 1
+    assert (await fast.get()) is not None
+
+
+async def test_phase_updates_publish_after_commit_only(session: Session) -> None:
+    asset = _defecting_asset(session)
+    subscription = phase_events.subscribe(["NVDA"])
+    try:
+        PhaseUpdateService(session).update_asset(asset)
+        session.rollback()
+        await asyncio.sleep(0)
+        assert subscription.queue.empty()
+
+        PhaseUpdateService(session).update_asset(asset)
+        session.commit()
+        await asyncio.sleep(0)
+
+        transition = await subscription.get()
+        latest = await subscription.get()
+    finally:
+        phase_events.unsubscribe(subscription)
+
+    assert transition is not None and transition.kind == EVENT_TRANSITION
+    assert json.loads(transition.payload)["to_phase"] == PHASE_DEFECT
+    assert latest is not None and latest.kind == EVENT_LATEST
+    assert json.loads(latest.payload)["phase"] == PHASE_DEFECT
+    assert latest.encode().startswith(b"event: latest\ndata: {")
+
+
+def test_stream_rejects_unknown_watchlist_token(client: TestClient) -> None:
+    response = client.get("/phase/stream", headers={"X-Session-Token": "missing"})
+
+    assert response.status_code == 401
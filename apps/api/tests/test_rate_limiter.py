@@ -0,0 +1,177 @@
+import threading
+
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.config import Settings
+from app.dependencies import rate_limit
+from app.dependencies.rate_limit import InMemoryRateLimiter, RedisRateLimiter, enforce_rate_limit
+
+
+def _allowed(limiter: InMemoryRateLimiter, key: str) -> bool:
+    try:
+        limiter.check(key)
+    except HTTPException as exc:
+        assert exc.status_code == 429
+        return False
+    return True
+
+
+def test_concurrent_checks_admit_exactly_the_limit() -> None:
+    limiter = InMemoryRateLimiter(max_requests=500, window_seconds=3600)
+    admitted = [0] * 8
+
+    def worker(index: int) -> None:
+        for _ in range(250):
+            if _allowed(limiter, "shared"):
+                admitted[index] += 1
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(admitted) == 500
+
+
+def test_counters_are_dropped_at_window_rollover(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1_000.0]
+    monkeypatch.setattr(rate_limit.time, "time", lambda: now[0])
+    limiter = InMemoryRateLimiter(max_requests=1, window_seconds=60, shards=1)
+
+    for index in range(10):
+        assert _allowed(limiter, f"client-{index}")
+    assert not _allowed(limiter, "client-0")
+    assert limiter.tracked_keys == 10
+
+    now[0] += 60
+    assert _allowed(limiter, "client-0")
+    assert limiter.tracked_keys == 1
+
+
+def test_new_keys_share_overflow_bucket_once_full() -> None:
+    limiter = InMemoryRateLimiter(max_requests=2, window_seconds=3600, max_keys=3, shards=1)
+    for key in ("a", "b", "c"):
+        assert _allowed(limiter, key)
+
+    assert _allowed(limiter, "d")
+    assert _allowed(limiter, "e")
+    assert not _allowed(limiter, "f")
+    assert limiter.tracked_keys == 4
+    assert _allowed(limiter, "a")
+
+
+def test_overflow_bucket_allows_a_request_budget_per_shard() -> None:
+    limiter = InMemoryRateLimiter(max_requests=2, window_seconds=3600, max_keys=4, shards=4)
+    # One tracked key per shard: the first key filling shard 0, then newcomers that overflow it.
+    keys = [key for key in (f"client-{index}" for index in range(1000)) if hash(key) % 4 == 0][:10]
+    assert _allowed(limiter, keys[0])
+
+    assert all(_allowed(limiter, key) for key in keys[1:9])
+    assert not _allowed(limiter, keys[9])
+    assert _allowed(limiter, keys[0])
+
+
+class RecordingRedis:
+    """Wraps a fakeredis client and records each command sent to the server."""
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self.commands: list[str] = []
+        original = client.execute_command
+
+        def execute_command(*args, **kwargs):
+            self.commands.append(str(args[0]).upper())
+            return original(*args, **kwargs)
+
+        client.execute_command = execute_command
+
+
+def test_redis_limiter_uses_one_evalsha_per_check() -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    recorder = RecordingRedis(fakeredis.FakeRedis())
+    limiter = RedisRateLimiter(recorder.client, max_requests=3, window_seconds=60)
+
+    assert _allowed(limiter, "client")
+    recorder.commands.clear()
+    assert _allowed(limiter, "client")
+    assert _allowed(limiter, "client")
+    assert not _allowed(limiter, "client")
+    assert recorder.commands == ["EVALSHA"] * 3
+    assert _allowed(limiter, "other")
+
+
+def test_redis_limiter_applies_weights() -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    limiter = RedisRateLimiter(fakeredis.FakeRedis(), max_requests=10, window_seconds=60)
+
+    limiter.check("client", cost=10)
+    with pytest.raises(HTTPException) as excinfo:
+        limiter.check("client")
+    assert excinfo.value.detail == "Rate limit exceeded. Try again in 6s."
+
+
+async def test_async_redis_limiter_shares_buckets_with_sync_checks() -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    limiter = RedisRateLimiter(
+        fakeredis.FakeRedis(server=server),
+        max_requests=2,
+        window_seconds=60,
+        async_client=fakeredis.FakeAsyncRedis(server=server),
+    )
+
+    limiter.check("client")
+    await limiter.acheck("client")
+    with pytest.raises(HTTPException):
+        await limiter.acheck("client")
+
+
+def test_redis_limiter_fails_open_to_in_process_limits() -> None:
+    redis = pytest.importorskip("redis")
+    from redis.backoff import NoBackoff
+    from redis.retry import Retry
+
+    client = redis.Redis(host="127.0.0.1", port=1, socket_connect_timeout=0.05, retry=Retry(NoBackoff(), 0))
+    limiter = RedisRateLimiter(client, max_requests=2, window_seconds=60)
+
+    assert _allowed(limiter, "client")
+    assert _allowed(limiter, "client")
+    assert not _allowed(limiter, "client")
+    assert limiter.fallback.tracked_keys == 1
+
+
+def test_route_weights_apply_to_ingest_runs(monkeypatch: pytest.MonkeyPatch) -> None:
+    limiter = InMemoryRateLimiter(max_requests=12, window_seconds=3600)
+    monkeypatch.setattr(rate_limit, "get_rate_limiter", lambda: limiter)
+    app = FastAPI()
+
+    @app.post("/ingest/run", dependencies=[Depends(enforce_rate_limit)])
+    def run() -> None:
+        return None
+
+    @app.get("/phase/{ticker}", dependencies=[Depends(enforce_rate_limit)])
+    def phase(ticker: str) -> None:
+        return None
+
+    client = TestClient(app)
+    assert client.get("/phase/NVDA").status_code == 200
+    assert client.post("/ingest/run").status_code == 200
+    assert client.get("/phase/NVDA").status_code == 200
+    assert client.get("/phase/NVDA").status_code == 429
+
+
+async def test_async_redis_limiter_fails_open_without_blocking() -> None:
+    pytest.importorskip("redis")
+    settings = Settings(redis_url="redis://127.0.0.1:1/0", redis_socket_timeout=0.05, requests_per_minute=2)
+    limiter = rate_limit.build_rate_limiter(settings)
+    assert isinstance(limiter, RedisRateLimiter) and limiter.async_client is not None
+
+    await limiter.acheck("client")
+    await limiter.acheck("client")
+    with pytest.raises(HTTPException):
+        await limiter.acheck("client")
+    assert limiter.fallback.tracked_keys == 1
+    await limiter.async_client.aclose()
@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import Asset, AssetLatest
+from app.dependencies.response_cache import (
+    CachedResponse,
+    InMemoryResponseCache,
+    RedisResponseCache,
+    invalidate_tickers,
+)
+
+
+@pytest.fixture()
+def session_factory(session_factory: sessionmaker[Session]) -> sessionmaker[Session]:
+    computed_at = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+    with session_factory() as session:
+        for ticker, price in (("NVDA", 425.0), ("BTC-USD", 64000.0)):
+            asset = Asset(ticker=ticker, type="stock")
+            session.add(asset)
+            session.flush()
+            session.add(
+                AssetLatest(
+                    asset_id=asset.id,
+                    market_as_of=computed_at,
+                    price=price,
+                    phase="COOP",
+                    confidence=0.7,
+                    computed_at=computed_at,
+                )
+            )
+        session.commit()
+    return session_factory
+
+
+def _set_price(session_factory: sessionmaker[Session], ticker: str, price: float) -> None:
+    with session_factory() as session:
+        latest = session.scalars(select(AssetLatest).join(Asset).where(Asset.ticker == ticker)).one()
+        latest.price = price
+        session.commit()
+
+
+def test_cached_snapshots_refresh_after_ticker_invalidation(
+    client: TestClient, session_factory: sessionmaker[Session]
+) -> None:
+    first = client.get("/snapshots/latest", params={"tickers": ["nvda"]})
+    assert first.json()[0]["price"] == 425.0
+
+    _set_price(session_factory, "NVDA", 430.0)
+    assert client.get("/snapshots/latest", params={"tickers": ["NVDA"]}).json()[0]["price"] == 425.0
+
+    # Bumping another ticker leaves the NVDA entry valid.
+    invalidate_tickers(["BTC-USD"])
+    assert client.get("/snapshots/latest", params={"tickers": ["NVDA"]}).json()[0]["price"] == 425.0
+
+    invalidate_tickers(["NVDA"])
+    refreshed = client.get("/snapshots/latest", params={"tickers": ["NVDA"]})
+    assert refreshed.json()[0]["price"] == 430.0
+    assert refreshed.headers["etag"] != first.headers["etag"]
+
+
+def test_phase_responses_carry_validators_and_honour_if_none_match(client: TestClient) -> None:
+    response = client.get("/phase/NVDA")
+    assert response.status_code == 200
+    assert response.headers["last-modified"] == "Mon, 19 Oct 2026 12:00:00 GMT"
+    etag = response.headers["etag"]
+
+    not_modified = client.get("/phase/NVDA", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    listing = client.get("/phase")
+    assert [item["ticker"] for item in listing.json()] == ["BTC-USD", "NVDA"]
+    assert client.get("/phase", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_missing_phase_is_not_cached(client: TestClient) -> None:
+    assert client.get("/phase/AMD").status_code == 404
+    assert client.get("/phase/AMD").status_code == 404
+
+
+def test_in_memory_cache_evicts_least_recently_used() -> None:
+    cache = InMemoryResponseCache(max_entries=2)
+    entry = CachedResponse(token="0", body=b"[]", etag='W/"0-x"', last_modified=None)
+    cache.set("a", entry)
+    cache.set("b", entry)
+    assert cache.get("a") is entry
+    cache.set("c", entry)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is entry
+    assert cache.get("c") is entry
+
+
+def test_redis_cache_round_trips_binary_bodies() -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    cache = RedisResponseCache(fakeredis.FakeRedis())
+    last_modified = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+    entry = CachedResponse(token="1", body=b"ARROW1\x00\xff\x81", etag='W/"1-x"', last_modified=last_modified)
+    cache.set("/snapshots/latest|*|application/vnd.apache.arrow.stream", entry)
+
+    assert cache.get("/snapshots/latest|*|application/vnd.apache.arrow.stream") == entry
+    assert cache.get("/snapshots/latest|*") is None
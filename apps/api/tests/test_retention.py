@@ -0,0 +1,208 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import (
+    Asset,
+    Base,
+    DailySnapshot,
+    IndicatorSnapshot,
+    MarketSnapshot,
+    PhaseAlertOutbox,
+    SentimentObservation,
+    SentimentSource,
+)
+from app.services.retention import SnapshotRetention
+
+START = datetime(2026, 6, 1, tzinfo=timezone.utc)
+DAYS = 3
+# Two whole days fall behind the horizon; the third stays raw.
+NOW = START + timedelta(days=DAYS - 1, hours=12)
+ROLLUP_AFTER = timedelta(hours=12)
+
+
+@pytest.fixture()
+def session_factory(session_factory: sessionmaker[Session]) -> sessionmaker[Session]:
+    with session_factory() as session:
+        seed(session)
+    return session_factory
+
+
+def seed(session: Session) -> None:
+    source = SentimentSource(name="news", channel="news")
+    session.add(source)
+    for ticker in ("NVDA", "AMD"):
+        asset = Asset(ticker=ticker, type="stock")
+        session.add(asset)
+        session.flush()
+        for hour in range(DAYS * 24):
+            as_of = START + timedelta(hours=hour)
+            market = MarketSnapshot(asset_key=asset.key, price=100.0 + hour, volume=10.0, as_of=as_of)
+            session.add(market)
+            session.flush()
+            session.add(
+                IndicatorSnapshot(
+                    asset_key=asset.key, rsi_14=hour % 100, as_of=as_of
+                )
+            )
+            session.add(
+                SentimentObservation(asset_id=asset.id, source_id=source.id, score=0.1, observed_at=as_of)
+            )
+    session.commit()
+
+
+def retention(session_factory: sessionmaker[Session], batch_size: int = 30) -> SnapshotRetention:
+    return SnapshotRetention(
+        session_factory, rollup_after=ROLLUP_AFTER, sentiment_after=timedelta(days=1), batch_size=batch_size
+    )
+
+
+def daily_rows(session_factory: sessionmaker[Session]) -> list[tuple]:
+    with session_factory() as session:
+        rows = session.execute(
+            select(
+                Asset.ticker,
+                DailySnapshot.as_of,
+                DailySnapshot.open,
+                DailySnapshot.high,
+                DailySnapshot.low,
+                DailySnapshot.close,
+                DailySnapshot.price,
+                DailySnapshot.volume,
+                DailySnapshot.rsi_14,
+                DailySnapshot.samples,
+            )
+            .join(Asset, Asset.key == DailySnapshot.asset_key)
+            .order_by(Asset.ticker, DailySnapshot.as_of)
+        ).all()
+    return [tuple(row) for row in rows]
+
+
+def test_rolls_old_days_into_daily_bars_and_deletes_raw_rows(session_factory) -> None:
+    report = retention(session_factory).run(now=NOW)
+
+    assert report.days == 2
+    assert report.rollups == 4
+    assert report.market_rows == report.indicator_rows == 2 * 2 * 24
+    # Sentiment older than a day: everything before START + 1d 12h.
+    assert report.sentiment_rows == 2 * 36
+
+    rows = daily_rows(session_factory)
+    assert len(rows) == 4
+    ticker, as_of, open_, high, low, close, price, volume, rsi, samples = rows[-1]
+    assert ticker == "NVDA" and as_of.replace(tzinfo=timezone.utc) == START + timedelta(days=1)
+    assert (open_, high, low, close) == (124.0, 147.0, 124.0, 147.0)
+    assert price == pytest.approx(135.5)
+    assert volume == 240.0 and samples == 24 and rsi == 47.0
+
+    with session_factory() as session:
+        oldest = session.scalar(select(func.min(MarketSnapshot.as_of)))
+        assert oldest.replace(tzinfo=timezone.utc) == START + timedelta(days=2)
+        assert session.scalar(select(func.count()).select_from(IndicatorSnapshot)) == 2 * 24
+
+    assert retention(session_factory).run(now=NOW).market_rows == 0
+
+
+
+def test_indicator_only_days_are_rolled_up(session_factory) -> None:
+    with session_factory() as session:
+        asset = Asset(ticker="TSM", type="stock")
+        session.add(asset)
+        session.flush()
+        session.add_all(
+            IndicatorSnapshot(asset_key=asset.key, rsi_14=40.0 + hour, as_of=START - timedelta(days=1, hours=-hour))
+            for hour in range(3)
+        )
+        session.commit()
+
+    report = retention(session_factory).run(now=NOW)
+
+    assert report.days == 3
+    assert report.indicator_rows == 2 * 2 * 24 + 3
+    assert ("TSM", START - timedelta(days=1), None, None, None, None, None, None, 42.0, 0) in [
+        (ticker, as_of.replace(tzinfo=timezone.utc), *values) for ticker, as_of, *values in daily_rows(session_factory)
+    ]
+    with session_factory() as session:
+        assert session.scalar(select(func.count()).select_from(IndicatorSnapshot)) == 2 * 24
+
+def test_interrupted_run_resumes_without_double_counting(session_factory, database_url: str) -> None:
+    class CrashingRetention(SnapshotRetention):
+        chunks = 0
+
+        def _roll_up(self, session, asset_ids, day, report) -> None:
+            self.chunks += 1
+            if self.chunks == 3:
+                raise RuntimeError("worker killed")
+            super()._roll_up(session, asset_ids, day, report)
+
+    crashing = CrashingRetention(session_factory, rollup_after=ROLLUP_AFTER, batch_size=30)
+    with pytest.raises(RuntimeError):
+        crashing.run(now=NOW)
+    assert len(daily_rows(session_factory)) == 2
+
+    retention(session_factory).run(now=NOW)
+    resumed = daily_rows(session_factory)
+
+    fresh_factory = sessionmaker(bind=create_engine(database_url.replace("retention.db", "fresh.db")))
+    Base.metadata.create_all(fresh_factory.kw["bind"])
+    with fresh_factory() as session:
+        seed(session)
+    retention(fresh_factory, batch_size=10_000).run(now=NOW)
+    assert resumed == daily_rows(fresh_factory)
+
+
+def test_late_rows_are_folded_into_existing_rollup(session_factory) -> None:
+    retention(session_factory).run(now=NOW)
+    with session_factory() as session:
+        asset_key = session.scalar(select(Asset.key).where(Asset.ticker == "AMD"))
+        late = START + timedelta(hours=3, minutes=30)
+        session.add(MarketSnapshot(asset_key=asset_key, price=500.0, volume=5.0, as_of=late))
+        session.commit()
+
+    retention(session_factory).run(now=NOW)
+    first_day = daily_rows(session_factory)[0]
+    _, _, open_, high, low, close, price, volume, _, samples = first_day
+    assert (open_, high, low, close, volume, samples) == (100.0, 500.0, 100.0, 500.0, 245.0, 25)
+    assert price == pytest.approx((sum(range(100, 124)) + 500.0) / 25)
+
+
+def test_finished_outbox_rows_are_purged(session_factory) -> None:
+    with session_factory() as session:
+        asset_id = session.scalar(select(Asset.id).where(Asset.ticker == "NVDA"))
+        old, recent = NOW - timedelta(days=8), NOW - timedelta(days=1)
+        session.add_all(
+            [
+                PhaseAlertOutbox(asset_id=asset_id, to_phase="DEFECT", changed_at=old, dispatched_at=old),
+                PhaseAlertOutbox(asset_id=asset_id, to_phase="DEFECT", changed_at=old, dead_lettered_at=old),
+                PhaseAlertOutbox(asset_id=asset_id, to_phase="COOP", changed_at=recent, dispatched_at=recent),
+                PhaseAlertOutbox(asset_id=asset_id, to_phase="COOP", changed_at=old),
+            ]
+        )
+        session.commit()
+
+    report = retention(session_factory).run(now=NOW)
+
+    assert report.outbox_rows == 2
+    with session_factory() as session:
+        kept = session.execute(select(PhaseAlertOutbox.to_phase, PhaseAlertOutbox.dispatched_at)).all()
+    assert sorted(phase for phase, _ in kept) == ["COOP", "COOP"]
+
+
+def test_series_reads_rollups_for_retired_days(session_factory, client: TestClient) -> None:
+    retention(session_factory).run(now=NOW)
+
+    page = client.get("/snapshots/NVDA/series", params={"limit": 5}).json()
+    daily, _, first_raw = page["points"][:3]
+    assert daily["samples"] == 24 and daily["open"] == 100.0 and daily["close"] == 123.0
+    assert first_raw["samples"] is None and first_raw["price"] == 148.0
+
+    remaining = client.get("/snapshots/NVDA/series", params={"cursor": page["next_cursor"], "limit": 500})
+    assert len(page["points"]) + len(remaining.json()["points"]) == 2 + 24
+
+    bucketed = client.get("/snapshots/NVDA/series", params={"bucket_seconds": 86400}).json()
+    assert [point["samples"] for point in bucketed["points"]] == [24, 24, 24]
+    assert bucketed["points"][0]["price"] == pytest.approx(111.5)
+    assert bucketed["points"][2]["open"] == 148.0
@@ -0,0 +1,38 @@
+from app.jobs.metrics import CycleStats
+from app.jobs.scheduler import FixedRateSchedule
+
+
+def test_fixed_rate_subtracts_cycle_time() -> None:
+    schedule = FixedRateSchedule(interval=60, stats=CycleStats())
+
+    assert schedule.next_delay(started=0.0, finished=12.5) == 47.5
+    assert schedule.next_delay(started=60.0, finished=70.0) == 50.0
+    assert schedule.stats.cycles == 2
+    assert schedule.stats.overruns == 0
+
+
+def test_overrun_skips_missed_deadlines() -> None:
+    stats = CycleStats()
+    schedule = FixedRateSchedule(interval=60, stats=stats)
+
+    # Cycle started at 0 and ran until 150: the deadlines at 60 and 120 are missed.
+    delay = schedule.next_delay(started=0.0, finished=150.0)
+
+    assert delay == 30.0
+    assert stats.overruns == 1
+    assert stats.skipped_cycles == 2
+    assert stats.last_cycle_seconds == 150.0
+    buckets = {bucket["le"]: bucket["count"] for bucket in stats.latency.buckets()}
+    assert buckets[120.0] == 0
+    assert buckets[300.0] == 1
+    assert buckets[None] == 1
+
+
+def test_jitter_is_bounded_and_does_not_drift() -> None:
+    schedule = FixedRateSchedule(interval=60, jitter=500, rng=lambda low, high: high)
+
+    assert schedule.jitter == 30
+    assert schedule.initial_delay() == 30
+    assert schedule.next_delay(started=30.0, finished=40.0) == 50.0 + 30
+    # The next deadline is anchored to the schedule, not to the jittered start.
+    assert schedule.next_delay(started=120.0, finished=125.0) == 25.0 + 30
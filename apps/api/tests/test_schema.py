@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+from alembic.script import ScriptDirectory
+from sqlalchemy import Engine, create_engine, inspect, update
+
+from app.db.models import Base
+from app.db.schema import (
+    SCHEMA_REVISION,
+    SchemaVersionError,
+    alembic_version,
+    bootstrap_schema,
+    check_schema,
+    prepare_schema,
+)
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture()
+def engine(tmp_path: Path) -> Engine:
+    engine = create_engine(f"sqlite+pysqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_schema_revision_is_alembic_head() -> None:
+    assert ScriptDirectory(str(ROOT_DIR / "alembic")).get_heads() == [SCHEMA_REVISION]
+
+
+def test_bootstrap_creates_and_stamps_empty_database(engine: Engine) -> None:
+    assert bootstrap_schema(engine)
+
+    check_schema(engine)
+    assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+    assert not bootstrap_schema(engine)
+
+
+def test_bootstrap_refuses_unversioned_tables(engine: Engine) -> None:
+    Base.metadata.create_all(engine)
+
+    with pytest.raises(SchemaVersionError, match="alembic upgrade head"):
+        bootstrap_schema(engine)
+
+
+def test_startup_check_refuses_missing_or_stale_revision(engine: Engine) -> None:
+    with pytest.raises(SchemaVersionError, match="bootstrap"):
+        check_schema(engine)
+
+    bootstrap_schema(engine)
+    with engine.begin() as connection:
+        connection.execute(update(alembic_version).values(version_num="202610191500"))
+    with pytest.raises(SchemaVersionError, match=f"202610191500; this build expects {SCHEMA_REVISION}"):
+        check_schema(engine)
+
+
+def test_startup_check_waits_for_migration(engine: Engine) -> None:
+    bootstrap_schema(engine)
+    with engine.begin() as connection:
+        connection.execute(update(alembic_version).values(version_num="202610191500"))
+    now = [0.0]
+    sleeps = []
+
+    def migrate_while_sleeping(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+        if len(sleeps) == 2:
+            with engine.begin() as connection:
+                connection.execute(update(alembic_version).values(version_num=SCHEMA_REVISION))
+
+    check_schema(engine, wait_seconds=10, poll_seconds=2, sleep=migrate_while_sleeping, clock=lambda: now[0])
+    assert sleeps == [2, 2]
+
+    with engine.begin() as connection:
+        connection.execute(update(alembic_version).values(version_num="202610191500"))
+    with pytest.raises(SchemaVersionError):
+        check_schema(engine, wait_seconds=3, poll_seconds=2, sleep=migrate_while_sleeping, clock=lambda: now[0])
+
+
+def test_startup_step_checks_revision_before_partitions(engine: Engine) -> None:
+    with pytest.raises(SchemaVersionError, match="bootstrap"):
+        prepare_schema(engine)
+
+    bootstrap_schema(engine)
+    # SQLite tables are not partitioned, so there is nothing to create.
+    assert prepare_schema(engine) == []
@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Iterator
 
 import pytest
@@ -7,7 +7,8 @@ from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.config import get_settings
-from app.db.models import Base, SentimentObservation, SentimentSource
+from app.db.models import Asset, Base, SentimentObservation, SentimentSource
+from app.services.latest_state import latest_sentiment_readings
 from app.services.sentiment import SentimentIngestor
 
 
@@ -72,3 +73,33 @@ def test_sentiment_ingestor_persists_observation(session: Session) -> None:
     assert new_summary is not None
     observations_after = session.query(SentimentObservation).all()
     assert len(observations_after) == 1
+
+
+def test_latest_sentiment_readings_returns_top_two_per_asset(session: Session) -> None:
+    now = datetime.now(timezone.utc)
+    source = SentimentSource(name="test-source", channel="news", reliability_tier="B")
+    first = Asset(ticker="NVDA", type="stock")
+    second = Asset(ticker="AMD", type="stock")
+    quiet = Asset(ticker="INTC", type="stock")
+    session.add_all([source, first, second, quiet])
+    session.flush()
+    for minutes, score in [(0, 0.4), (30, 0.1), (60, -0.5), (90, -0.9)]:
+        session.add(
+            SentimentObservation(
+                asset_id=first.id,
+                source_id=source.id,
+                score=score,
+                observed_at=now - timedelta(minutes=minutes),
+            )
+        )
+    session.add(SentimentObservation(asset_id=second.id, source_id=source.id, score=-0.2, observed_at=now))
+    session.commit()
+
+    readings = latest_sentiment_readings(session, [first.id, second.id, quiet.id])
+
+    assert set(readings) == {first.id, second.id}
+    assert readings[first.id].score == pytest.approx(0.4)
+    assert readings[first.id].previous_score == pytest.approx(0.1)
+    assert readings[first.id].delta == pytest.approx(0.3)
+    assert readings[second.id].previous_score is None
+    assert readings[second.id].delta is None
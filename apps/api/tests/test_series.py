@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Engine, text
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import Asset, IndicatorSnapshot, MarketSnapshot, PhaseHistory
+
+START = datetime(2026, 9, 1, tzinfo=timezone.utc)
+HOURS = 120
+
+
+@pytest.fixture()
+def engine(engine: Engine) -> Engine:
+    with sessionmaker(bind=engine)() as session:
+        seed_series(session)
+    return engine
+
+
+def seed_series(session: Session) -> None:
+    asset = Asset(ticker="NVDA", name="NVIDIA", type="stock")
+    session.add(asset)
+    session.flush()
+    for hour in range(HOURS):
+        as_of = START + timedelta(hours=hour)
+        market = MarketSnapshot(
+            asset_key=asset.key,
+            price=100.0 + hour,
+            price_change_pct=0.5,
+            volume=1_000 + hour,
+            vwap=100.0 + hour,
+            volatility_1d=1.0,
+            as_of=as_of,
+        )
+        session.add(market)
+        session.flush()
+        if hour % 2 == 0:
+            session.add(
+                IndicatorSnapshot(
+                    asset_key=asset.key,
+                    rsi_14=40 + hour % 30,
+                    macd=0.1,
+                    macd_signal=0.05,
+                    atr_14=2.0,
+                    as_of=as_of,
+                )
+            )
+    # Several transitions share a timestamp so pages must break ties on id.
+    for index in range(7):
+        session.add(
+            PhaseHistory(
+                asset_id=asset.id,
+                from_phase="COOP",
+                to_phase="DEFECT",
+                changed_at=START + timedelta(hours=index // 3),
+            )
+        )
+    session.commit()
+
+
+def test_series_pages_cover_range_without_gaps(client: TestClient) -> None:
+    seen: list[str] = []
+    params = {"limit": 50, "start": (START + timedelta(hours=10)).isoformat()}
+    pages = 0
+    while True:
+        response = client.get("/snapshots/NVDA/series", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        pages += 1
+        seen.extend(point["as_of"] for point in page["points"])
+        if page["next_cursor"] is None:
+            break
+        params["cursor"] = page["next_cursor"]
+
+    assert pages == 3
+    assert len(seen) == HOURS - 10 == len(set(seen))
+    assert seen == sorted(seen)
+
+
+def test_series_points_carry_indicators(client: TestClient) -> None:
+    page = client.get("/snapshots/NVDA/series", params={"limit": 2}).json()
+    first, second = page["points"]
+    assert first["price"] == 100.0 and first["rsi_14"] == 40.0
+    assert second["rsi_14"] is None
+
+
+def test_series_rejects_bad_cursor_and_unknown_ticker(client: TestClient) -> None:
+    assert client.get("/snapshots/NVDA/series", params={"cursor": "not-a-cursor"}).status_code == 400
+    assert client.get("/snapshots/MSFT/series").status_code == 404
+
+
+def test_series_page_is_an_index_range_scan(engine) -> None:
+    with engine.connect() as connection:
+        plan = connection.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT as_of FROM market_snapshot "
+                "WHERE asset_key = :asset AND as_of > :after ORDER BY as_of LIMIT 51"
+            ),
+            {"asset": 1, "after": START.isoformat()},
+        ).all()
+    detail = " ".join(row[-1] for row in plan)
+    assert "USING COVERING INDEX" in detail or "USING INDEX" in detail
+    assert "TEMP B-TREE" not in detail
+
+
+def test_phase_history_cursor_breaks_timestamp_ties(client: TestClient) -> None:
+    ids: list[str] = []
+    params: dict[str, object] = {"limit": 2}
+    while True:
+        response = client.get("/phase/NVDA/history", params=params)
+        assert response.status_code == 200
+        ids.extend(entry["id"] for entry in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+
+    assert len(ids) == 7 == len(set(ids))
+    entries = client.get("/phase/NVDA/history", params={"limit": 7}).json()
+    assert [entry["id"] for entry in entries] == ids
+    changed = [entry["changed_at"] for entry in entries]
+    assert changed == sorted(changed, reverse=True)
+
+
+def test_ohlc_buckets_aggregate_prices_and_align_indicators(client: TestClient) -> None:
+    page = client.get("/snapshots/NVDA/series", params={"bucket_seconds": 86400}).json()
+    assert page["bucket_seconds"] == 86400
+    assert page["next_cursor"] is None
+    assert len(page["points"]) == HOURS // 24
+
+    day = page["points"][0]
+    assert day["as_of"].startswith("2026-09-01T00:00:00")
+    assert (day["open"], day["high"], day["low"], day["close"]) == (100.0, 123.0, 100.0, 123.0)
+    assert day["price"] == pytest.approx(111.5)
+    assert day["samples"] == 24
+    assert day["volume"] == pytest.approx(sum(1_000 + hour for hour in range(24)))
+    assert day["rsi_14"] == pytest.approx(sum(40 + hour % 30 for hour in range(0, 24, 2)) / 12)
+
+
+def test_target_points_bound_the_payload(client: TestClient) -> None:
+    page = client.get("/snapshots/NVDA/series", params={"points": 10}).json()
+    assert 10 <= len(page["points"]) <= 11
+    assert sum(point["samples"] for point in page["points"]) == HOURS
+
+
+def test_lttb_keeps_endpoints_and_target_count(client: TestClient) -> None:
+    page = client.get("/snapshots/NVDA/series", params={"points": 20, "method": "lttb"}).json()
+    prices = [point["price"] for point in page["points"]]
+    assert len(prices) == 20
+    assert prices[0] == 100.0 and prices[-1] == 100.0 + HOURS - 1
+    assert prices == sorted(prices)
+
+
+def test_downsampled_series_is_not_paginated(client: TestClient) -> None:
+    cursor = client.get("/snapshots/NVDA/series", params={"limit": 1}).json()["next_cursor"]
+    response = client.get("/snapshots/NVDA/series", params={"points": 10, "cursor": cursor})
+    assert response.status_code == 400
+
+
+def test_series_as_arrow_moves_page_fields_to_headers(client: TestClient) -> None:
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc  # noqa: F401
+
+    accept = {"Accept": "application/vnd.apache.arrow.stream"}
+    page = client.get("/snapshots/NVDA/series", params={"limit": 50}, headers=accept)
+    assert page.status_code == 200
+    table = pa.ipc.open_stream(page.content).read_all()
+    assert table.num_rows == 50
+    assert table.column("price").to_pylist()[:2] == [100.0, 101.0]
+    assert page.headers["X-Next-Cursor"] == client.get(
+        "/snapshots/NVDA/series", params={"limit": 50}
+    ).json()["next_cursor"]
+
+    bucketed = client.get("/snapshots/NVDA/series", params={"bucket_seconds": 86400}, headers=accept)
+    assert bucketed.headers["X-Bucket-Seconds"] == "86400"
+    table = pa.ipc.open_stream(bucketed.content).read_all()
+    assert sum(table.column("samples").to_pylist()) == HOURS
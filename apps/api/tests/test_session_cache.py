@@ -0,0 +1,93 @@
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import User
+from app.dependencies.auth import (
+    InMemorySessionCache,
+    RedisSessionCache,
+    get_session_cache,
+    lookup_user_id,
+)
+
+
+def test_lookup_hits_database_once_per_token(session_factory: sessionmaker[Session]) -> None:
+    with session_factory() as session:
+        user = User(session_token="cached-token")
+        session.add(user)
+        session.commit()
+        user_id = user.id
+
+        statements: list[str] = []
+        event.listen(session.get_bind(), "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        assert lookup_user_id(session, "cached-token") == user_id
+        assert lookup_user_id(session, "cached-token") == user_id
+        assert lookup_user_id(session, "unknown-token") is None
+        assert lookup_user_id(session, "unknown-token") is None
+
+    assert len(statements) == 3
+    get_session_cache().invalidate("cached-token")
+
+
+def test_revoking_session_invalidates_cached_token(client: TestClient) -> None:
+    token = client.post("/auth/guest").json()["session_token"]
+    headers = {"X-Session-Token": token}
+    assert client.get("/watchlist", headers=headers).status_code == 200
+
+    assert client.delete(f"/auth/sessions/{token}").status_code == 204
+    assert client.get("/watchlist", headers=headers).status_code == 401
+
+
+def test_in_memory_cache_expires_and_evicts() -> None:
+    cache = InMemorySessionCache(max_entries=1, ttl_seconds=0)
+    user_id = uuid4()
+    cache.set("a", user_id)
+    assert cache.get("a") is None
+
+    cache = InMemorySessionCache(max_entries=1, ttl_seconds=60)
+    cache.set("a", user_id)
+    cache.set("b", user_id)
+    assert cache.get("a") is None
+    assert cache.get("b") == user_id
+
+
+class UnreachableRedis:
+    def get(self, name: str) -> bytes:
+        raise ConnectionError("redis down")
+
+    setex = delete = get
+
+
+def test_redis_cache_outage_does_not_fail_revocation() -> None:
+    cache = RedisSessionCache(UnreachableRedis())
+
+    cache.set("token", uuid4())
+    assert cache.get("token") is None
+    cache.invalidate("token")
+
+
+class RecordingAsyncRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    async def get(self, name: str) -> bytes | None:
+        value = self.values.get(name)
+        return value.encode() if value is not None else None
+
+    async def setex(self, name: str, ttl: int, value: str) -> None:
+        self.values[name] = value
+
+
+async def test_async_lookup_uses_the_async_redis_client() -> None:
+    user_id = uuid4()
+    async_client = RecordingAsyncRedis()
+    cache = RedisSessionCache(UnreachableRedis(), async_client=async_client)
+
+    await cache.aset("token", user_id)
+    assert async_client.values == {"tft:session:token": str(user_id)}
+    assert await cache.aget("token") == user_id
+    # Without an async client the blocking calls run on a worker thread.
+    assert await RedisSessionCache(UnreachableRedis()).aget("token") is None
@@ -1,53 +1,18 @@
 from datetime import datetime, timedelta, timezone
-from typing import Iterator
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import Session, sessionmaker
 
-from app.db.models import Asset, Base, IndicatorSnapshot, MarketSnapshot
-from app.db.session import get_session
-from app.main import create_app
-from app.dependencies.rate_limit import enforce_rate_limit, rate_limiter
+from app.db.models import Asset, IndicatorSnapshot, MarketSnapshot
+from app.services.latest_state import rebuild_latest_state
 
 
 @pytest.fixture()
-def client() -> Iterator[TestClient]:
-    engine = create_engine(
-        "sqlite+pysqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    TestingSession = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
-    Base.metadata.create_all(engine)
-
-    app = create_app(init_db=False)
-
-    def override_get_session() -> Iterator[Session]:
-        session = TestingSession()
-        try:
-            yield session
-            session.commit()
-        finally:
-            session.close()
-
-    app.dependency_overrides[get_session] = override_get_session
-    app.dependency_overrides[enforce_rate_limit] = lambda: None
-
-    original_limit = rate_limiter.max_requests
-    rate_limiter.max_requests = 1000
-
-    with TestingSession() as session:
+def session_factory(session_factory: sessionmaker[Session]) -> sessionmaker[Session]:
+    with session_factory() as session:
         seed_snapshot_data(session)
-
-    with TestClient(app) as test_client:
-        yield test_client
-
-    app.dependency_overrides.pop(get_session, None)
-    app.dependency_overrides.pop(enforce_rate_limit, None)
-    rate_limiter.max_requests = original_limit
+    return session_factory
 
 
 def seed_snapshot_data(session: Session) -> None:
@@ -61,7 +26,7 @@ def seed_snapshot_data(session: Session) -> None:
 
     # Older snapshot for NVDA to ensure only latest returned.
     older_nvda_snapshot = MarketSnapshot(
-        asset_id=asset_nvda.id,
+        asset_key=asset_nvda.key,
         price=420.50,
         price_change_pct=-0.5,
         volume=1_000_000,
@@ -73,7 +38,7 @@ def seed_snapshot_data(session: Session) -> None:
     session.flush()
 
     latest_nvda_snapshot = MarketSnapshot(
-        asset_id=asset_nvda.id,
+        asset_key=asset_nvda.key,
         price=425.12,
         price_change_pct=1.05,
         volume=1_200_000,
@@ -87,8 +52,7 @@ def seed_snapshot_data(session: Session) -> None:
     session.add_all(
         [
             IndicatorSnapshot(
-                asset_id=asset_nvda.id,
-                market_snapshot_id=older_nvda_snapshot.id,
+                asset_key=asset_nvda.key,
                 rsi_14=55.0,
                 macd=0.8,
                 macd_signal=0.6,
@@ -96,8 +60,7 @@ def seed_snapshot_data(session: Session) -> None:
                 as_of=older_nvda_snapshot.as_of,
             ),
             IndicatorSnapshot(
-                asset_id=asset_nvda.id,
-                market_snapshot_id=latest_nvda_snapshot.id,
+                asset_key=asset_nvda.key,
                 rsi_14=60.0,
                 macd=0.9,
                 macd_signal=0.7,
@@ -108,7 +71,7 @@ def seed_snapshot_data(session: Session) -> None:
     )
 
     btc_snapshot = MarketSnapshot(
-        asset_id=asset_btc.id,
+        asset_key=asset_btc.key,
         price=64000.0,
         price_change_pct=2.1,
         volume=15_000,
@@ -121,8 +84,7 @@ def seed_snapshot_data(session: Session) -> None:
 
     session.add(
         IndicatorSnapshot(
-            asset_id=asset_btc.id,
-            market_snapshot_id=btc_snapshot.id,
+            asset_key=asset_btc.key,
             rsi_14=48.5,
             macd=-1.2,
             macd_signal=-0.8,
@@ -131,6 +93,7 @@ def seed_snapshot_data(session: Session) -> None:
         )
     )
 
+    rebuild_latest_state(session)
     session.commit()
 
 
@@ -162,3 +125,59 @@ def test_latest_indicator_snapshots(client: TestClient) -> None:
     nvda_entry = next(item for item in data if item["ticker"] == "NVDA")
     assert nvda_entry["rsi_14"] == 60.0
     assert nvda_entry["macd_signal"] == 0.7
+
+
+def test_latest_market_snapshots_as_arrow(client: TestClient) -> None:
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.ipc  # noqa: F401
+
+    response = client.get("/snapshots/latest", headers={"Accept": "application/vnd.apache.arrow.stream"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    assert "Accept" in response.headers["vary"]
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == [
+        "asset_id",
+        "ticker",
+        "asset_name",
+        "asset_type",
+        "as_of",
+        "price",
+        "price_change_pct",
+        "volume",
+        "vwap",
+        "volatility_1d",
+    ]
+    assert table.column("ticker").to_pylist() == ["BTC-USD", "NVDA"]
+    assert table.column("price").to_pylist() == [64000.0, 425.12]
+    assert table.column("as_of").type == pa.timestamp("us", tz="UTC")
+
+
+def test_latest_indicator_snapshots_as_msgpack(client: TestClient) -> None:
+    msgpack = pytest.importorskip("msgpack")
+
+    json_rows = client.get("/indicators/latest").json()
+    response = client.get("/indicators/latest", headers={"Accept": "application/x-msgpack"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/msgpack"
+    columns = msgpack.unpackb(response.content, timestamp=3)
+    assert columns["ticker"] == [row["ticker"] for row in json_rows]
+    assert columns["asset_id"] == [row["asset_id"] for row in json_rows]
+    assert columns["rsi_14"] == [row["rsi_14"] for row in json_rows]
+    assert all(as_of.tzinfo is not None for as_of in columns["as_of"])
+
+
+def test_json_stays_the_default_format(client: TestClient) -> None:
+    for accept in ("*/*", "text/html", "application/json, application/msgpack;q=0.5"):
+        response = client.get("/snapshots/latest", headers={"Accept": accept})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert len(response.json()) == 2
+
+
+def test_latest_json_is_byte_identical_to_response_model(client: TestClient) -> None:
+    from app.routers.snapshots import _INDICATOR_SNAPSHOTS, _MARKET_SNAPSHOTS
+
+    for path, adapter in (("/snapshots/latest", _MARKET_SNAPSHOTS), ("/indicators/latest", _INDICATOR_SNAPSHOTS)):
+        body = client.get(path).content
+        assert body == adapter.dump_json(adapter.validate_json(body))
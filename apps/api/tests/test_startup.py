@@ -0,0 +1,50 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# Modules only the ingest pipeline, alerting or Sentry need; API imports must not load them.
+INGEST_ONLY = ("pandas", "yfinance", "vaderSentiment", "sentry_sdk", "httpx", "psycopg")
+# ``import app.main`` took about 2.4s before ingest dependencies were deferred.
+# Wall-clock timing flakes on loaded machines, so the budget check is opt-in:
+# TFT_TEST_IMPORT_BUDGET=1 pytest tests/test_startup.py
+IMPORT_BUDGET_SECONDS = 1.5
+requires_budget = pytest.mark.skipif(
+    not os.getenv("TFT_TEST_IMPORT_BUDGET"), reason="TFT_TEST_IMPORT_BUDGET is not set"
+)
+
+
+def _import_app(*extra: str) -> subprocess.CompletedProcess[str]:
+    return subprocess.run(
+        [sys.executable, *extra, "-c", "import sys, app.main; print(' '.join(sys.modules))"],
+        cwd=ROOT_DIR,
+        env={**os.environ, "TFT_DATABASE_URL": "postgresql+psycopg://localhost/unused"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def test_api_import_skips_ingest_dependencies() -> None:
+    loaded = set(_import_app().stdout.split())
+
+    assert "app.main" in loaded
+    assert not {module for module in loaded if module.split(".")[0] in INGEST_ONLY}
+    assert "app.jobs.pipeline" not in loaded
+
+
+@requires_budget
+def test_api_import_time_budget() -> None:
+    timings = []
+    for _ in range(2):
+        stderr = _import_app("-X", "importtime").stderr
+        match = re.search(r"^import time:\s+\d+ \|\s+(\d+) \| app\.main$", stderr, re.MULTILINE)
+        assert match is not None
+        timings.append(int(match.group(1)) / 1_000_000)
+
+    assert min(timings) < IMPORT_BUDGET_SECONDS
@@ -1,68 +1,11 @@
 from __future__ import annotations
 
-from typing import Iterator
-
-import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import event, select
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool
-
-from app.db.models import Base
-from app.db.session import get_session
-from app.dependencies.rate_limit import enforce_rate_limit, rate_limiter
-from app.main import create_app
-
-
-@pytest.fixture()
-def engine():
-    engine = create_engine(
-        "sqlite+pysqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
-    Base.metadata.create_all(engine)
-    return engine
 
-
-@pytest.fixture()
-def session(engine) -> Iterator[Session]:
-    TestingSession = sessionmaker(bind=engine, autocommit=False, autoflush=False)
-    session = TestingSession()
-    try:
-        yield session
-    finally:
-        session.close()
-
-
-@pytest.fixture()
-def client(session: Session, engine) -> Iterator[TestClient]:
-    TestingSession = sessionmaker(bind=engine, autocommit=False, autoflush=False)
-
-    def override_session() -> Iterator[Session]:
-        db = TestingSession()
-        try:
-            yield db
-            db.commit()
-        except Exception:
-            db.rollback()
-            raise
-        finally:
-            db.close()
-
-    app = create_app(init_db=False)
-    original_limit = rate_limiter.max_requests
-    rate_limiter.max_requests = 1000
-
-    app.dependency_overrides[get_session] = override_session
-    app.dependency_overrides[enforce_rate_limit] = lambda: None
-
-    with TestClient(app) as test_client:
-        yield test_client
-
-    app.dependency_overrides.pop(get_session, None)
-    app.dependency_overrides.pop(enforce_rate_limit, None)
-    rate_limiter.max_requests = original_limit
+from app.db.models import Asset
+from app.jobs.ingest_jobs import get_ingest_jobs
 
 
 def test_watchlist_alias_flow(client: TestClient) -> None:
@@ -94,3 +37,69 @@ def test_watchlist_alias_flow(client: TestClient) -> None:
     list_resp = client.get("/watchlist", headers=headers)
     assert list_resp.status_code == 200
     assert list_resp.json() == []
+
+
+class RecordingJobs:
+    def __init__(self, session_factory: sessionmaker[Session] | None = None) -> None:
+        self.session_factory = session_factory
+        self.submitted: list[list[str]] = []
+        self.committed: list[list[str]] = []
+
+    def submit(self, tickers) -> None:
+        self.submitted.append(list(tickers))
+        if self.session_factory is not None:
+            # What the ingest worker would see from its own session.
+            with self.session_factory() as session:
+                self.committed.append(list(session.scalars(select(Asset.ticker).where(Asset.ticker.in_(tickers)))))
+
+
+def test_bulk_watchlist_add_and_remove(client: TestClient, session_factory: sessionmaker[Session]) -> None:
+    jobs = RecordingJobs(session_factory)
+    client.app.dependency_overrides[get_ingest_jobs] = lambda: jobs
+    token = client.post("/auth/guest").json()["session_token"]
+    headers = {"X-Session-Token": token}
+    assert client.post("/watchlist", json={"ticker": "NVDA"}, headers=headers).status_code == 201
+    jobs.submitted.clear()
+
+    response = client.post(
+        "/watchlist/bulk",
+        json={"tickers": ["amd", "TRUMP-USD", "NVDA", "AMD", "BTC-USD"]},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    items = response.json()
+    assert [item["ticker"] for item in items] == ["NVDA", "AMD", "TRUMP35336-USD", "BTC-USD"]
+    assert [item["order"] for item in items] == [1, 2, 3, 4]
+    assert items[2]["display_ticker"] == "TRUMP-USD"
+    assert jobs.submitted == [["AMD", "TRUMP35336-USD", "BTC-USD"]]
+    assert sorted(jobs.committed[0]) == ["AMD", "BTC-USD", "TRUMP35336-USD"]
+
+    response = client.request(
+        "DELETE", "/watchlist/bulk", json={"tickers": ["trump-usd", "NVDA", "MSFT"]}, headers=headers
+    )
+    assert response.status_code == 200
+    assert [item["ticker"] for item in response.json()] == ["AMD", "BTC-USD"]
+    assert client.delete("/watchlist/AMD", headers=headers).status_code == 204
+
+
+def test_bulk_watchlist_add_uses_fixed_query_count(client: TestClient, engine) -> None:
+    client.app.dependency_overrides[get_ingest_jobs] = lambda: RecordingJobs()
+
+    def add_bulk(tickers: list[str]) -> int:
+        token = client.post("/auth/guest").json()["session_token"]
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, *args) -> None:
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            response = client.post("/watchlist/bulk", json={"tickers": tickers}, headers={"X-Session-Token": token})
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        assert response.status_code == 200
+        assert len(response.json()) == len(tickers)
+        return len(statements)
+
+    small = add_bulk([f"S{i:02d}" for i in range(5)])
+    assert small == add_bulk([f"L{i:02d}" for i in range(50)])
@@ -23,7 +23,15 @@ type IndicatorSnapshot = {
   as_of: string;
 };
 
+type IngestJob = {
+  id: string;
+  status: "queued" | "running" | "succeeded" | "failed";
+  error?: string | null;
+};
+
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE ?? "http://localhost:8000";
+const INGEST_POLL_INTERVAL_MS = 1000;
+const INGEST_POLL_TIMEOUT_MS = 120_000;
 const PHASE_ALERTS_ENABLED = process.env.NEXT_PUBLIC_PHASE_ALERTS !== "false";
 const ANALYTICS_ENDPOINT = process.env.NEXT_PUBLIC_ANALYTICS_URL ?? "";
 
@@ -223,6 +231,23 @@ const [sessionReady, setSessionReady] = useState(false);
         if (!response.ok) {
           throw new Error(`Ingest failed (${response.status})`);
         }
+        // The run is queued (202); wait for the job to finish before callers reload data.
+        let job: IngestJob = await response.json();
+        const deadline = Date.now() + INGEST_POLL_TIMEOUT_MS;
+        while (job.status === "queued" || job.status === "running") {
+          if (Date.now() > deadline) {
+            throw new Error(`Ingest job ${job.id} is still ${job.status}`);
+          }
+          await new Promise((resolve) => setTimeout(resolve, INGEST_POLL_INTERVAL_MS));
+          const poll = await authorizedFetch(`${API_BASE}/ingest/jobs/${job.id}`);
+          if (!poll.ok) {
+            throw new Error(`Ingest job lookup failed (${poll.status})`);
+          }
+          job = await poll.json();
+        }
+        if (job.status === "failed") {
+          throw new Error(job.error ?? `Ingest job ${job.id} failed`);
+        }
       } catch (err) {
         console.error("Failed to trigger ingest", err);
         setFeedback({ type: "error", message: "Unable to trigger ingest for new ticker." });